@@ -0,0 +1,118 @@
+"""
+Pruebas de permisos de escritura sobre áreas y del reporte anual
+"""
+
+import os
+import tempfile
+import time
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.authentication.models import Usuario
+from apps.empleados.models import Empleado
+from apps.solicitudes.models import SaldoVacaciones
+from apps.solicitudes.reportes import directorio_reporte, generar_reporte_anual, huella_reporte_anual
+from .models import Area
+
+
+class AreaPermisosTestCase(TestCase):
+    """Solo SuperAdmin crea, modifica o elimina áreas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        cls.superadmin = Usuario.objects.create_superuser(
+            email='admin@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Sistema'
+        )
+        cls.admin_area = Usuario.objects.create_user(
+            email='area@metro.gob.mx', nombre='Admin', apellidos='Área', rol='admin_area', area=cls.area
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_admin_area_no_escribe(self):
+        self.client.force_authenticate(self.admin_area)
+        respuesta = self.client.post('/api/areas/', {'nombre': 'Nueva', 'codigo': 'NUEVA'}, format='json')
+        self.assertEqual(respuesta.status_code, 403)
+        respuesta = self.client.patch(f'/api/areas/{self.area.id}/', {'nombre': 'Otra'}, format='json')
+        self.assertEqual(respuesta.status_code, 403)
+        respuesta = self.client.delete(f'/api/areas/{self.area.id}/')
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertEqual(Area.objects.get().nombre, 'Área Prueba')
+
+    def test_admin_area_consulta_su_area(self):
+        self.client.force_authenticate(self.admin_area)
+        respuesta = self.client.get(f'/api/areas/{self.area.id}/')
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_superadmin_escribe(self):
+        self.client.force_authenticate(self.superadmin)
+        respuesta = self.client.post('/api/areas/', {'nombre': 'Nueva', 'codigo': 'NUEVA'}, format='json')
+        self.assertEqual(respuesta.status_code, 201, respuesta.data)
+        respuesta = self.client.delete(f"/api/areas/{respuesta.data['id']}/")
+        self.assertEqual(respuesta.status_code, 204)
+
+
+class ReporteAnualTestCase(TestCase):
+    """Año acotado en los parámetros y limpieza de reportes de huellas anteriores"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        cls.superadmin = Usuario.objects.create_superuser(
+            email='admin@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Sistema'
+        )
+
+    def test_año_fuera_de_rango(self):
+        client = APIClient()
+        client.force_authenticate(self.superadmin)
+        for anio in ('99999999999', '1899', '2101', 'x'):
+            for accion in ('ocupacion', 'reporte-anual'):
+                respuesta = client.get(f'/api/areas/{self.area.id}/{accion}/?anio={anio}')
+                self.assertEqual(respuesta.status_code, 400, (accion, anio))
+        self.assertEqual(client.get(f'/api/areas/{self.area.id}/ocupacion/?anio=2100').status_code, 200)
+
+    def test_limpieza_solo_de_huellas_anteriores(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), \
+                mock.patch('apps.pdf_generation.reporte_anual.generar_pdf_reporte_anual',
+                           lambda datos, ruta: open(ruta, 'wb').close()):
+            directorio = directorio_reporte(self.area.id, 2025)
+            os.makedirs(directorio)
+            ahora = time.time()
+            # Uno de una huella anterior y otro que terminó otra generación mientras corría esta
+            for nombre, modificado in (('anterior.xlsx', ahora - 3600), ('posterior.xlsx', ahora + 3600)):
+                ruta = os.path.join(directorio, nombre)
+                open(ruta, 'wb').close()
+                os.utime(ruta, (modificado, modificado))
+
+            huella = generar_reporte_anual(self.area.id, 2025)
+            self.assertEqual(
+                sorted(os.listdir(directorio)), sorted([f'{huella}.pdf', f'{huella}.xlsx', 'posterior.xlsx'])
+            )
+
+    def test_huella_cambia_al_mover_dias_entre_saldos(self):
+        cache.clear()
+        saldos = []
+        for expediente in ('1001', '1002'):
+            empleado = Empleado.objects.create(
+                area=self.area, numero_expediente=expediente, nombre='Nombre', apellidos='Apellidos',
+                fecha_ingreso=date(2015, 1, 1),
+            )
+            saldos.append(SaldoVacaciones.objects.create(
+                empleado=empleado, periodo='2025-2', dias_otorgados=20, dias_utilizados=0, dias_disponibles=20,
+                fecha_inicio_periodo=date(2025, 1, 1), fecha_fin_periodo=date(2025, 6, 30),
+            ))
+        huella = huella_reporte_anual(self.area.id, 2025)
+
+        # Los totales del área no cambian
+        with self.captureOnCommitCallbacks(execute=True):
+            for saldo, dias in zip(saldos, (-1, 1)):
+                saldo.dias_otorgados += dias
+                saldo.dias_disponibles += dias
+                saldo.save()
+        self.assertNotEqual(huella_reporte_anual(self.area.id, 2025), huella)
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import views
 
 router = DefaultRouter()
-# ViewSets se registrarán en views.py
+router.register(r'', views.AreaViewSet, basename='area')
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
@@ -1,7 +1,76 @@
-from rest_framework import viewsets
+from datetime import date
+
+from django.http import FileResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.authentication.mixins import AreaScopedMixin
+from apps.authentication.permissions import IsSuperAdmin
+from apps.solicitudes.reportes import FORMATOS_REPORTE, archivos_reporte_anual, estado_reporte_anual
+from apps.solicitudes.services import obtener_ocupacion_area
+from utils.helpers import leer_año
+from utils.replicas import LecturaReplicaMixin
 from .models import *
 from .serializers import *
 
-class AreaViewSet(viewsets.ModelViewSet):
+class AreaViewSet(AreaScopedMixin, LecturaReplicaMixin, viewsets.ModelViewSet):
     queryset = Area.objects.all()
-    serializer_class = AreaSerializer
\ No newline at end of file
+    serializer_class = AreaSerializer
+    campo_area = 'id'
+    acciones_replica = ('ocupacion',)
+    # Solo SuperAdmin crea, modifica o elimina áreas
+    acciones_escritura = ('create', 'update', 'partial_update', 'destroy')
+
+    def get_permissions(self):
+        if self.action in self.acciones_escritura:
+            return [IsAuthenticated(), IsSuperAdmin()]
+        return super().get_permissions()
+
+    @action(detail=True, methods=['get'])
+    def ocupacion(self, request, pk=None):
+        """Personas ausentes por día del año (?anio=2025&turno=...)"""
+        area = self.get_object()
+        try:
+            año = leer_año(request.query_params.get('anio', date.today().year))
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        turno = request.query_params.get('turno') or None
+        return Response(obtener_ocupacion_area(area.id, año, turno))
+
+    @action(detail=True, methods=['get', 'post'], url_path='reporte-anual')
+    def reporte_anual(self, request, pk=None):
+        """
+        Reporte anual de uso del área (?anio=2025)
+
+        POST encola la generación si el reporte vigente no existe. GET sin
+        formato regresa el estado; con ?formato=pdf|xlsx descarga el archivo
+        (202 mientras se genera, 404 si no se ha solicitado).
+        """
+        area = self.get_object()
+        try:
+            año = leer_año(request.query_params.get('anio', date.today().year))
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        formato = request.query_params.get('formato')
+        if request.method == 'GET' and formato:
+            if formato not in FORMATOS_REPORTE:
+                return Response({'detail': 'Formato no soportado, use pdf o xlsx.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            _, archivos = archivos_reporte_anual(area.id, año)
+            if formato in archivos:
+                return FileResponse(open(archivos[formato], 'rb'), as_attachment=True,
+                                    filename=f'reporte_anual_{area.codigo}_{año}.{formato}')
+
+        estado = estado_reporte_anual(area.id, año, generar=request.method == 'POST')
+        if estado['estado'] == 'listo':
+            return Response(estado)
+        if estado['estado'] == 'pendiente':
+            return Response(dict(estado, detail='El reporte no se ha generado; solicítelo con POST.'),
+                            status=status.HTTP_404_NOT_FOUND)
+        if estado['estado'] == 'error':
+            return Response(estado, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response(estado, status=status.HTTP_202_ACCEPTED)
@@ -1,7 +1,9 @@
 from rest_framework import viewsets
+
+from utils.replicas import LecturaReplicaMixin
 from .models import *
 from .serializers import *
 
-class LogAuditoriaViewSet(viewsets.ModelViewSet):
+class LogAuditoriaViewSet(LecturaReplicaMixin, viewsets.ModelViewSet):
     queryset = LogAuditoria.objects.all()
     serializer_class = LogAuditoriaSerializer
\ No newline at end of file
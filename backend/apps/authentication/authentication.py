@@ -0,0 +1,37 @@
+"""
+Autenticación JWT con el usuario en caché
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .services import obtener_principal
+
+
+class PrincipalJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que obtiene el usuario del caché en vez de consultarlo
+
+    El principal guarda rol, area_id y activo, por lo que las peticiones
+    autenticadas de lectura no consultan la tabla de usuarios. Se invalida al
+    guardar o borrar el usuario (ver signals).
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Requiere el hash de la contraseña, que no se guarda en caché
+            return super().get_user(validated_token)
+
+        try:
+            usuario_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        usuario = obtener_principal(usuario_id)
+        if usuario is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not usuario.activo or not usuario.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return usuario
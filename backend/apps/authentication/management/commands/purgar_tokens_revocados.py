@@ -0,0 +1,19 @@
+"""
+Borra los refresh tokens revocados que ya expiraron
+Ejecutar: python manage.py purgar_tokens_revocados
+
+La purga también ocurre sola cada hora en cada proceso; este comando sirve
+para programarla (cron) en despliegues con poco tráfico.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.authentication.revocacion import almacen
+
+
+class Command(BaseCommand):
+    help = 'Borra los tokens revocados expirados'
+
+    def handle(self, *args, **options):
+        borrados = almacen.purgar()
+        self.stdout.write(self.style.SUCCESS(f"Tokens expirados borrados: {borrados}"))
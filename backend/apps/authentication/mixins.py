@@ -0,0 +1,89 @@
+"""
+Mixins de ViewSets para aislar los datos por área
+"""
+
+from django.db.models import Q
+from rest_framework import permissions
+from rest_framework.exceptions import PermissionDenied
+
+
+# Indica que los datos recibidos no incluyen el área (p. ej. PATCH parcial)
+_SIN_AREA = object()
+
+
+def filtrar_por_area(queryset, usuario, campo_area: str = 'area_id', incluir_globales: bool = False):
+    """
+    Limita un queryset al área del usuario
+
+    Args:
+        queryset: Consulta a filtrar
+        usuario: Usuario autenticado; superadmin ve todo
+        campo_area: Lookup hasta el id del área ('area_id', 'empleado__area_id')
+        incluir_globales: Incluir registros sin área (catálogos generales)
+    """
+    if getattr(usuario, 'rol', None) == 'superadmin':
+        return queryset
+    area_id = getattr(usuario, 'area_id', None)
+    if not area_id:
+        return queryset.none()
+
+    condicion = Q(**{campo_area: area_id})
+    if incluir_globales:
+        condicion |= Q(**{f'{campo_area}__isnull': True})
+    return queryset.filter(condicion)
+
+
+def _area_en_datos(datos, campo_area: str):
+    """Id del área a la que pertenecen los datos validados de un serializer"""
+    primero, *resto = campo_area.split('__')
+    clave = primero[:-3] if not resto and primero.endswith('_id') else primero
+    if clave not in datos:
+        return _SIN_AREA
+
+    valor = datos[clave]
+    if not resto:
+        return getattr(valor, 'pk', valor)
+    for parte in resto:
+        valor = getattr(valor, parte, None)
+    return valor
+
+
+class AreaScopedMixin:
+    """
+    Aplica el aislamiento por área en el queryset del ViewSet
+
+    El filtro se resuelve en SQL con el índice de área, de modo que las
+    listas solo traen registros del área del admin_area y el detalle de
+    otra área responde 404 sin cargar el registro. En escrituras se valida
+    que el área enviada sea la del usuario.
+
+    El ViewSet define:
+        campo_area: Lookup hasta el id del área (default 'area_id')
+        incluir_globales: Mostrar en lectura los registros sin área
+    """
+
+    campo_area = 'area_id'
+    incluir_globales = False
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Los registros globales se pueden consultar pero no modificar
+        globales = self.incluir_globales and self.request.method in permissions.SAFE_METHODS
+        return filtrar_por_area(queryset, self.request.user, self.campo_area, globales)
+
+    def perform_create(self, serializer):
+        self.validar_area(serializer.validated_data)
+        super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        self.validar_area(serializer.validated_data)
+        super().perform_update(serializer)
+
+    def validar_area(self, datos):
+        """Impide que un admin_area registre datos en otra área"""
+        usuario = self.request.user
+        if usuario.rol == 'superadmin':
+            return
+        area_id = _area_en_datos(datos, self.campo_area)
+        if area_id is not _SIN_AREA and area_id != usuario.area_id:
+            raise PermissionDenied('No tiene permiso para registrar datos de otra área.')
@@ -4,7 +4,6 @@ Modelos de autenticación y usuarios
 
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
-from django.utils import timezone
 
 
 class UsuarioManager(BaseUserManager):
@@ -104,6 +103,25 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
         return self.area_id == area_id if self.area_id else False
     
     def actualizar_ultimo_acceso(self):
-        """Actualiza la fecha del último acceso"""
-        self.ultimo_acceso = timezone.now()
-        self.save(update_fields=['ultimo_acceso'])
\ No newline at end of file
+        """Registra el último acceso; se escribe en lote (ver services.registrar_acceso)"""
+        from .services import registrar_acceso
+        registrar_acceso(self)
+
+class TokenRevocado(models.Model):
+    """
+    Refresh tokens revocados (logout o rotación)
+
+    Solo se conservan hasta su expiración; ver apps.authentication.revocacion.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    usuario_id = models.IntegerField(null=True, blank=True)
+    expira = models.DateTimeField(db_index=True)
+    fecha_revocacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'tokens_revocados'
+        verbose_name = 'Token revocado'
+        verbose_name_plural = 'Tokens revocados'
+
+    def __str__(self):
+        return self.jti
@@ -69,8 +69,7 @@ class CanManageArea(permissions.BasePermission):
         
         # Admin de área solo puede gestionar su propia área
         if request.user.rol == 'admin_area':
-            if hasattr(obj, 'area'):
-                return obj.area == request.user.area
+            # Se compara el id para no cargar las áreas relacionadas
             if hasattr(obj, 'area_id'):
                 return obj.area_id == request.user.area_id
         
@@ -0,0 +1,194 @@
+"""
+Revocación de refresh tokens
+
+Sustituye a rest_framework_simplejwt.token_blacklist (que no está instalado)
+con una sola tabla, tokens_revocados, que solo guarda los jti hasta su
+expiración. La consulta en cada refresh se resuelve en memoria:
+
+1. Un filtro de Bloom por proceso con todos los jti revocados vigentes; si
+   el jti no está, el token no fue revocado (caso común).
+2. Un conjunto de jti revocados ya confirmados.
+3. Si el filtro responde positivo y no está confirmado (posible falso
+   positivo), se consulta la base de datos.
+
+El filtro se sincroniza con los renglones nuevos cuando cambia la versión
+compartida en el caché (al revocar en cualquier proceso) o cada
+SEGUNDOS_SINCRONIZACION (el tiempo máximo en que una revocación hecha en
+otro proceso al mismo tiempo que una local puede tardar en verse). Cada
+SEGUNDOS_PURGA se borran de la base de datos
+los tokens expirados y el filtro se reconstruye.
+"""
+
+import hashlib
+import math
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import TokenRevocado
+
+
+CLAVE_VERSION = 'tokens_revocados:version'
+SEGUNDOS_SINCRONIZACION = 5
+SEGUNDOS_PURGA = 3600
+TASA_FALSOS_POSITIVOS = 0.001
+CAPACIDAD_MINIMA = 10000
+MAX_CONFIRMADOS = 10000
+
+
+class FiltroBloom:
+    """Filtro de Bloom sobre cadenas con doble hash (blake2b)"""
+
+    def __init__(self, capacidad: int, tasa_falsos: float = TASA_FALSOS_POSITIVOS):
+        self.capacidad = max(capacidad, 1)
+        self.bits = math.ceil(-self.capacidad * math.log(tasa_falsos) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.bits / self.capacidad * math.log(2)))
+        self.arreglo = bytearray((self.bits + 7) // 8)
+        self.elementos = 0
+
+    def _posiciones(self, valor: str):
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def agregar(self, valor: str):
+        for posicion in self._posiciones(valor):
+            self.arreglo[posicion >> 3] |= 1 << (posicion & 7)
+        self.elementos += 1
+
+    def __contains__(self, valor: str) -> bool:
+        return all(self.arreglo[p >> 3] & (1 << (p & 7)) for p in self._posiciones(valor))
+
+    @property
+    def lleno(self) -> bool:
+        return self.elementos > self.capacidad
+
+
+class AlmacenRevocaciones:
+    """Estado de revocación de un proceso (ver docstring del módulo)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filtro = None
+        self._confirmados = {}
+        self._ultimo_id = 0
+        self._version = None
+        self._proxima_sincronizacion = 0.0
+        self._proxima_purga = 0.0
+        self.consultas_bd = 0
+
+    def revocar(self, jti: str, expira, usuario_id=None):
+        """Registra un jti revocado hasta su expiración"""
+        TokenRevocado.objects.bulk_create(
+            [TokenRevocado(jti=jti, expira=expira, usuario_id=usuario_id)],
+            ignore_conflicts=True,
+        )
+        with self._lock:
+            if self._filtro is not None:
+                self._filtro.agregar(jti)
+            self._confirmar(jti)
+
+            # Si el proceso estaba al día adopta la nueva versión para no
+            # volver a leer su propia revocación en la siguiente consulta
+            al_dia = cache.get(CLAVE_VERSION) == self._version
+            version = uuid.uuid4().hex
+            cache.set(CLAVE_VERSION, version, None)
+            if al_dia and self._filtro is not None:
+                self._version = version
+
+    def esta_revocado(self, jti: str) -> bool:
+        self._sincronizar()
+        if jti not in self._filtro:
+            return False
+        if jti in self._confirmados:
+            return True
+
+        self.consultas_bd += 1
+        revocado = TokenRevocado.objects.filter(jti=jti, expira__gt=timezone.now()).exists()
+        if revocado:
+            with self._lock:
+                self._confirmar(jti)
+        return revocado
+
+    def purgar(self) -> int:
+        """Borra los tokens expirados y reconstruye el filtro; regresa los borrados"""
+        with self._lock:
+            return self._reconstruir()
+
+    def _confirmar(self, jti: str):
+        self._confirmados[jti] = True
+        if len(self._confirmados) > MAX_CONFIRMADOS:
+            # Se descarta el más antiguo; un acierto posterior vuelve a la base de datos
+            self._confirmados.pop(next(iter(self._confirmados)))
+
+    def _sincronizar(self):
+        ahora = time.monotonic()
+        version = cache.get(CLAVE_VERSION)
+        if self._filtro is not None and version == self._version and ahora < self._proxima_sincronizacion:
+            return
+
+        with self._lock:
+            if self._filtro is None or self._filtro.lleno or ahora >= self._proxima_purga:
+                self._reconstruir()
+            else:
+                nuevos = TokenRevocado.objects.filter(id__gt=self._ultimo_id).order_by('id')
+                for id_, jti in nuevos.values_list('id', 'jti').iterator(chunk_size=2000):
+                    self._filtro.agregar(jti)
+                    self._ultimo_id = id_
+            self._version = version
+            self._proxima_sincronizacion = ahora + SEGUNDOS_SINCRONIZACION
+
+    def _reconstruir(self) -> int:
+        borrados, _ = TokenRevocado.objects.filter(expira__lte=timezone.now()).delete()
+
+        vigentes = TokenRevocado.objects.order_by('id')
+        filtro = FiltroBloom(max(CAPACIDAD_MINIMA, 2 * vigentes.count()))
+        ultimo_id = 0
+        for id_, jti in vigentes.values_list('id', 'jti').iterator(chunk_size=2000):
+            filtro.agregar(jti)
+            ultimo_id = id_
+
+        self._filtro = filtro
+        self._ultimo_id = ultimo_id
+        self._confirmados.clear()
+        self._proxima_purga = time.monotonic() + SEGUNDOS_PURGA
+        return borrados
+
+
+almacen = AlmacenRevocaciones()
+
+
+class RefreshTokenRevocable(RefreshToken):
+    """RefreshToken que consulta y registra revocaciones en el almacén"""
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if almacen.esta_revocado(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        almacen.revocar(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload['exp']),
+            self.payload.get(api_settings.USER_ID_CLAIM),
+        )
+
+    def outstand(self):
+        # No se lleva registro de los tokens emitidos, solo de los revocados
+        return None
+
+
+class TokenRefreshRevocableSerializer(TokenRefreshSerializer):
+    """Refresh con rotación que revoca el token anterior"""
+
+    token_class = RefreshTokenRevocable
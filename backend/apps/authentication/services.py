@@ -0,0 +1,185 @@
+"""
+Servicios de autenticación: último acceso diferido y principal en caché
+
+Registro diferido del último acceso de los usuarios:
+
+Los accesos se acumulan en memoria del proceso y se escriben en un solo
+UPDATE por lote (bulk_update) cuando pasan ULTIMO_ACCESO_INTERVALO segundos
+desde la última escritura, y al terminar el proceso. Un temporizador
+escribe los pendientes al cumplirse el intervalo aunque no lleguen más
+accesos al proceso. Un acceso que ocurre dentro de ULTIMO_ACCESO_PRECISION
+segundos del último registrado se ignora.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Usuario
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# Accesos por escribir: {usuario_id: {'ultimo_acceso': ..., 'last_login': ...}}
+_pendientes: Dict[int, Dict] = {}
+# Último acceso registrado en este proceso (escrito o pendiente)
+_registrados: Dict[int, object] = {}
+_ultima_escritura = time.monotonic()
+# Escritura programada de los pendientes (una a la vez)
+_temporizador: Optional[threading.Timer] = None
+
+
+def _precision() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'ULTIMO_ACCESO_PRECISION', 300))
+
+
+def _intervalo() -> int:
+    return getattr(settings, 'ULTIMO_ACCESO_INTERVALO', 60)
+
+
+def registrar_acceso(usuario, inicio_sesion: bool = False) -> bool:
+    """
+    Registra el acceso de un usuario sin escribir en la base de datos
+
+    Args:
+        usuario: Usuario autenticado
+        inicio_sesion: Si es un login; también actualiza last_login y no
+            aplica la ventana de precisión
+
+    Returns:
+        True si el acceso quedó pendiente de escribir
+    """
+    ahora = timezone.now()
+    with _lock:
+        anterior = _registrados.get(usuario.pk) or getattr(usuario, 'ultimo_acceso', None)
+        if not inicio_sesion and anterior and ahora - anterior < _precision():
+            return False
+
+        campos = _pendientes.setdefault(usuario.pk, {})
+        campos['ultimo_acceso'] = ahora
+        if inicio_sesion:
+            campos['last_login'] = ahora
+        _registrados[usuario.pk] = ahora
+        debe_escribir = time.monotonic() - _ultima_escritura >= _intervalo()
+        if not debe_escribir:
+            _programar_escritura()
+
+    # La instancia refleja el acceso aunque aún no esté escrito
+    for campo, valor in campos.items():
+        setattr(usuario, campo, valor)
+
+    if debe_escribir:
+        escribir_accesos()
+    return True
+
+
+def escribir_accesos() -> int:
+    """
+    Escribe los accesos pendientes en lotes
+
+    Returns:
+        Número de usuarios actualizados
+    """
+    global _ultima_escritura
+    with _lock:
+        pendientes = dict(_pendientes)
+        _pendientes.clear()
+        _ultima_escritura = time.monotonic()
+    if not pendientes:
+        return 0
+
+    # Un lote por combinación de campos para que bulk_update no sobrescriba
+    # last_login con valores vacíos
+    lotes = {}
+    for usuario_id, campos in pendientes.items():
+        lotes.setdefault(tuple(sorted(campos)), []).append(Usuario(pk=usuario_id, **campos))
+    for campos, usuarios in lotes.items():
+        Usuario.objects.bulk_update(usuarios, list(campos), batch_size=500)
+    return len(pendientes)
+
+
+def _programar_escritura():
+    """Programa la escritura de los pendientes al cumplirse el intervalo (con _lock tomado)"""
+    global _temporizador
+    if _temporizador is not None:
+        return
+    espera = max(_intervalo() - (time.monotonic() - _ultima_escritura), 0)
+    _temporizador = threading.Timer(espera, _escribir_programado)
+    _temporizador.daemon = True
+    _temporizador.start()
+
+
+def _escribir_programado():
+    global _temporizador
+    with _lock:
+        _temporizador = None
+    try:
+        escribir_accesos()
+    except Exception:
+        logger.exception('No se pudieron escribir los últimos accesos')
+    finally:
+        # Las conexiones de este hilo no pasan por request_finished
+        connections.close_all()
+
+
+def _escribir_al_salir():
+    try:
+        escribir_accesos()
+    except Exception:
+        # La base de datos puede no estar disponible al apagar el proceso
+        pass
+
+
+atexit.register(_escribir_al_salir)
+
+
+# ============================================================================
+# PRINCIPAL EN CACHÉ
+# ============================================================================
+
+# El principal vive en el caché compartido (obligatorio fuera de DEBUG, ver
+# utils/checks.py): la invalidación al guardar un usuario llega a todos los
+# workers. Se borra al guardar y otra vez al confirmarse la transacción, por
+# si otra petición lo volvió a guardar con los valores previos al commit.
+
+# Margen de seguridad por si algún proceso modifica usuarios sin pasar por save()
+SEGUNDOS_CACHE_PRINCIPAL = 300
+
+# Campos del usuario que se guardan en caché; la contraseña se carga solo si
+# se necesita (queda diferida en la instancia)
+CAMPOS_PRINCIPAL = [f.attname for f in Usuario._meta.concrete_fields if f.attname != 'password']
+
+
+def _clave_principal(usuario_id) -> str:
+    return f'principal_usuario:{usuario_id}'
+
+
+def obtener_principal(usuario_id) -> Optional[Usuario]:
+    """
+    Obtiene el usuario autenticado desde el caché
+
+    Returns:
+        Instancia de Usuario (sin consultar la base de datos si estaba en
+        caché) o None si no existe
+    """
+    valores = cache.get(_clave_principal(usuario_id))
+    if valores is None:
+        valores = Usuario.objects.filter(pk=usuario_id).values_list(*CAMPOS_PRINCIPAL).first()
+        if valores is None:
+            return None
+        cache.set(_clave_principal(usuario_id), valores, SEGUNDOS_CACHE_PRINCIPAL)
+    return Usuario.from_db('default', CAMPOS_PRINCIPAL, valores)
+
+
+def invalidar_principal(usuario_id):
+    clave = _clave_principal(usuario_id)
+    cache.delete(clave)
+    transaction.on_commit(lambda: cache.delete(clave))
@@ -0,0 +1,16 @@
+"""
+Señales de autenticación: invalidan el principal en caché al modificar usuarios
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Usuario
+from .services import invalidar_principal
+
+
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+def usuario_modificado(sender, instance, **kwargs):
+    # Cubre activate, deactivate, reset_password y cambios de rol o área
+    invalidar_principal(instance.pk)
@@ -0,0 +1,146 @@
+"""
+Pruebas de revocación de refresh tokens, del principal en caché y del
+último acceso diferido
+"""
+
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import TokenRevocado, Usuario
+from . import services
+from .services import _clave_principal, obtener_principal, registrar_acceso
+from .revocacion import AlmacenRevocaciones, CLAVE_VERSION, FiltroBloom, RefreshTokenRevocable
+
+
+class FiltroBloomTestCase(TestCase):
+
+    def test_sin_falsos_negativos(self):
+        filtro = FiltroBloom(1000)
+        for i in range(1000):
+            filtro.agregar(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in filtro for i in range(1000)))
+        falsos = sum(f'otro-{i}' in filtro for i in range(10000))
+        self.assertLess(falsos, 50)
+
+
+class RevocacionTestCase(TestCase):
+    """Rotación, logout y sincronización entre procesos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_superuser(
+            email='admin@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Sistema'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def refrescar(self, refresh):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': refresh}, format='json')
+
+    def test_rotacion_revoca_el_token_anterior(self):
+        refresh = str(RefreshTokenRevocable.for_user(self.usuario))
+        respuesta = self.refrescar(refresh)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.refrescar(refresh).status_code, 401)
+        self.assertEqual(self.refrescar(respuesta.data['refresh']).status_code, 200)
+
+    def test_logout(self):
+        refresh = str(RefreshTokenRevocable.for_user(self.usuario))
+        self.client.force_authenticate(self.usuario)
+        self.client.post('/api/auth/logout/', {'refresh_token': refresh}, format='json')
+        self.assertEqual(self.refrescar(refresh).status_code, 401)
+
+    def test_revocacion_de_otro_proceso(self):
+        almacen = AlmacenRevocaciones()
+        token = RefreshTokenRevocable.for_user(self.usuario)
+        self.assertFalse(almacen.esta_revocado(token['jti']))
+
+        TokenRevocado.objects.create(jti=token['jti'], expira=timezone.now() + timedelta(days=1))
+        cache.set(CLAVE_VERSION, 'otro-proceso', None)
+        self.assertTrue(almacen.esta_revocado(token['jti']))
+
+    def test_purga_expirados(self):
+        almacen = AlmacenRevocaciones()
+        TokenRevocado.objects.create(jti='expirado', expira=timezone.now() - timedelta(minutes=1))
+        TokenRevocado.objects.create(jti='vigente', expira=timezone.now() + timedelta(days=1))
+        self.assertEqual(almacen.purgar(), 1)
+        self.assertTrue(almacen.esta_revocado('vigente'))
+        self.assertFalse(almacen.esta_revocado('expirado'))
+
+
+class PrincipalTestCase(TestCase):
+    """El principal en caché se invalida al guardar el usuario y al confirmar"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(
+            email='area@metro.gob.mx', nombre='Admin', apellidos='Área', rol='admin_area'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sin_consultas_en_caché(self):
+        obtener_principal(self.usuario.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_principal(self.usuario.pk).rol, 'admin_area')
+
+    def test_invalidacion_tras_commit(self):
+        obtener_principal(self.usuario.pk)
+        anteriores = cache.get(_clave_principal(self.usuario.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.activo = False
+            self.usuario.save()
+            self.assertIsNone(cache.get(_clave_principal(self.usuario.pk)))
+            # Otra petición lo vuelve a guardar antes del commit
+            cache.set(_clave_principal(self.usuario.pk), anteriores)
+        self.assertFalse(obtener_principal(self.usuario.pk).activo)
+
+
+class UltimoAccesoTestCase(TestCase):
+    """Los accesos pendientes se escriben con un temporizador aunque no lleguen más"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(email='uno@metro.gob.mx', nombre='Uno', apellidos='Prueba')
+        cls.otro = Usuario.objects.create_user(email='dos@metro.gob.mx', nombre='Dos', apellidos='Prueba')
+
+    def setUp(self):
+        # Sin pendientes de otras pruebas; la última escritura fue ahora
+        services._pendientes.clear()
+        services._registrados.clear()
+        services._temporizador = None
+        services._ultima_escritura = time.monotonic()
+
+    def ultimo_acceso(self, usuario):
+        return Usuario.objects.values_list('ultimo_acceso', flat=True).get(pk=usuario.pk)
+
+    def test_escritura_programada(self):
+        with mock.patch.object(services.threading, 'Timer') as temporizador:
+            self.assertTrue(registrar_acceso(self.usuario))
+            self.assertTrue(registrar_acceso(self.otro))
+        temporizador.assert_called_once()
+        espera, escribir = temporizador.call_args.args
+        self.assertLessEqual(espera, services._intervalo())
+        temporizador.return_value.start.assert_called_once_with()
+        self.assertIsNone(self.ultimo_acceso(self.usuario))
+
+        # Vence el temporizador: escribe ambos y permite programar otro
+        with mock.patch.object(services, 'connections'):
+            escribir()
+        self.assertEqual(self.ultimo_acceso(self.usuario), self.usuario.ultimo_acceso)
+        self.assertEqual(self.ultimo_acceso(self.otro), self.otro.ultimo_acceso)
+        self.assertIsNone(services._temporizador)
+
+    def test_acceso_dentro_de_la_ventana(self):
+        with mock.patch.object(services.threading, 'Timer'):
+            self.assertTrue(registrar_acceso(self.usuario))
+            self.assertFalse(registrar_acceso(self.usuario))
@@ -2,9 +2,6 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.utils import timezone
-
 from .models import Usuario
 from .serializers import (
     UsuarioSerializer,
@@ -13,6 +10,8 @@ from .serializers import (
     UsuarioCreateSerializer
 )
 from .permissions import IsSuperAdmin
+from .revocacion import RefreshTokenRevocable
+from .services import registrar_acceso
 
 
 @api_view(['POST'])
@@ -26,12 +25,11 @@ def login_view(request):
     if serializer.is_valid():
         user = serializer.validated_data['user']
         
-        # Actualizar último acceso
-        user.ultimo_acceso = timezone.now()
-        user.save(update_fields=['ultimo_acceso'])
+        # Actualizar último acceso (se escribe en lote)
+        registrar_acceso(user, inicio_sesion=True)
         
         # Generar tokens JWT
-        refresh = RefreshToken.for_user(user)
+        refresh = RefreshTokenRevocable.for_user(user)
         
         # Serializar datos del usuario
         user_data = UsuarioSerializer(user).data
@@ -51,12 +49,12 @@ def login_view(request):
 @permission_classes([IsAuthenticated])
 def logout_view(request):
     """
-    Vista de logout (opcional, principalmente para blacklist de tokens)
+    Vista de logout: revoca el refresh token hasta su expiración
     """
     try:
         refresh_token = request.data.get('refresh_token')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = RefreshTokenRevocable(refresh_token)
             token.blacklist()
         
         return Response({'detail': 'Sesión cerrada exitosamente.'}, status=status.HTTP_200_OK)
@@ -95,9 +93,7 @@ def update_last_access_view(request):
     """
     Actualizar último acceso del usuario
     """
-    user = request.user
-    user.ultimo_acceso = timezone.now()
-    user.save(update_fields=['ultimo_acceso'])
+    registrar_acceso(request.user)
     
     return Response({'detail': 'Último acceso actualizado.'}, status=status.HTTP_200_OK)
 
@@ -127,16 +127,17 @@ class CalculadoraAntiguedad:
         antiguedad = self.calcular_antiguedad(fecha_ingreso, fecha_inicio_año)
         dias_por_periodo = self.obtener_dias_por_antiguedad(antiguedad)
         
-        # Los periodos se basan en la fecha de ingreso
-        mes_ingreso = fecha_ingreso.month
-        dia_ingreso = fecha_ingreso.day
+        # Los periodos se basan en la fecha de ingreso (un ingreso en 29 de
+        # febrero cumple aniversario el 28 en los años no bisiestos)
+        aniversario = fecha_ingreso + relativedelta(years=año - fecha_ingreso.year)
+        aniversario_anterior = fecha_ingreso + relativedelta(years=año - 1 - fecha_ingreso.year)
         
         # Periodo 1: 6 meses después del aniversario anterior
-        periodo_1_inicio = date(año - 1, mes_ingreso, dia_ingreso) + relativedelta(months=6)
+        periodo_1_inicio = aniversario_anterior + relativedelta(months=6)
         periodo_1_fin = periodo_1_inicio + relativedelta(months=6) - timedelta(days=1)
         
         # Periodo 2: Del aniversario a 6 meses después
-        periodo_2_inicio = date(año, mes_ingreso, dia_ingreso)
+        periodo_2_inicio = aniversario
         periodo_2_fin = periodo_2_inicio + relativedelta(months=6) - timedelta(days=1)
         
         periodos = [
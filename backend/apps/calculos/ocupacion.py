@@ -0,0 +1,50 @@
+"""
+Cálculo de ocupación diaria (personas ausentes por día) de un área
+"""
+
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Iterable, List, Tuple
+
+
+def dias_ausencia(fecha_inicio: date, fecha_reanudar: date) -> List[date]:
+    """
+    Lista los días naturales en que el empleado está ausente
+
+    El rango es semiabierto [fecha_inicio, fecha_reanudar): el día de
+    reanudación ya es un día laborado.
+    """
+    return [
+        fecha_inicio + timedelta(days=i)
+        for i in range((fecha_reanudar - fecha_inicio).days)
+    ]
+
+
+def calcular_ocupacion_anual(rangos: Iterable[Tuple[date, date]], año: int) -> List[int]:
+    """
+    Cuenta cuántas personas están ausentes en cada día del año
+
+    Usa un arreglo de diferencias: cada rango suma 1 en su primer día y resta 1
+    en su día de reanudación, y la suma acumulada da el conteo diario. El costo
+    es O(rangos + días del año) sin importar la duración de cada rango.
+
+    Args:
+        rangos: Pares (fecha_inicio, fecha_reanudar) de solicitudes aprobadas
+        año: Año a calcular
+
+    Returns:
+        Lista con un conteo por día, empezando el 1 de enero
+    """
+    inicio_año = date(año, 1, 1)
+    total_dias = (date(año + 1, 1, 1) - inicio_año).days
+    diferencias = [0] * (total_dias + 1)
+
+    for fecha_inicio, fecha_reanudar in rangos:
+        desde = max((fecha_inicio - inicio_año).days, 0)
+        hasta = min((fecha_reanudar - inicio_año).days, total_dias)
+        if desde >= hasta:
+            continue
+        diferencias[desde] += 1
+        diferencias[hasta] -= 1
+
+    return list(accumulate(diferencias[:total_dias]))
@@ -0,0 +1,136 @@
+"""
+Tabla precalculada de periodos vacacionales por empleado
+
+Los periodos de un empleado dependen solo de su fecha de ingreso y de la
+tabla de antigüedad, por lo que se calculan una vez y se guardan en
+PeriodoEmpleado en lugar de rehacer la aritmética de fechas en cada
+consulta. Se generan desde el primer periodo elegible (el 1 del año
+siguiente al ingreso) hasta AÑOS_ADELANTE años después del actual.
+
+La validación de solicitudes y el generador de datos sintéticos leen el
+periodo de una fecha de esta tabla (periodo_en_fecha, buscar_periodo).
+
+Se regeneran:
+- al guardar un empleado (señal) o al importarlos por lotes
+- al cambiar la tabla de antigüedad (en segundo plano, todos)
+- cada año con generar_periodos_empleados, para extender el horizonte
+"""
+
+from bisect import bisect_right
+from datetime import date
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+
+from apps.configuracion.services import obtener_config_calculos
+from apps.empleados.models import Empleado, PeriodoEmpleado
+from utils import tareas
+from .antiguedad import CalculadoraAntiguedad
+
+AÑOS_ADELANTE = 2
+TAMAÑO_LOTE = 2000
+
+
+def calcular_periodos(fecha_ingreso: date, hasta_año: int,
+                      calculadora: Optional[CalculadoraAntiguedad] = None) -> List[Dict]:
+    """Periodos de un ingreso desde el primero elegible hasta hasta_año (inclusive)"""
+    calculadora = calculadora or CalculadoraAntiguedad(obtener_config_calculos())
+    return [
+        periodo
+        for año in range(fecha_ingreso.year + 1, hasta_año + 1)
+        for periodo in calculadora.calcular_periodos_disponibles(fecha_ingreso, año)
+    ]
+
+
+def generar_periodos_empleados(empleados: Iterable[Empleado], años_adelante: int = AÑOS_ADELANTE) -> int:
+    """
+    Reconstruye los periodos de los empleados indicados
+
+    Args:
+        empleados: Instancias guardadas (con id y fecha_ingreso)
+        años_adelante: Años a generar después del actual
+
+    Returns:
+        Número de periodos escritos
+    """
+    empleados = list(empleados)
+    if not empleados:
+        return 0
+    calculadora = CalculadoraAntiguedad(obtener_config_calculos())
+    hasta_año = date.today().year + años_adelante
+    # Los empleados con el mismo ingreso comparten periodos
+    por_ingreso = {}
+    renglones = []
+    for empleado in empleados:
+        periodos = por_ingreso.get(empleado.fecha_ingreso)
+        if periodos is None:
+            periodos = por_ingreso[empleado.fecha_ingreso] = calcular_periodos(
+                empleado.fecha_ingreso, hasta_año, calculadora
+            )
+        renglones.extend(
+            PeriodoEmpleado(
+                empleado_id=empleado.id,
+                periodo=periodo['periodo'],
+                fecha_inicio=periodo['fecha_inicio'],
+                fecha_fin=periodo['fecha_fin'],
+                dias_otorgados=periodo['dias_otorgados'],
+            )
+            for periodo in periodos
+        )
+    with transaction.atomic():
+        PeriodoEmpleado.objects.filter(empleado_id__in=[e.id for e in empleados]).delete()
+        PeriodoEmpleado.objects.bulk_create(renglones, batch_size=TAMAÑO_LOTE)
+    return len(renglones)
+
+
+def regenerar_todos(años_adelante: int = AÑOS_ADELANTE, tamaño_lote: int = TAMAÑO_LOTE) -> int:
+    """Reconstruye los periodos de todos los empleados en lotes (recorrido por llave)"""
+    total = 0
+    ultimo_id = 0
+    while True:
+        lote = list(
+            Empleado.objects.filter(id__gt=ultimo_id).order_by('id').only('id', 'fecha_ingreso')[:tamaño_lote]
+        )
+        if not lote:
+            return total
+        total += generar_periodos_empleados(lote, años_adelante)
+        ultimo_id = lote[-1].id
+
+
+def encolar_regeneracion():
+    """
+    Regenera todos los periodos en segundo plano al confirmarse la transacción
+
+    Si ya hay una regeneración en curso, se repite al terminar: la que corre
+    pudo haber leído la tabla anterior.
+    """
+    transaction.on_commit(lambda: tareas.encolar_o_repetir('periodos_empleados', regenerar_todos))
+
+
+def periodo_en_fecha(empleado_id: int, fecha: date) -> Optional[PeriodoEmpleado]:
+    """Periodo del empleado que contiene la fecha (una consulta sobre el índice), o None"""
+    return (
+        PeriodoEmpleado.objects.filter(empleado_id=empleado_id, fecha_inicio__lte=fecha, fecha_fin__gte=fecha)
+        .order_by('-fecha_inicio')
+        .first()
+    )
+
+
+def periodos_por_empleado(empleado_ids: Iterable[int], desde: date, hasta: date) -> Dict[int, List[PeriodoEmpleado]]:
+    """Periodos de los empleados que se cruzan con [desde, hasta], por fecha_inicio (una consulta)"""
+    periodos = {}
+    consulta = PeriodoEmpleado.objects.filter(
+        empleado_id__in=list(empleado_ids), fecha_inicio__lte=hasta, fecha_fin__gte=desde
+    ).order_by('empleado_id', 'fecha_inicio')
+    for periodo in consulta:
+        periodos.setdefault(periodo.empleado_id, []).append(periodo)
+    return periodos
+
+
+def buscar_periodo(periodos: List[PeriodoEmpleado], fecha: date) -> Optional[PeriodoEmpleado]:
+    """Periodo que contiene la fecha en una lista ordenada por fecha_inicio (como periodo_en_fecha)"""
+    indice = bisect_right(periodos, fecha, key=attrgetter('fecha_inicio')) - 1
+    if indice < 0 or periodos[indice].fecha_fin < fecha:
+        return None
+    return periodos[indice]
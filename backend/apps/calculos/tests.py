@@ -0,0 +1,173 @@
+"""
+Pruebas del cálculo de ocupación diaria y de periodos vacacionales
+"""
+
+from datetime import date, timedelta
+from unittest import mock
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.areas.models import Area
+from apps.empleados import signals
+from apps.empleados.models import Empleado, PeriodoEmpleado
+from utils import tareas
+from . import periodos
+from .antiguedad import CalculadoraAntiguedad
+from .ocupacion import calcular_ocupacion_anual, dias_ausencia
+
+
+class OcupacionAnualTestCase(SimpleTestCase):
+    """Conteo de ausentes por día con rangos semiabiertos [fecha_inicio, fecha_reanudar)"""
+
+    def test_dias_del_año(self):
+        self.assertEqual(len(calcular_ocupacion_anual([], 2025)), 365)
+        self.assertEqual(len(calcular_ocupacion_anual([], 2024)), 366)
+
+    def test_rango_semiabierto(self):
+        ocupacion = calcular_ocupacion_anual([(date(2025, 1, 6), date(2025, 1, 9))], 2025)
+        self.assertEqual(ocupacion[4:9], [0, 1, 1, 1, 0])
+        self.assertEqual(sum(ocupacion), len(dias_ausencia(date(2025, 1, 6), date(2025, 1, 9))))
+
+    def test_rangos_encimados(self):
+        rangos = [
+            (date(2025, 3, 3), date(2025, 3, 8)),
+            (date(2025, 3, 5), date(2025, 3, 10)),
+            (date(2025, 3, 8), date(2025, 3, 9)),
+        ]
+        ocupacion = calcular_ocupacion_anual(rangos, 2025)
+        inicio = (date(2025, 3, 2) - date(2025, 1, 1)).days
+        self.assertEqual(ocupacion[inicio:inicio + 9], [0, 1, 1, 2, 2, 2, 2, 1, 0])
+
+    def test_rangos_que_cruzan_el_año(self):
+        rangos = [
+            (date(2024, 12, 28), date(2025, 1, 3)),
+            (date(2025, 12, 30), date(2026, 1, 5)),
+            (date(2024, 1, 1), date(2024, 12, 31)),
+            (date(2026, 1, 1), date(2026, 2, 1)),
+        ]
+        ocupacion = calcular_ocupacion_anual(rangos, 2025)
+        self.assertEqual(ocupacion[:3], [1, 1, 0])
+        self.assertEqual(ocupacion[-3:], [0, 1, 1])
+        self.assertEqual(sum(ocupacion), 4)
+
+    def test_rango_vacio(self):
+        ocupacion = calcular_ocupacion_anual([(date(2025, 5, 5), date(2025, 5, 5))], 2025)
+        self.assertEqual(sum(ocupacion), 0)
+
+
+class PeriodosDisponiblesTestCase(SimpleTestCase):
+    """Periodos a partir del aniversario de ingreso"""
+
+    def setUp(self):
+        self.calculadora = CalculadoraAntiguedad()
+
+    def fechas(self, fecha_ingreso, año):
+        return [
+            (periodo['fecha_inicio'], periodo['fecha_fin'])
+            for periodo in self.calculadora.calcular_periodos_disponibles(fecha_ingreso, año)
+        ]
+
+    def test_ingreso_29_de_febrero_en_año_no_bisiesto(self):
+        self.assertEqual(self.fechas(date(2020, 2, 29), 2023), [
+            (date(2022, 8, 28), date(2023, 2, 27)),
+            (date(2023, 2, 28), date(2023, 8, 27)),
+        ])
+        # El año anterior es bisiesto: el periodo 1 parte del 29 de febrero
+        self.assertEqual(self.fechas(date(2020, 2, 29), 2025), [
+            (date(2024, 8, 29), date(2025, 2, 27)),
+            (date(2025, 2, 28), date(2025, 8, 27)),
+        ])
+
+    def test_ingreso_29_de_febrero_en_año_bisiesto(self):
+        self.assertEqual(self.fechas(date(2020, 2, 29), 2024)[1], (date(2024, 2, 29), date(2024, 8, 28)))
+
+    def test_fechas_de_años_no_bisiestos_sin_cambio(self):
+        """Fuera del 29 de febrero coincide con el cálculo por fecha(año, mes, día)"""
+        ingreso = date(2015, 1, 1)
+        while ingreso.year == 2015:
+            for año in (2019, 2024, 2025):
+                inicio_1 = date(año - 1, ingreso.month, ingreso.day) + relativedelta(months=6)
+                inicio_2 = date(año, ingreso.month, ingreso.day)
+                self.assertEqual(self.fechas(ingreso, año), [
+                    (inicio_1, inicio_1 + relativedelta(months=6) - timedelta(days=1)),
+                    (inicio_2, inicio_2 + relativedelta(months=6) - timedelta(days=1)),
+                ])
+            ingreso += timedelta(days=1)
+
+
+@override_settings(TAREAS_SINCRONAS=True)
+class RegeneracionPeriodosTestCase(TestCase):
+    """Un cambio de la tabla durante una regeneración en curso no se pierde"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repite_al_terminar_la_regeneracion_en_curso(self):
+        with mock.patch.object(periodos, 'regenerar_todos') as regenerar:
+            # Regeneración en curso en otro proceso
+            self.assertTrue(cache.add('tareas:periodos_empleados', {'estado': tareas.EN_PROCESO, 'detalle': ''}))
+            with self.captureOnCommitCallbacks(execute=True):
+                periodos.encolar_regeneracion()
+            regenerar.assert_not_called()
+
+            # Termina la regeneración en curso y se repite con la tabla nueva
+            tareas._ejecutar('periodos_empleados', regenerar, (), {})
+            self.assertEqual(regenerar.call_count, 2)
+        self.assertIsNone(tareas.estado('periodos_empleados'))
+
+    def test_sin_regeneracion_en_curso(self):
+        with mock.patch.object(periodos, 'regenerar_todos') as regenerar:
+            with self.captureOnCommitCallbacks(execute=True):
+                periodos.encolar_regeneracion()
+            regenerar.assert_called_once_with()
+
+
+class PeriodosEmpleadoTestCase(TestCase):
+    """Tabla precalculada de periodos: generación, señal y búsqueda por fecha"""
+
+    @classmethod
+    def setUpTestData(cls):
+        area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        cls.empleado = Empleado.objects.create(
+            area=area, numero_expediente='1001', nombre='Nombre', apellidos='Apellidos',
+            fecha_ingreso=date(2015, 3, 10),
+        )
+
+    def test_genera_desde_el_primer_periodo_elegible(self):
+        guardados = list(self.empleado.periodos.order_by('fecha_inicio').values(
+            'periodo', 'fecha_inicio', 'fecha_fin', 'dias_otorgados'
+        ))
+        esperados = periodos.calcular_periodos(date(2015, 3, 10), date.today().year + periodos.AÑOS_ADELANTE)
+        self.assertEqual(guardados, [
+            {campo: periodo[campo] for campo in ('periodo', 'fecha_inicio', 'fecha_fin', 'dias_otorgados')}
+            for periodo in esperados
+        ])
+        self.assertEqual((guardados[0]['periodo'], guardados[0]['fecha_inicio']), ('2016-1', date(2015, 9, 10)))
+
+    def test_periodo_en_fecha(self):
+        lista = periodos.periodos_por_empleado([self.empleado.id], date(2015, 1, 1), date(2021, 12, 31))[self.empleado.id]
+        casos = [
+            (date(2015, 9, 9), None),
+            (date(2015, 9, 10), '2016-1'),
+            (date(2020, 3, 9), '2020-1'),
+            (date(2020, 3, 10), '2020-2'),
+            (date(2020, 9, 10), '2021-1'),
+        ]
+        for fecha, esperado in casos:
+            periodo = periodos.periodo_en_fecha(self.empleado.id, fecha)
+            self.assertEqual(periodo.periodo if periodo else None, esperado, fecha)
+            periodo = periodos.buscar_periodo(lista, fecha)
+            self.assertEqual(periodo.periodo if periodo else None, esperado, fecha)
+
+    def test_señal_solo_regenera_al_cambiar_el_ingreso(self):
+        with mock.patch.object(signals, 'generar_periodos_empleados') as generar:
+            self.empleado.nombre = 'Otro'
+            self.empleado.save()
+            generar.assert_not_called()
+
+        self.empleado.fecha_ingreso = date(2016, 3, 10)
+        self.empleado.save()
+        self.assertEqual(self.empleado.periodos.order_by('fecha_inicio').first().periodo, '2017-1')
+        self.assertFalse(self.empleado.periodos.filter(periodo='2016-1').exists())
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class CatalogosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.catalogos'
-    verbose_name = 'Catálogos'
\ No newline at end of file
+    verbose_name = 'Catálogos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
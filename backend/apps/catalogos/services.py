@@ -0,0 +1,15 @@
+"""
+Versión en caché de los catálogos
+
+Las lecturas de catálogos se sirven desde utils.cache_condicional; al
+guardar o borrar cualquier catálogo (o cambiar sus requisitos) la versión
+del grupo cambia y las respuestas anteriores dejan de usarse.
+"""
+
+from utils.cache_condicional import invalidar_version
+
+GRUPO_CACHE = 'catalogos'
+
+
+def invalidar_catalogos():
+    invalidar_version(GRUPO_CACHE)
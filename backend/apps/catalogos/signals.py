@@ -0,0 +1,23 @@
+"""
+Señales de catálogos: invalidan las respuestas en caché al modificar un catálogo
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Firmante, Requisito, TipoDiaEconomico, TipoVacacion
+from .services import invalidar_catalogos
+
+
+@receiver(post_save, sender=Firmante)
+@receiver(post_delete, sender=Firmante)
+@receiver(post_save, sender=Requisito)
+@receiver(post_delete, sender=Requisito)
+@receiver(post_save, sender=TipoDiaEconomico)
+@receiver(post_delete, sender=TipoDiaEconomico)
+@receiver(post_save, sender=TipoVacacion)
+@receiver(post_delete, sender=TipoVacacion)
+@receiver(m2m_changed, sender=TipoDiaEconomico.requisitos.through)
+@receiver(m2m_changed, sender=TipoVacacion.requisitos.through)
+def catalogo_modificado(sender, **kwargs):
+    invalidar_catalogos()
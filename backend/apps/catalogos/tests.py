@@ -0,0 +1,58 @@
+"""
+Pruebas de las lecturas de catálogos con GET condicional
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.models import Usuario
+from .models import TipoVacacion
+
+
+class CatalogosCondicionalTestCase(TestCase):
+    """ETag, 304 e invalidación de la versión de catálogos"""
+
+    URL = '/api/catalogos/tipos-vacacion/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_superuser(
+            email='admin@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Sistema'
+        )
+        cls.tipo = TipoVacacion.objects.create(nombre='Vacaciones Regulares', codigo='VAC_REG')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def test_etag_y_304(self):
+        respuesta = self.client.get(self.URL)
+        self.assertEqual(respuesta.status_code, 200)
+        etag = respuesta['ETag']
+
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta['ETag'], etag)
+
+        respuesta = self.client.get(self.URL, HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_escritura_cambia_el_etag(self):
+        etag = self.client.get(self.URL)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            TipoVacacion.objects.create(nombre='Vacaciones Extraordinarias', codigo='VAC_EXT')
+
+        respuesta = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+        self.assertEqual(respuesta.data['count'], 2)
+
+    def test_retrieve_inexistente_es_404(self):
+        etag = self.client.get(f'{self.URL}{self.tipo.id}/')['ETag']
+        respuesta = self.client.get(f'{self.URL}{self.tipo.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        respuesta = self.client.get(f'{self.URL}999999/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 404)
@@ -1,9 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import views
 
 router = DefaultRouter()
-# ViewSets se registrarán en views.py
+router.register(r'firmantes', views.FirmanteViewSet, basename='firmante')
+router.register(r'requisitos', views.RequisitoViewSet, basename='requisito')
+router.register(r'tipos-dia-economico', views.TipoDiaEconomicoViewSet, basename='tipo-dia-economico')
+router.register(r'tipos-vacacion', views.TipoVacacionViewSet, basename='tipo-vacacion')
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
@@ -1,19 +1,30 @@
 from rest_framework import viewsets
+
+from apps.authentication.mixins import AreaScopedMixin
+from utils.cache_condicional import CacheCondicionalMixin
 from .models import *
 from .serializers import *
+from .services import GRUPO_CACHE
 
-class FirmanteViewSet(viewsets.ModelViewSet):
-    queryset = Firmante.objects.all()
+class FirmanteViewSet(AreaScopedMixin, CacheCondicionalMixin, viewsets.ModelViewSet):
+    queryset = Firmante.objects.order_by('id')
     serializer_class = FirmanteSerializer
+    grupo_cache = GRUPO_CACHE
 
-class RequisitoViewSet(viewsets.ModelViewSet):
-    queryset = Requisito.objects.all()
+class RequisitoViewSet(AreaScopedMixin, CacheCondicionalMixin, viewsets.ModelViewSet):
+    queryset = Requisito.objects.order_by('id')
     serializer_class = RequisitoSerializer
+    incluir_globales = True
+    grupo_cache = GRUPO_CACHE
 
-class TipoDiaEconomicoViewSet(viewsets.ModelViewSet):
-    queryset = TipoDiaEconomico.objects.all()
+class TipoDiaEconomicoViewSet(AreaScopedMixin, CacheCondicionalMixin, viewsets.ModelViewSet):
+    queryset = TipoDiaEconomico.objects.prefetch_related('requisitos').order_by('id')
     serializer_class = TipoDiaEconomicoSerializer
+    incluir_globales = True
+    grupo_cache = GRUPO_CACHE
 
-class TipoVacacionViewSet(viewsets.ModelViewSet):
-    queryset = TipoVacacion.objects.all()
+class TipoVacacionViewSet(AreaScopedMixin, CacheCondicionalMixin, viewsets.ModelViewSet):
+    queryset = TipoVacacion.objects.prefetch_related('requisitos').order_by('id')
     serializer_class = TipoVacacionSerializer
+    incluir_globales = True
+    grupo_cache = GRUPO_CACHE
@@ -4,4 +4,11 @@ from django.apps import AppConfig
 class ConfiguracionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.configuracion'
-    verbose_name = 'Configuración'
\ No newline at end of file
+    verbose_name = 'Configuración'
+
+    def ready(self):
+        from utils import checks, conexiones  # noqa: F401
+        from . import signals  # noqa: F401
+
+        # También aplica a comandos, sin depender del orden de MIDDLEWARE
+        conexiones.instalar()
@@ -26,6 +26,7 @@ class ReglaArea(models.Model):
         ('prorroga', 'Prórroga'),
         ('dias_anticipacion', 'Días de anticipación'),
         ('taquilla_validacion', 'Taquilla validación'),
+        ('capacidad_diaria', 'Capacidad diaria'),
     ]
 
     id = models.AutoField(primary_key=True)
@@ -0,0 +1,321 @@
+"""
+Motor de reglas por área
+
+Compila las ReglaArea activas de un área en objetos evaluadores que se
+guardan en memoria por proceso. Cada área tiene una versión en el caché de
+Django; al guardar o borrar una regla la versión cambia y el motor se vuelve
+a compilar en la siguiente consulta.
+"""
+
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.calculos.antiguedad import CalculadoraAntiguedad
+from .models import ConfigGlobal, ReglaArea
+
+
+# Claves de ConfigGlobal que usan los cálculos de vacaciones
+CLAVES_CALCULO = (
+    'tabla_antiguedad',
+    'meses_para_primera_solicitud',
+    'dias_acumulables_max',
+    'dias_festivos',
+)
+
+
+def _valor_simple(valor, llave):
+    """Los valores escalares se guardan como {'dias': 24} o directamente como 24"""
+    if isinstance(valor, dict):
+        return valor.get(llave)
+    return valor
+
+
+CLAVE_CACHE_CALCULOS = 'config_global:calculos'
+# Vida máxima en caché, por si algún cambio no pasa por save() (p. ej. update())
+SEGUNDOS_CACHE_CALCULOS = 600
+
+
+def invalidar_config_calculos():
+    """
+    Descarta la configuración de cálculos en caché (al cambiar ConfigGlobal)
+
+    Se borra al guardar y otra vez al confirmarse la transacción, por si otra
+    petición la volvió a leer antes del commit.
+    """
+    cache.delete(CLAVE_CACHE_CALCULOS)
+    transaction.on_commit(lambda: cache.delete(CLAVE_CACHE_CALCULOS))
+
+
+def obtener_config_calculos() -> Dict:
+    """
+    Obtiene la configuración global de los cálculos desde el caché
+
+    En caso de no estar en caché la lee en una sola consulta.
+
+    Returns:
+        Diccionario compatible con CalculadoraAntiguedad, más 'dias_festivos'
+        como conjunto de fechas
+    """
+    config = cache.get(CLAVE_CACHE_CALCULOS)
+    if config is None:
+        config = _leer_config_calculos()
+        cache.set(CLAVE_CACHE_CALCULOS, config, SEGUNDOS_CACHE_CALCULOS)
+    return config
+
+
+def _leer_config_calculos() -> Dict:
+    valores = dict(
+        ConfigGlobal.objects.filter(clave__in=CLAVES_CALCULO).values_list('clave', 'valor')
+    )
+
+    config = CalculadoraAntiguedad().config.copy()
+    config['dias_festivos'] = set()
+    if valores.get('tabla_antiguedad'):
+        config['tabla_antiguedad'] = valores['tabla_antiguedad']
+    if 'meses_para_primera_solicitud' in valores:
+        config['meses_para_primera_solicitud'] = int(_valor_simple(valores['meses_para_primera_solicitud'], 'meses'))
+    if 'dias_acumulables_max' in valores:
+        config['dias_acumulables_max'] = int(_valor_simple(valores['dias_acumulables_max'], 'dias'))
+    if valores.get('dias_festivos'):
+        config['dias_festivos'] = {date.fromisoformat(f) for f in valores['dias_festivos']}
+
+    return config
+
+
+class Evaluador:
+    """
+    Evaluador base: interpreta la configuración una sola vez al compilar
+
+    El contexto de evaluación es un diccionario con las llaves:
+        empleado, fecha_solicitud, fecha_inicio, fecha_reanudar,
+        fecha_fin_periodo (opcional) y dias_descanso (set de fechas, opcional)
+    """
+
+    tipo_regla = None
+    # False si la regla no se evalúa por solicitud (p. ej. capacidad diaria)
+    por_solicitud = True
+
+    def __init__(self, regla_id: Optional[int], configuracion: Dict):
+        self.regla_id = regla_id
+        self.clave = f'{self.tipo_regla}:{regla_id}'
+        self.evaluaciones = 0
+        self.tiempo_total = 0.0
+
+    def evaluar(self, contexto: Dict) -> List[tuple]:
+        """Retorna una lista de tuplas (nivel, mensaje); nivel es 'error' o 'warning'"""
+        raise NotImplementedError
+
+    def estadisticas(self) -> Dict:
+        """Tiempos acumulados del evaluador"""
+        return {
+            'regla_id': self.regla_id,
+            'tipo_regla': self.tipo_regla,
+            'evaluaciones': self.evaluaciones,
+            'tiempo_total_ms': round(self.tiempo_total * 1000, 3),
+            'tiempo_promedio_us': round(self.tiempo_total / self.evaluaciones * 1e6, 3) if self.evaluaciones else 0,
+        }
+
+
+class EvaluadorDiasAnticipacion(Evaluador):
+    """Exige un mínimo de días entre la fecha de solicitud y la de inicio"""
+
+    tipo_regla = 'dias_anticipacion'
+
+    def __init__(self, regla_id, configuracion):
+        super().__init__(regla_id, configuracion)
+        self.dias = int(configuracion.get('dias', 30))
+        self.nivel = 'warning' if configuracion.get('solo_advertencia') else 'error'
+
+    def evaluar(self, contexto):
+        anticipacion = (contexto['fecha_inicio'] - contexto['fecha_solicitud']).days
+        if anticipacion < self.dias:
+            return [(self.nivel, f"Debe solicitarse con al menos {self.dias} días de anticipación")]
+        return []
+
+
+class EvaluadorProrroga(Evaluador):
+    """Permite usar días de un periodo vencido dentro de la prórroga del área"""
+
+    tipo_regla = 'prorroga'
+
+    def __init__(self, regla_id, configuracion):
+        super().__init__(regla_id, configuracion)
+        self.prorroga = timedelta(days=int(configuracion.get('dias', 30)))
+
+    def evaluar(self, contexto):
+        fecha_fin_periodo = contexto.get('fecha_fin_periodo')
+        if fecha_fin_periodo is None or contexto['fecha_inicio'] <= fecha_fin_periodo:
+            return []
+        limite = fecha_fin_periodo + self.prorroga
+        if contexto['fecha_inicio'] <= limite:
+            return [('warning', f"Se usa la prórroga del periodo (vence el {limite.strftime('%d/%m/%Y')})")]
+        return [('error', f"El periodo y su prórroga vencieron el {limite.strftime('%d/%m/%Y')}")]
+
+
+class EvaluadorTaquilla(Evaluador):
+    """Detecta conflictos con los días de descanso rolados del personal de taquilla"""
+
+    tipo_regla = 'taquilla_validacion'
+
+    def __init__(self, regla_id, configuracion):
+        super().__init__(regla_id, configuracion)
+        self.nivel = 'error' if configuracion.get('bloquear_conflictos') else 'warning'
+
+    def evaluar(self, contexto):
+        descansos = contexto.get('dias_descanso')
+        if not contexto['empleado'].es_taquilla or not descansos:
+            return []
+        inicio, reanudar = contexto['fecha_inicio'], contexto['fecha_reanudar']
+        # Rango semiabierto: el día de reanudación ya es laborado
+        conflictos = sorted(d for d in descansos if inicio <= d < reanudar)
+        if conflictos:
+            fechas = ', '.join(d.strftime('%d/%m/%Y') for d in conflictos)
+            return [(self.nivel, f"Conflicto con días de descanso rolados: {fechas}")]
+        return []
+
+
+class EvaluadorCapacidad(Evaluador):
+    """
+    Límite de personas ausentes por día en un ámbito del área
+
+    No produce resultados por sí mismo: la validación necesita los contadores
+    de ocupación (ver apps.solicitudes.services.verificar_capacidad).
+    """
+
+    tipo_regla = 'capacidad_diaria'
+    por_solicitud = False
+    CAMPOS = ('linea_metro', 'turno')
+
+    def __init__(self, regla_id, configuracion):
+        super().__init__(regla_id, configuracion)
+        self.ambito = configuracion.get('ambito', 'area')
+        self.valor = configuracion.get('valor')
+        maximo = configuracion.get('max_ausentes')
+        self.max_ausentes = int(maximo) if maximo is not None else None
+
+    def ambito_para(self, empleado) -> Optional[str]:
+        """Llave de ocupación que limita esta regla para el empleado, o None"""
+        if self.max_ausentes is None:
+            return None
+        if self.ambito == 'area':
+            return 'area'
+        if self.ambito == 'taquilla':
+            return 'taquilla' if empleado.es_taquilla else None
+        if self.ambito in self.CAMPOS:
+            actual = getattr(empleado, self.ambito)
+            if actual and (not self.valor or self.valor == actual):
+                return f'{self.ambito}:{actual}'
+        return None
+
+    def evaluar(self, contexto):
+        return []
+
+
+EVALUADORES = {
+    clase.tipo_regla: clase
+    for clase in (EvaluadorDiasAnticipacion, EvaluadorProrroga, EvaluadorTaquilla, EvaluadorCapacidad)
+}
+
+
+class MotorReglas:
+    """
+    Conjunto de evaluadores compilados para un área
+    """
+
+    def __init__(self, evaluadores: List[Evaluador], version: Optional[str] = None):
+        self.evaluadores = evaluadores
+        self.por_solicitud = [e for e in evaluadores if e.por_solicitud]
+        self.version = version
+
+    @classmethod
+    def compilar(cls, reglas: Iterable[ReglaArea], version: Optional[str] = None) -> 'MotorReglas':
+        """
+        Crea los evaluadores a partir de reglas (se ignoran tipos desconocidos)
+
+        Args:
+            reglas: Instancias de ReglaArea activas
+            version: Versión de las reglas del área al momento de compilar
+        """
+        evaluadores = []
+        for regla in reglas:
+            clase = EVALUADORES.get(regla.tipo_regla)
+            if clase is not None:
+                evaluadores.append(clase(regla.id, regla.configuracion or {}))
+        return cls(evaluadores, version)
+
+    def evaluar(self, contexto: Dict) -> Dict:
+        """
+        Ejecuta todos los evaluadores sobre una solicitud en una sola pasada
+
+        Returns:
+            Diccionario con listas de 'errores' y 'advertencias', y 'tiempos'
+            en microsegundos por regla ('tipo_regla:id')
+        """
+        errores, advertencias, tiempos = [], [], {}
+        reloj = time.perf_counter
+        for evaluador in self.por_solicitud:
+            inicio = reloj()
+            resultados = evaluador.evaluar(contexto)
+            transcurrido = reloj() - inicio
+
+            evaluador.evaluaciones += 1
+            evaluador.tiempo_total += transcurrido
+            tiempos[evaluador.clave] = transcurrido * 1e6
+
+            for nivel, mensaje in resultados:
+                destino = errores if nivel == 'error' else advertencias
+                destino.append({'regla': evaluador.tipo_regla, 'mensaje': mensaje})
+
+        return {'errores': errores, 'advertencias': advertencias, 'tiempos': tiempos}
+
+    def limites_capacidad(self, empleado) -> Dict[str, int]:
+        """Máximo de ausentes por ámbito que aplica al empleado (el más restrictivo)"""
+        limites = {}
+        for evaluador in self.evaluadores:
+            if isinstance(evaluador, EvaluadorCapacidad):
+                ambito = evaluador.ambito_para(empleado)
+                if ambito is not None:
+                    limites[ambito] = min(evaluador.max_ausentes, limites.get(ambito, evaluador.max_ausentes))
+        return limites
+
+    def estadisticas(self) -> List[Dict]:
+        return [evaluador.estadisticas() for evaluador in self.evaluadores]
+
+
+# Motores compilados en este proceso: {area_id: MotorReglas}
+_motores: Dict[int, MotorReglas] = {}
+
+
+def _clave_version(area_id: int) -> str:
+    return f'reglas_area:{area_id}:version'
+
+
+def invalidar_reglas_area(area_id: int):
+    """Cambia la versión de las reglas del área para forzar su recompilación"""
+    cache.set(_clave_version(area_id), uuid.uuid4().hex, None)
+
+
+def obtener_motor_reglas(area_id: int) -> MotorReglas:
+    """
+    Obtiene el motor compilado de un área
+
+    Solo consulta la base de datos cuando la versión en caché no coincide con
+    la del motor guardado en este proceso.
+    """
+    clave = _clave_version(area_id)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, uuid.uuid4().hex, None)
+        version = cache.get(clave)
+
+    motor = _motores.get(area_id)
+    if motor is None or motor.version != version:
+        reglas = ReglaArea.objects.filter(area_id=area_id, activo=True).order_by('id')
+        motor = MotorReglas.compilar(reglas, version)
+        _motores[area_id] = motor
+    return motor
@@ -0,0 +1,29 @@
+"""
+Señales de configuración: invalidan los cachés al cambiar reglas o configuración global
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.calculos.periodos import encolar_regeneracion
+from .models import ConfigGlobal, ReglaArea
+from .services import CLAVES_CALCULO, invalidar_config_calculos, invalidar_reglas_area
+
+
+@receiver(post_save, sender=ReglaArea)
+@receiver(post_delete, sender=ReglaArea)
+def regla_area_modificada(sender, instance, **kwargs):
+    # Tras el commit, para que ningún proceso compile las reglas previas con la versión nueva
+    area_id = instance.area_id
+    transaction.on_commit(lambda: invalidar_reglas_area(area_id))
+
+
+@receiver(post_save, sender=ConfigGlobal)
+@receiver(post_delete, sender=ConfigGlobal)
+def config_global_modificada(sender, instance, **kwargs):
+    if instance.clave in CLAVES_CALCULO:
+        invalidar_config_calculos()
+    if instance.clave == 'tabla_antiguedad':
+        # Los días de cada periodo dependen de la tabla
+        encolar_regeneracion()
@@ -0,0 +1,105 @@
+"""
+Pruebas del motor de reglas por área y de la revisión del caché compartido
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.areas.models import Area
+from utils.checks import revisar_cache_compartido
+from . import services
+from .models import ConfigGlobal, ReglaArea
+from .services import CLAVE_CACHE_CALCULOS, EvaluadorTaquilla, obtener_config_calculos, obtener_motor_reglas
+
+
+class TaquillaTestCase(SimpleTestCase):
+    """Los descansos rolados se comparan con el rango semiabierto [fecha_inicio, fecha_reanudar)"""
+
+    def evaluar(self, descansos):
+        contexto = {
+            'empleado': SimpleNamespace(es_taquilla=True),
+            'fecha_inicio': date(2025, 1, 6), 'fecha_reanudar': date(2025, 1, 9),
+            'dias_descanso': descansos,
+        }
+        return EvaluadorTaquilla(1, {}).evaluar(contexto)
+
+    def test_descanso_dentro_del_rango(self):
+        self.assertEqual(self.evaluar({date(2025, 1, 6)})[0][0], 'warning')
+        self.assertEqual(len(self.evaluar({date(2025, 1, 8)})), 1)
+
+    def test_dia_de_reanudacion_no_es_conflicto(self):
+        self.assertEqual(self.evaluar({date(2025, 1, 9), date(2025, 1, 5)}), [])
+
+
+class VersionReglasTestCase(TestCase):
+    """La versión de las reglas del área cambia al confirmarse la transacción"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+
+    def setUp(self):
+        cache.clear()
+        services._motores.clear()
+
+    def test_invalidacion_tras_commit(self):
+        motor = obtener_motor_reglas(self.area.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            ReglaArea.objects.create(area=self.area, tipo_regla='taquilla_validacion', configuracion={})
+            self.assertIs(obtener_motor_reglas(self.area.id), motor)
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        nuevo = obtener_motor_reglas(self.area.id)
+        self.assertNotEqual(nuevo.version, motor.version)
+        self.assertEqual(len(nuevo.evaluadores), 1)
+
+
+class ConfigCalculosTestCase(TestCase):
+    """La configuración de cálculos en caché se descarta al guardar y al confirmar"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidacion_tras_commit(self):
+        self.assertEqual(obtener_config_calculos()['dias_acumulables_max'], 24)
+        anterior = cache.get(CLAVE_CACHE_CALCULOS)
+        with self.captureOnCommitCallbacks(execute=True):
+            ConfigGlobal.objects.create(clave='dias_acumulables_max', valor={'dias': 30})
+            self.assertIsNone(cache.get(CLAVE_CACHE_CALCULOS))
+            # Otra petición la vuelve a guardar antes del commit
+            cache.set(CLAVE_CACHE_CALCULOS, anterior)
+        self.assertEqual(obtener_config_calculos()['dias_acumulables_max'], 30)
+
+
+class CacheCompartidoTestCase(SimpleTestCase):
+    """Fuera de DEBUG, o con réplica, se exige un caché compartido entre procesos"""
+
+    LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://redis:6379/1'}}
+    SIN_REPLICA = {'default': settings.DATABASES['default']}
+
+    def revisar(self, **opciones):
+        opciones.setdefault('DATABASES', self.SIN_REPLICA)
+        with override_settings(PRUEBAS=False, **opciones):
+            return [e.id for e in revisar_cache_compartido(None)]
+
+    def test_locmem_fuera_de_debug(self):
+        self.assertEqual(self.revisar(DEBUG=False, CACHES=self.LOCMEM), ['metro.E001'])
+
+    def test_locmem_en_debug(self):
+        self.assertEqual(self.revisar(DEBUG=True, CACHES=self.LOCMEM), [])
+
+    def test_locmem_con_replica(self):
+        bases = {**self.SIN_REPLICA, 'replica': settings.DATABASES['default']}
+        self.assertEqual(self.revisar(DEBUG=True, CACHES=self.LOCMEM, DATABASES=bases), ['metro.E001'])
+
+    def test_cache_compartido(self):
+        self.assertEqual(self.revisar(DEBUG=False, CACHES=self.REDIS), [])
+
+    def test_no_se_revisa_en_pruebas(self):
+        with override_settings(PRUEBAS=True, DEBUG=False, CACHES=self.LOCMEM):
+            self.assertEqual(revisar_cache_compartido(None), [])
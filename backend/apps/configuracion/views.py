@@ -1,4 +1,6 @@
 from rest_framework import viewsets
+
+from apps.authentication.mixins import AreaScopedMixin
 from .models import *
 from .serializers import *
 
@@ -6,6 +8,6 @@ class ConfigGlobalViewSet(viewsets.ModelViewSet):
     queryset = ConfigGlobal.objects.all()
     serializer_class = ConfigGlobalSerializer
 
-class ReglaAreaViewSet(viewsets.ModelViewSet):
+class ReglaAreaViewSet(AreaScopedMixin, viewsets.ModelViewSet):
     queryset = ReglaArea.objects.all()
     serializer_class = ReglaAreaSerializer
\ No newline at end of file
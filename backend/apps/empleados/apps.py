@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class EmpleadosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.empleados'
-    verbose_name = 'Empleados'
\ No newline at end of file
+    verbose_name = 'Empleados'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,142 @@
+"""
+Búsqueda indexada de empleados
+
+Sustituye el LIKE '%texto%' de SearchFilter (que recorre toda la tabla) por
+consultas sobre la tabla de términos:
+
+- Palabras de 1 o 2 letras: prefijo de palabra (LIKE 'ab%' usa el índice)
+- Palabras de 3 o más letras: los trigramas que cubren la palabra deben
+  estar en el mismo empleado, lo que la encuentra en cualquier posición
+- Textos con dígitos: prefijo de numero_expediente sobre su índice
+
+Ambos casos se resuelven por separado para que el motor no tenga que
+combinarlos con OR y recorrer toda la tabla de empleados.
+
+Nombres y búsquedas se normalizan sin acentos y en minúsculas.
+"""
+
+import re
+import unicodedata
+from typing import Iterable, List, Set
+
+from django.db import transaction
+from django.db.models import Count, Q
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Empleado, TerminoBusqueda
+
+
+LONGITUD_NGRAMA = 3
+# Campos de Empleado cuyo cambio requiere reindexar
+CAMPOS_INDEXADOS = ('nombre', 'apellidos')
+
+_PALABRA = re.compile(r'[a-z0-9]+')
+
+
+def normalizar(texto: str) -> str:
+    """Quita acentos y convierte a minúsculas ('Núñez' -> 'nunez')"""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def palabras(texto: str) -> List[str]:
+    return _PALABRA.findall(normalizar(texto))
+
+
+def ngramas(palabra: str) -> Set[str]:
+    n = LONGITUD_NGRAMA
+    return {'#' + palabra[i:i + n] for i in range(len(palabra) - n + 1)}
+
+
+def ngramas_cobertura(palabra: str) -> Set[str]:
+    """
+    Trigramas sin traslape que cubren la palabra (más el último)
+
+    Basta con buscar estos: leer todos los trigramas de una palabra larga y
+    común recorre varias veces más renglones del índice sin filtrar más.
+    """
+    n = LONGITUD_NGRAMA
+    posiciones = list(range(0, len(palabra) - n + 1, n))
+    if posiciones[-1] != len(palabra) - n:
+        posiciones.append(len(palabra) - n)
+    return {'#' + palabra[i:i + n] for i in posiciones}
+
+
+def terminos_empleado(nombre: str, apellidos: str) -> Set[str]:
+    """Términos de búsqueda de un empleado: palabras y trigramas"""
+    terminos = set()
+    for palabra in palabras(f'{nombre} {apellidos}'):
+        palabra = palabra[:TerminoBusqueda._meta.get_field('termino').max_length]
+        terminos.add(palabra)
+        terminos |= ngramas(palabra)
+    return terminos
+
+
+def indexar_empleados(empleados: Iterable[Empleado]):
+    """
+    Reconstruye los términos de búsqueda de los empleados indicados
+
+    Args:
+        empleados: Instancias guardadas (con id, nombre y apellidos)
+    """
+    empleados = list(empleados)
+    if not empleados:
+        return
+    with transaction.atomic():
+        TerminoBusqueda.objects.filter(empleado_id__in=[e.id for e in empleados]).delete()
+        TerminoBusqueda.objects.bulk_create(
+            [
+                TerminoBusqueda(empleado_id=empleado.id, termino=termino)
+                for empleado in empleados
+                for termino in terminos_empleado(empleado.nombre, empleado.apellidos)
+            ],
+            batch_size=2000,
+        )
+
+
+def buscar_empleados(texto: str, queryset=None):
+    """
+    Filtra empleados cuyo número de expediente empieza con el texto (si
+    contiene dígitos) o cuyo nombre contiene todas las palabras buscadas
+
+    Args:
+        texto: Texto capturado por el usuario
+        queryset: Consulta base (default: todos los empleados)
+    """
+    if queryset is None:
+        queryset = Empleado.objects.all()
+    texto = (texto or '').strip()
+    if any(c.isdigit() for c in texto):
+        return queryset.filter(numero_expediente__startswith=texto)
+
+    buscadas = palabras(texto)
+    if not buscadas:
+        return queryset.none() if texto else queryset
+
+    por_nombre = Q()
+    for palabra in dict.fromkeys(buscadas):
+        if len(palabra) < LONGITUD_NGRAMA:
+            coincidencias = TerminoBusqueda.objects.filter(termino__startswith=palabra)
+        else:
+            gramas = ngramas_cobertura(palabra)
+            coincidencias = (
+                TerminoBusqueda.objects.filter(termino__in=gramas)
+                .values('empleado_id')
+                .annotate(total=Count('id'))
+                .filter(total=len(gramas))
+            )
+        por_nombre &= Q(pk__in=coincidencias.values('empleado_id'))
+
+    return queryset.filter(por_nombre)
+
+
+class BusquedaEmpleadoFilter(BaseFilterBackend):
+    """Filtro ?search= de empleados sobre el índice de términos"""
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        texto = request.query_params.get(self.search_param)
+        if not texto:
+            return queryset
+        return buscar_empleados(texto, queryset)
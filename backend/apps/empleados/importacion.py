@@ -0,0 +1,269 @@
+"""
+Importación masiva de la plantilla de empleados (CSV o XLSX)
+
+El archivo se lee renglón por renglón y se escribe en lotes con
+bulk_create(update_conflicts=True) usando numero_expediente como llave, de
+modo que la memoria no depende del tamaño del archivo.
+
+Columnas reconocidas (encabezados sin distinguir mayúsculas):
+    numero_expediente, nombre, apellidos, fecha_ingreso, area (código),
+    categoria_laboral, linea_metro, turno, es_taquilla, activo
+"""
+
+import codecs
+import csv
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from django.db import connection, transaction
+
+from apps.areas.models import Area
+from apps.calculos.periodos import generar_periodos_empleados
+from .busqueda import indexar_empleados
+from .models import Empleado
+
+
+TAMAÑO_LOTE = 1000
+
+COLUMNAS_REQUERIDAS = ('numero_expediente', 'nombre', 'apellidos', 'fecha_ingreso', 'area')
+
+# Campos que se sobrescriben cuando el expediente ya existe
+CAMPOS_ACTUALIZABLES = [
+    'area', 'nombre', 'apellidos', 'fecha_ingreso', 'categoria_laboral',
+    'linea_metro', 'turno', 'es_taquilla', 'activo', 'fecha_actualizacion',
+]
+
+FORMATOS_FECHA = ('%Y-%m-%d', '%d/%m/%Y')
+VALORES_VERDADEROS = {'1', 'si', 'sí', 'true', 'x', 's'}
+VALORES_FALSOS = {'0', 'no', 'false', 'n'}
+
+
+class ErrorImportacion(Exception):
+    """El archivo no se puede leer (formato o encabezados inválidos)"""
+
+
+# ============================================================================
+# LECTURA DE ARCHIVOS
+# ============================================================================
+
+def _normalizar_encabezado(valor) -> str:
+    return str(valor or '').strip().lower().replace(' ', '_')
+
+
+def _leer_encabezados(valores) -> list:
+    encabezados = [_normalizar_encabezado(e) for e in valores]
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in encabezados]
+    if faltantes:
+        raise ErrorImportacion(f"Faltan columnas: {', '.join(faltantes)}")
+    return encabezados
+
+
+def _validar_utf8(archivo):
+    """
+    Recorre el archivo antes de importar para rechazarlo completo si no es UTF-8
+
+    Raises:
+        ErrorImportacion: Con el número de línea del primer byte inválido
+    """
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    for numero, linea in enumerate(archivo, start=1):
+        try:
+            decodificador.decode(linea)
+        except UnicodeDecodeError:
+            raise ErrorImportacion(
+                f"Línea {numero}: el archivo no está en UTF-8; guárdelo como 'CSV UTF-8'"
+            )
+    try:
+        decodificador.decode(b'', final=True)
+    except UnicodeDecodeError:
+        raise ErrorImportacion("El archivo no está en UTF-8; guárdelo como 'CSV UTF-8'")
+    archivo.seek(0)
+
+
+def _leer_csv(archivo) -> Iterator[Tuple[int, Dict]]:
+    _validar_utf8(archivo)
+    texto = codecs.getreader('utf-8-sig')(archivo)
+    lector = csv.reader(texto)
+    encabezados = _leer_encabezados(next(lector, []))
+    for numero, valores in enumerate(lector, start=2):
+        if any(valores):
+            yield numero, dict(zip(encabezados, valores))
+
+
+def _leer_xlsx(archivo) -> Iterator[Tuple[int, Dict]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ErrorImportacion('Para importar archivos XLSX se requiere instalar openpyxl')
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        renglones = libro.active.iter_rows(values_only=True)
+        encabezados = _leer_encabezados(next(renglones, ()))
+        for numero, valores in enumerate(renglones, start=2):
+            if any(v not in (None, '') for v in valores):
+                yield numero, dict(zip(encabezados, valores))
+    finally:
+        libro.close()
+
+
+def leer_filas(archivo, nombre: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    Recorre el archivo como (número de renglón, diccionario por columna)
+
+    Args:
+        archivo: Archivo abierto en modo binario
+        nombre: Nombre del archivo; su extensión determina el formato
+    """
+    extension = nombre.rsplit('.', 1)[-1].lower()
+    if extension == 'csv':
+        return _leer_csv(archivo)
+    if extension == 'xlsx':
+        return _leer_xlsx(archivo)
+    raise ErrorImportacion('Formato no soportado, use CSV o XLSX')
+
+
+# ============================================================================
+# CONVERSIÓN DE RENGLONES
+# ============================================================================
+
+def _texto(valor) -> Optional[str]:
+    if valor is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip() or None
+
+
+def _fecha(valor) -> date:
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = _texto(valor) or ''
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha de ingreso inválida: '{texto}'")
+
+
+def _booleano(valor, default: bool) -> bool:
+    if isinstance(valor, bool):
+        return valor
+    texto = (_texto(valor) or '').lower()
+    if not texto:
+        return default
+    if texto in VALORES_VERDADEROS:
+        return True
+    if texto in VALORES_FALSOS:
+        return False
+    raise ValueError(f"Valor booleano inválido: '{valor}'")
+
+
+def construir_empleado(fila: Dict, areas: Dict[str, int]) -> Empleado:
+    """
+    Convierte un renglón en una instancia de Empleado sin guardarla
+
+    Raises:
+        ValueError: Con el mensaje a reportar si el renglón es inválido
+    """
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if not _texto(fila.get(c))]
+    if faltantes:
+        raise ValueError(f"Campos requeridos vacíos: {', '.join(faltantes)}")
+
+    codigo_area = _texto(fila['area']).upper()
+    if codigo_area not in areas:
+        raise ValueError(f"Área '{codigo_area}' no existe")
+
+    numero_expediente = _texto(fila['numero_expediente'])
+    if len(numero_expediente) > Empleado._meta.get_field('numero_expediente').max_length:
+        raise ValueError('Número de expediente demasiado largo')
+
+    return Empleado(
+        area_id=areas[codigo_area],
+        numero_expediente=numero_expediente,
+        nombre=_texto(fila['nombre'])[:100],
+        apellidos=_texto(fila['apellidos'])[:150],
+        fecha_ingreso=_fecha(fila['fecha_ingreso']),
+        categoria_laboral=(_texto(fila.get('categoria_laboral')) or '')[:100] or None,
+        linea_metro=(_texto(fila.get('linea_metro')) or '')[:50] or None,
+        turno=(_texto(fila.get('turno')) or '')[:50] or None,
+        es_taquilla=_booleano(fila.get('es_taquilla'), False),
+        activo=_booleano(fila.get('activo'), True),
+    )
+
+
+# ============================================================================
+# ESCRITURA POR LOTES
+# ============================================================================
+
+def _guardar_lote(lote: Dict[str, Empleado]):
+    """Inserta o actualiza un lote de empleados por numero_expediente y los reindexa"""
+    # MySQL resuelve el conflicto con ON DUPLICATE KEY UPDATE y no acepta unique_fields
+    unique_fields = (
+        ['numero_expediente'] if connection.features.supports_update_conflicts_with_target else None
+    )
+    with transaction.atomic():
+        Empleado.objects.bulk_create(
+            list(lote.values()),
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=CAMPOS_ACTUALIZABLES,
+        )
+        # bulk_create no emite post_save; en MySQL tampoco regresa los ids
+        guardados = list(
+            Empleado.objects.filter(numero_expediente__in=lote.keys()).only('id', 'nombre', 'apellidos', 'fecha_ingreso')
+        )
+        indexar_empleados(guardados)
+        generar_periodos_empleados(guardados)
+
+
+def importar_empleados(filas: Iterator[Tuple[int, Dict]], tamaño_lote: int = TAMAÑO_LOTE,
+                       registrar_error: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Importa empleados desde un iterador de renglones
+
+    Cada lote se guarda en su propia transacción; un renglón inválido no
+    detiene la importación, se reporta por medio de registrar_error con
+    las llaves 'fila', 'numero_expediente' y 'mensaje'.
+
+    Args:
+        filas: Iterador de (número de renglón, diccionario), ver leer_filas
+        tamaño_lote: Renglones por escritura
+        registrar_error: Función que recibe cada error
+
+    Returns:
+        Resumen con renglones procesados, importados y con error
+    """
+    areas = {codigo.upper(): pk for codigo, pk in Area.objects.values_list('codigo', 'id')}
+    resumen = {'procesadas': 0, 'importadas': 0, 'errores': 0}
+
+    lote: Dict[str, Empleado] = {}
+    for numero, fila in filas:
+        resumen['procesadas'] += 1
+        try:
+            empleado = construir_empleado(fila, areas)
+        except ValueError as e:
+            resumen['errores'] += 1
+            if registrar_error:
+                registrar_error({
+                    'fila': numero,
+                    'numero_expediente': _texto(fila.get('numero_expediente')),
+                    'mensaje': str(e),
+                })
+            continue
+
+        # Si el expediente se repite dentro del lote prevalece el último renglón
+        lote[empleado.numero_expediente] = empleado
+        if len(lote) >= tamaño_lote:
+            _guardar_lote(lote)
+            resumen['importadas'] += len(lote)
+            lote = {}
+
+    if lote:
+        _guardar_lote(lote)
+        resumen['importadas'] += len(lote)
+
+    return resumen
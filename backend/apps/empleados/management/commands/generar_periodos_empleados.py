@@ -0,0 +1,24 @@
+"""
+Reconstruye la tabla de periodos vacacionales de todos los empleados
+Ejecutar: python manage.py generar_periodos_empleados [--anios-adelante 2] [--lote 2000]
+
+Pensado para cron (anual, p. ej. el 1 de enero) para extender el horizonte
+de periodos generados.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.calculos.periodos import AÑOS_ADELANTE, TAMAÑO_LOTE, regenerar_todos
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los periodos vacacionales precalculados de todos los empleados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--anios-adelante', type=int, default=AÑOS_ADELANTE,
+                            help='Años a generar después del actual')
+        parser.add_argument('--lote', type=int, default=TAMAÑO_LOTE, help='Empleados por transacción')
+
+    def handle(self, *args, **options):
+        total = regenerar_todos(options['anios_adelante'], options['lote'])
+        self.stdout.write(self.style.SUCCESS(f"Periodos generados: {total}"))
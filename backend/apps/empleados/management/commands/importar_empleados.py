@@ -0,0 +1,49 @@
+"""
+Importa o actualiza la plantilla de empleados desde un archivo CSV o XLSX
+Ejecutar: python manage.py importar_empleados plantilla.xlsx [--reporte errores.csv] [--lote 1000]
+"""
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.empleados.importacion import TAMAÑO_LOTE, ErrorImportacion, importar_empleados, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Importa empleados por numero_expediente desde CSV o XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo CSV o XLSX')
+        parser.add_argument('--reporte', help='Archivo CSV donde escribir los renglones con error')
+        parser.add_argument('--lote', type=int, default=TAMAÑO_LOTE, help='Renglones por escritura')
+
+    def handle(self, *args, **options):
+        reporte = open(options['reporte'], 'w', newline='', encoding='utf-8') if options['reporte'] else None
+        try:
+            if reporte:
+                escritor = csv.DictWriter(reporte, fieldnames=['fila', 'numero_expediente', 'mensaje'])
+                escritor.writeheader()
+                registrar_error = escritor.writerow
+            else:
+                registrar_error = self._mostrar_error
+
+            with open(options['archivo'], 'rb') as archivo:
+                resumen = importar_empleados(
+                    leer_filas(archivo, options['archivo']),
+                    tamaño_lote=options['lote'],
+                    registrar_error=registrar_error,
+                )
+        except (ErrorImportacion, OSError) as e:
+            raise CommandError(str(e))
+        finally:
+            if reporte:
+                reporte.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Procesados: {resumen['procesadas']}  Importados: {resumen['importadas']}  "
+            f"Con error: {resumen['errores']}"
+        ))
+
+    def _mostrar_error(self, error):
+        self.stderr.write(f"Fila {error['fila']} ({error['numero_expediente'] or 's/n'}): {error['mensaje']}")
@@ -0,0 +1,33 @@
+"""
+Reconstruye el índice de búsqueda de empleados
+Ejecutar: python manage.py indexar_empleados [--lote 2000]
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.empleados.busqueda import indexar_empleados
+from apps.empleados.models import Empleado
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los términos de búsqueda de todos los empleados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=2000, help='Empleados por transacción')
+
+    def handle(self, *args, **options):
+        total = 0
+        ultimo_id = 0
+        while True:
+            lote = list(
+                Empleado.objects.filter(id__gt=ultimo_id)
+                .order_by('id')
+                .only('id', 'nombre', 'apellidos')[:options['lote']]
+            )
+            if not lote:
+                break
+            indexar_empleados(lote)
+            total += len(lote)
+            ultimo_id = lote[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Empleados indexados: {total}"))
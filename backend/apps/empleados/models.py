@@ -29,4 +29,52 @@ class Empleado(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.numero_expediente} - {self.nombre} {self.apellidos}"
\ No newline at end of file
+        return f"{self.numero_expediente} - {self.nombre} {self.apellidos}"
+
+class TerminoBusqueda(models.Model):
+    """
+    Índice de búsqueda de empleados por nombre
+
+    Cada empleado tiene un renglón por palabra normalizada (sin acentos y en
+    minúsculas) de su nombre y apellidos, y uno por cada trigrama de esas
+    palabras con el prefijo '#'. Se mantiene en apps.empleados.busqueda.
+    """
+
+    empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE, related_name='terminos_busqueda')
+    termino = models.CharField(max_length=50)
+
+    class Meta:
+        db_table = 'empleados_terminos_busqueda'
+        unique_together = ('termino', 'empleado')
+
+    def __str__(self):
+        return f"{self.termino} - {self.empleado_id}"
+
+
+class PeriodoEmpleado(models.Model):
+    """
+    Periodos vacacionales precalculados de un empleado
+
+    Un renglón por periodo ("AAAA-N") desde el primero elegible hasta
+    algunos años adelante, con las mismas fechas y días que
+    CalculadoraAntiguedad.calcular_periodos_disponibles. Los periodos de un
+    empleado no se traslapan, por lo que el periodo de una fecha es el de
+    mayor fecha_inicio anterior a ella, si la fecha no pasa de su fin. Se
+    mantiene en apps.calculos.periodos.
+    """
+
+    empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE, related_name='periodos')
+    periodo = models.CharField(max_length=50)
+    fecha_inicio = models.DateField()
+    fecha_fin = models.DateField()
+    dias_otorgados = models.IntegerField()
+
+    class Meta:
+        db_table = 'empleados_periodos'
+        unique_together = ('empleado', 'periodo')
+        indexes = [
+            models.Index(fields=['empleado', 'fecha_inicio']),
+        ]
+
+    def __str__(self):
+        return f"{self.empleado_id} - {self.periodo} ({self.fecha_inicio} a {self.fecha_fin})"
@@ -0,0 +1,35 @@
+"""
+Señales de empleados: mantienen el índice de búsqueda y los periodos al guardar
+"""
+
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from apps.calculos.periodos import generar_periodos_empleados
+from .busqueda import CAMPOS_INDEXADOS, indexar_empleados
+from .models import Empleado
+
+
+@receiver(post_save, sender=Empleado)
+def empleado_guardado(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(CAMPOS_INDEXADOS):
+        return
+    indexar_empleados([instance])
+
+
+@receiver(pre_save, sender=Empleado)
+def cambio_fecha_ingreso(sender, instance, update_fields=None, **kwargs):
+    # Los periodos solo dependen de la fecha de ingreso: se compara con la guardada
+    if update_fields is not None and 'fecha_ingreso' not in update_fields:
+        instance._regenerar_periodos = False
+    elif instance.pk is None:
+        instance._regenerar_periodos = True
+    else:
+        guardada = Empleado.objects.filter(pk=instance.pk).values_list('fecha_ingreso', flat=True).first()
+        instance._regenerar_periodos = guardada != instance.fecha_ingreso
+
+
+@receiver(post_save, sender=Empleado)
+def periodos_empleado(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_regenerar_periodos', True):
+        generar_periodos_empleados([instance])
@@ -0,0 +1,95 @@
+"""
+Pruebas del índice de búsqueda de empleados y de la importación de la plantilla
+"""
+
+from datetime import date
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.areas.models import Area
+from apps.authentication.models import Usuario
+from .busqueda import buscar_empleados
+from .models import Empleado
+
+
+class BusquedaTestCase(TestCase):
+    """Búsqueda sin acentos por prefijo, infijo y número de expediente"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        cls.jose = cls.crear_empleado('1001', 'José Ángel', 'Núñez Pérez')
+        cls.maria = cls.crear_empleado('2001', 'María', 'González')
+
+    @classmethod
+    def crear_empleado(cls, expediente, nombre, apellidos):
+        return Empleado.objects.create(
+            area=cls.area,
+            numero_expediente=expediente,
+            nombre=nombre,
+            apellidos=apellidos,
+            fecha_ingreso=date(2015, 1, 1),
+        )
+
+    def buscar(self, texto):
+        return sorted(buscar_empleados(texto).values_list('numero_expediente', flat=True))
+
+    def test_ignora_acentos_y_mayusculas(self):
+        self.assertEqual(self.buscar('NUÑEZ'), ['1001'])
+        self.assertEqual(self.buscar('maria'), ['2001'])
+
+    def test_prefijo_e_infijo(self):
+        self.assertEqual(self.buscar('gonz'), ['2001'])
+        self.assertEqual(self.buscar('erez'), ['1001'])
+        self.assertEqual(self.buscar('jo pe'), ['1001'])
+
+    def test_todas_las_palabras(self):
+        self.assertEqual(self.buscar('jose nunez'), ['1001'])
+        self.assertEqual(self.buscar('jose gonzalez'), [])
+
+    def test_numero_expediente(self):
+        self.assertEqual(self.buscar('100'), ['1001'])
+        self.assertEqual(self.buscar('2001'), ['2001'])
+
+    def test_reindexa_al_guardar(self):
+        self.maria.apellidos = 'Ortiz'
+        self.maria.save()
+        self.assertEqual(self.buscar('gonzalez'), [])
+        self.assertEqual(self.buscar('ortiz'), ['2001'])
+
+
+class ImportacionTestCase(TestCase):
+    """Importación de CSV por la API"""
+
+    ENCABEZADOS = 'numero_expediente,nombre,apellidos,fecha_ingreso,area\n'
+
+    @classmethod
+    def setUpTestData(cls):
+        Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        cls.usuario = Usuario.objects.create_superuser(
+            email='admin@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Sistema'
+        )
+
+    def importar(self, contenido: bytes):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+        archivo = SimpleUploadedFile('plantilla.csv', contenido, content_type='text/csv')
+        return client.post('/api/empleados/importar/', {'archivo': archivo}, format='multipart')
+
+    def test_csv_utf8_con_bom(self):
+        contenido = (self.ENCABEZADOS + '1001,José,Núñez,2015-01-01,PRUEBA\n').encode('utf-8-sig')
+        respuesta = self.importar(contenido)
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        self.assertEqual(Empleado.objects.get(numero_expediente='1001').nombre, 'José')
+
+    def test_csv_que_no_es_utf8(self):
+        contenido = (
+            self.ENCABEZADOS + '1001,Maria,Perez,2015-01-01,PRUEBA\n1002,José,Núñez,2015-01-01,PRUEBA\n'
+        ).encode('latin-1')
+        respuesta = self.importar(contenido)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('Línea 3', respuesta.data['detail'])
+        # No se importa ningún renglón del archivo
+        self.assertFalse(Empleado.objects.filter(numero_expediente='1001').exists())
@@ -1,8 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from . import views
+
 router = DefaultRouter()
-# ViewSets se registrarán en views.py
+router.register(r'', views.EmpleadoViewSet, basename='empleado')
 
 urlpatterns = [
     path('', include(router.urls)),
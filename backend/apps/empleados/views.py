@@ -1,7 +1,42 @@
-from rest_framework import viewsets
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.authentication.mixins import AreaScopedMixin
+from apps.authentication.permissions import IsSuperAdmin
+from .busqueda import BusquedaEmpleadoFilter
+from .importacion import ErrorImportacion, importar_empleados, leer_filas
 from .models import *
 from .serializers import *
 
-class EmpleadoViewSet(viewsets.ModelViewSet):
+# Errores que se devuelven en la respuesta de importación; el resto solo se cuenta
+MAX_ERRORES_REPORTE = 500
+
+class EmpleadoViewSet(AreaScopedMixin, viewsets.ModelViewSet):
     queryset = Empleado.objects.all()
-    serializer_class = EmpleadoSerializer
\ No newline at end of file
+    serializer_class = EmpleadoSerializer
+    filter_backends = [BusquedaEmpleadoFilter, filters.OrderingFilter]
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser],
+            permission_classes=[IsAuthenticated, IsSuperAdmin])
+    def importar(self, request):
+        """Importar la plantilla desde un archivo CSV o XLSX (campo 'archivo')"""
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response({'detail': 'Debe adjuntar un archivo.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        errores = []
+
+        def registrar_error(error):
+            if len(errores) < MAX_ERRORES_REPORTE:
+                errores.append(error)
+
+        try:
+            resumen = importar_empleados(leer_filas(archivo, archivo.name), registrar_error=registrar_error)
+        except ErrorImportacion as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        resumen['detalle_errores'] = errores
+        return Response(resumen)
@@ -0,0 +1,30 @@
+"""
+PDF del reporte anual de uso por área (datos de apps.solicitudes.reportes)
+"""
+
+from django.template.loader import render_to_string
+
+CSS_REPORTE = """
+@page {
+    size: Letter landscape;
+    margin: 1cm;
+    @bottom-right { content: "Página " counter(page) " de " counter(pages); font-size: 7pt; }
+}
+body { font-family: Arial, sans-serif; font-size: 8pt; }
+h1 { font-size: 13pt; margin: 0 0 0.2cm 0; }
+h2 { font-size: 10pt; margin: 0.5cm 0 0.2cm 0; border-bottom: 1px solid #000; }
+table { width: 100%; border-collapse: collapse; }
+th, td { border: 1px solid #999; padding: 2px 4px; }
+th { background-color: #e0e0e0; }
+td.numero { text-align: right; }
+thead { display: table-header-group; }
+tr { page-break-inside: avoid; }
+"""
+
+
+def generar_pdf_reporte_anual(datos: dict, ruta: str):
+    """Escribe el PDF del reporte en ruta"""
+    from weasyprint import CSS, HTML
+
+    html = render_to_string('reporte_anual.html', datos)
+    HTML(string=html).write_pdf(ruta, stylesheets=[CSS(string=CSS_REPORTE)])
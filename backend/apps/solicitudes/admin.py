@@ -5,3 +5,5 @@ from .models import *
 admin.site.register(Solicitud)
 admin.site.register(SaldoVacaciones)
 admin.site.register(HistorialSaldo)
+admin.site.register(SnapshotSaldo)
+admin.site.register(OcupacionDiaria)
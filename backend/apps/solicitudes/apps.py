@@ -5,3 +5,6 @@ class SolicitudesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.solicitudes'
     verbose_name = 'Solicitudes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,314 @@
+"""
+Reconstrucción y verificación de saldos a partir del historial
+
+HistorialSaldo es el libro de movimientos (solo se agregan renglones). Cada
+movimiento cambia los totales de su periodo:
+- 'otorgamiento' y 'ajuste' suman dias_movimiento a los días otorgados
+- 'uso' y 'cancelacion' restan dias_movimiento a los días utilizados
+  (un uso de 3 días se registra como -3, su cancelación como +3)
+
+Los días disponibles son otorgados - utilizados, igual que en
+SaldoVacaciones.actualizar_dias_utilizados.
+
+Todo saldo abre su historial con un 'otorgamiento' al crearse (señal
+post_save); los saldos anteriores a ese registro se completan con el
+comando registrar_otorgamientos_saldos.
+
+Para no recorrer todo el historial, SnapshotSaldo guarda periódicamente los
+totales de cada empleado hasta un movimiento de corte; los totales actuales
+son el corte más la suma agrupada en SQL de los movimientos posteriores.
+El corte de un empleado se reemplaza completo (todos sus periodos) en una
+transacción, de modo que todos sus renglones comparten el mismo corte.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from apps.empleados.models import Empleado
+from .models import HistorialSaldo, SaldoVacaciones, SnapshotSaldo, Solicitud
+from .services import invalidar_saldos_empleado
+
+MOVIMIENTOS_OTORGADOS = ('otorgamiento', 'ajuste')
+# Antigüedad mínima de los movimientos que entran a un corte: una
+# transacción que aún no confirma puede tener un id menor al máximo visible
+MARGEN_CORTE = timedelta(minutes=10)
+
+Totales = Dict[Tuple[int, str], List[int]]
+
+
+def lotes_empleados(tamaño: int, empleado_ids: Optional[Iterable[int]] = None) -> Iterable[List[int]]:
+    """Ids de empleados en lotes consecutivos (recorrido por llave, sin OFFSET)"""
+    empleados = Empleado.objects.order_by('id')
+    if empleado_ids is not None:
+        empleados = empleados.filter(id__in=list(empleado_ids))
+    ultimo_id = 0
+    while True:
+        lote = list(empleados.filter(id__gt=ultimo_id).values_list('id', flat=True)[:tamaño])
+        if not lote:
+            return
+        yield lote
+        ultimo_id = lote[-1]
+
+
+def totales_libro(empleado_ids: Iterable[int], hasta: Optional[int] = None) -> Totales:
+    """
+    Días otorgados y utilizados por (empleado, periodo) según el historial
+
+    Args:
+        empleado_ids: Empleados a calcular
+        hasta: Solo considerar movimientos con id <= hasta
+
+    Returns:
+        {(empleado_id, periodo): [dias_otorgados, dias_utilizados]}
+    """
+    empleado_ids = list(empleado_ids)
+    totales = {}
+    cortes = {}
+    for corte in SnapshotSaldo.objects.filter(empleado_id__in=empleado_ids).values(
+        'empleado_id', 'periodo', 'dias_otorgados', 'dias_utilizados', 'ultimo_movimiento_id'
+    ):
+        totales[(corte['empleado_id'], corte['periodo'])] = [corte['dias_otorgados'], corte['dias_utilizados']]
+        cortes[corte['empleado_id']] = corte['ultimo_movimiento_id']
+
+    # Una consulta agregada por cada corte distinto (normalmente uno por lote)
+    por_corte = defaultdict(list)
+    for empleado_id in empleado_ids:
+        por_corte[cortes.get(empleado_id, 0)].append(empleado_id)
+
+    for corte, ids in por_corte.items():
+        movimientos = HistorialSaldo.objects.filter(empleado_id__in=ids, id__gt=corte)
+        if hasta is not None:
+            movimientos = movimientos.filter(id__lte=hasta)
+        for fila in (
+            movimientos.order_by()
+            .values('empleado_id', 'periodo', 'tipo_movimiento')
+            .annotate(dias=Sum('dias_movimiento'))
+        ):
+            total = totales.setdefault((fila['empleado_id'], fila['periodo']), [0, 0])
+            if fila['tipo_movimiento'] in MOVIMIENTOS_OTORGADOS:
+                total[0] += fila['dias']
+            else:
+                total[1] -= fila['dias']
+    return totales
+
+
+def reconstruir_saldos_empleado(empleado_id: int) -> Dict[str, Dict[str, int]]:
+    """Saldos de un empleado por periodo reconstruidos desde su último corte"""
+    return {
+        periodo: {'dias_otorgados': otorgados, 'dias_utilizados': utilizados,
+                  'dias_disponibles': otorgados - utilizados}
+        for (_, periodo), (otorgados, utilizados) in sorted(totales_libro([empleado_id]).items())
+    }
+
+
+# ============================================================================
+# APERTURA
+# ============================================================================
+
+def movimientos_apertura(saldo: SaldoVacaciones, otorgados: int = 0, utilizados: int = 0,
+                         descripcion: str = 'Otorgamiento del periodo') -> List[HistorialSaldo]:
+    """
+    Movimientos que llevan los totales del historial a los del saldo
+
+    Un 'otorgamiento' por la diferencia de días otorgados y, si el saldo ya
+    traía días utilizados sin solicitud en el historial, un 'uso' por ellos.
+
+    Args:
+        saldo: Saldo a abrir en el historial
+        otorgados: Días otorgados que ya registra el historial
+        utilizados: Días utilizados que ya registra el historial
+    """
+    movimientos = []
+    disponibles = otorgados - utilizados
+    for tipo, dias in (
+        ('otorgamiento', saldo.dias_otorgados - otorgados),
+        ('uso', -(saldo.dias_utilizados - utilizados)),
+    ):
+        if tipo == 'uso' and not dias:
+            continue
+        movimientos.append(HistorialSaldo(
+            empleado_id=saldo.empleado_id, periodo=saldo.periodo, tipo_movimiento=tipo,
+            dias_antes=disponibles, dias_movimiento=dias, dias_despues=disponibles + dias,
+            descripcion=descripcion if tipo == 'otorgamiento' else 'Días utilizados al registrar el saldo',
+        ))
+        disponibles += dias
+    return movimientos
+
+
+def registrar_otorgamientos(empleado_ids: Iterable[int]) -> int:
+    """
+    Abre en el historial los saldos del lote que no tienen 'otorgamiento'
+
+    Los movimientos cubren la diferencia con lo que el historial ya registra
+    (usos y ajustes posteriores), de modo que el libro cuadra con el saldo
+    actual. Los saldos con otorgamiento no se tocan: volver a ejecutarlo no
+    cambia nada.
+
+    Returns:
+        Número de saldos abiertos
+    """
+    empleado_ids = list(empleado_ids)
+    with transaction.atomic():
+        saldos = list(SaldoVacaciones.objects.select_for_update().filter(empleado_id__in=empleado_ids))
+        abiertos = set(
+            HistorialSaldo.objects.filter(empleado_id__in=empleado_ids, tipo_movimiento='otorgamiento')
+            .order_by().values_list('empleado_id', 'periodo').distinct()
+        )
+        libro = totales_libro(empleado_ids)
+        movimientos = []
+        sin_abrir = [saldo for saldo in saldos if (saldo.empleado_id, saldo.periodo) not in abiertos]
+        for saldo in sin_abrir:
+            otorgados, utilizados = libro.get((saldo.empleado_id, saldo.periodo), (0, 0))
+            movimientos.extend(movimientos_apertura(
+                saldo, otorgados, utilizados, descripcion='Otorgamiento registrado al completar el historial'
+            ))
+        HistorialSaldo.objects.bulk_create(movimientos, batch_size=1000)
+    return len(sin_abrir)
+
+
+# ============================================================================
+# CORTES
+# ============================================================================
+
+def corte_seguro() -> int:
+    """Id del último movimiento con más de MARGEN_CORTE de antigüedad"""
+    limite = timezone.now() - MARGEN_CORTE
+    return HistorialSaldo.objects.filter(fecha_movimiento__lte=limite).aggregate(corte=Max('id'))['corte'] or 0
+
+
+def tomar_snapshots(empleado_ids: Iterable[int], corte: int) -> int:
+    """
+    Reemplaza los cortes de los empleados por sus totales hasta el movimiento corte
+
+    Parte del corte anterior de cada empleado, por lo que solo agrega los
+    movimientos nuevos.
+
+    Returns:
+        Número de renglones de corte escritos
+    """
+    empleado_ids = list(empleado_ids)
+    totales = totales_libro(empleado_ids, hasta=corte)
+    renglones = [
+        SnapshotSaldo(
+            empleado_id=empleado_id, periodo=periodo, dias_otorgados=otorgados,
+            dias_utilizados=utilizados, ultimo_movimiento_id=corte,
+        )
+        for (empleado_id, periodo), (otorgados, utilizados) in totales.items()
+    ]
+    with transaction.atomic():
+        SnapshotSaldo.objects.filter(empleado_id__in=empleado_ids).delete()
+        SnapshotSaldo.objects.bulk_create(renglones, batch_size=1000)
+    return len(renglones)
+
+
+# ============================================================================
+# VERIFICACIÓN
+# ============================================================================
+
+def verificar_lote(empleado_ids: Iterable[int]) -> List[Dict]:
+    """
+    Compara historial, saldos y solicitudes aprobadas de un lote de empleados
+
+    Returns:
+        Lista de diferencias {'empleado_id', 'periodo', 'tipo', 'saldo',
+        'historial', 'solicitudes', 'detalle'}; vacía si todo coincide
+    """
+    empleado_ids = list(empleado_ids)
+    libro = totales_libro(empleado_ids)
+    saldos = {
+        (fila['empleado_id'], fila['periodo']): fila
+        for fila in SaldoVacaciones.objects.filter(empleado_id__in=empleado_ids).order_by().values(
+            'empleado_id', 'periodo', 'dias_otorgados', 'dias_utilizados', 'dias_disponibles'
+        )
+    }
+    aprobadas = {
+        (fila['empleado_id'], fila['periodo']): fila['dias']
+        for fila in Solicitud.objects.filter(
+            empleado_id__in=empleado_ids, tipo_solicitud='vacaciones', estado='aprobada', periodo__isnull=False,
+        ).order_by().values('empleado_id', 'periodo').annotate(dias=Sum('dias_habiles'))
+    }
+
+    diferencias = []
+
+    def diferencia(clave, tipo, saldo=None, historial=None, solicitudes=None, detalle=''):
+        diferencias.append({
+            'empleado_id': clave[0], 'periodo': clave[1], 'tipo': tipo, 'saldo': saldo,
+            'historial': historial, 'solicitudes': solicitudes, 'detalle': detalle,
+        })
+
+    for clave in sorted(libro.keys() | saldos.keys() | aprobadas.keys()):
+        saldo = saldos.get(clave)
+        otorgados, utilizados = libro.get(clave, (None, None))
+        dias_aprobados = aprobadas.get(clave, 0)
+        if saldo is None:
+            if otorgados is not None:
+                diferencia(clave, 'sin_saldo', historial=otorgados - utilizados, detalle='Movimientos sin saldo')
+            if dias_aprobados:
+                diferencia(clave, 'sin_saldo', solicitudes=dias_aprobados, detalle='Solicitudes aprobadas sin saldo')
+            continue
+
+        if saldo['dias_disponibles'] != saldo['dias_otorgados'] - saldo['dias_utilizados']:
+            diferencia(clave, 'dias_disponibles', saldo=saldo['dias_disponibles'],
+                       detalle=f"Otorgados {saldo['dias_otorgados']} - utilizados {saldo['dias_utilizados']}")
+        if otorgados is None:
+            diferencia(clave, 'sin_movimientos', saldo=saldo['dias_disponibles'], detalle='Saldo sin movimientos')
+        else:
+            if saldo['dias_otorgados'] != otorgados:
+                diferencia(clave, 'dias_otorgados', saldo=saldo['dias_otorgados'], historial=otorgados)
+            if saldo['dias_utilizados'] != utilizados:
+                diferencia(clave, 'dias_utilizados', saldo=saldo['dias_utilizados'], historial=utilizados)
+        if saldo['dias_utilizados'] != dias_aprobados:
+            diferencia(clave, 'solicitudes_aprobadas', saldo=saldo['dias_utilizados'], solicitudes=dias_aprobados)
+
+    # Movimientos cuyo saldo posterior no cuadra con el anterior más el movimiento
+    for movimiento in HistorialSaldo.objects.filter(empleado_id__in=empleado_ids).exclude(
+        dias_despues=F('dias_antes') + F('dias_movimiento')
+    ).order_by('id').values('id', 'empleado_id', 'periodo', 'dias_antes', 'dias_movimiento', 'dias_despues'):
+        diferencia((movimiento['empleado_id'], movimiento['periodo']), 'movimiento', detalle=(
+            f"Movimiento {movimiento['id']}: {movimiento['dias_antes']} + {movimiento['dias_movimiento']}"
+            f" != {movimiento['dias_despues']}"
+        ))
+    return diferencias
+
+
+def reparar_desde_libro(diferencias: List[Dict]) -> int:
+    """
+    Reescribe los saldos que no coinciden con el historial
+
+    Solo corrige saldos existentes con diferencias de días otorgados,
+    utilizados o disponibles; los demás casos requieren revisión manual.
+
+    Returns:
+        Número de saldos actualizados
+    """
+    claves = {
+        (d['empleado_id'], d['periodo']) for d in diferencias
+        if d['tipo'] in ('dias_otorgados', 'dias_utilizados', 'dias_disponibles')
+    }
+    if not claves:
+        return 0
+    reparados = []
+    with transaction.atomic():
+        libro = totales_libro({empleado_id for empleado_id, _ in claves})
+        saldos = SaldoVacaciones.objects.select_for_update().filter(
+            empleado_id__in={empleado_id for empleado_id, _ in claves}
+        )
+        for saldo in saldos:
+            clave = (saldo.empleado_id, saldo.periodo)
+            if clave not in claves or clave not in libro:
+                continue
+            saldo.dias_otorgados, saldo.dias_utilizados = libro[clave]
+            saldo.dias_disponibles = saldo.dias_otorgados - saldo.dias_utilizados
+            reparados.append(saldo)
+        SaldoVacaciones.objects.bulk_update(
+            reparados, ['dias_otorgados', 'dias_utilizados', 'dias_disponibles'], batch_size=1000
+        )
+        # bulk_update no emite post_save: invalidar el caché de saldos a mano
+        for empleado_id in {saldo.empleado_id for saldo in reparados}:
+            transaction.on_commit(lambda empleado_id=empleado_id: invalidar_saldos_empleado(empleado_id))
+    return len(reparados)
@@ -0,0 +1,466 @@
+"""
+Genera datos sintéticos a gran escala para pruebas de carga
+Ejecutar: python manage.py generar_datos_sinteticos --areas 50 --empleados 100000 \
+          --solicitudes 2000000 [--auditoria 500000] [--semilla 42] [--anios 3]
+
+Los datos son deterministas: la misma semilla, tamaños y fecha de corte
+producen los mismos registros. Se cargan con bulk_create por lotes, sin
+pasar por save() ni señales, y al final se reconstruyen el índice de
+búsqueda de empleados y los contadores de ocupación.
+
+Distribuciones:
+- Tamaño de áreas sesgado (pocas áreas grandes, muchas chicas).
+- Antigüedad con decaimiento exponencial (media ~9 años, máximo 35).
+- Apellidos con frecuencia tipo Zipf.
+- Solicitudes concentradas en Semana Santa, verano y diciembre, solo en
+  días hábiles y dentro del periodo de elegibilidad del empleado.
+- Periodos de la tabla precalculada (apps/calculos/periodos.py).
+- Saldos por periodo congruentes con las solicitudes aprobadas, con su
+  historial de otorgamiento y uso en orden cronológico.
+- Auditoría en horario laboral de lunes a viernes.
+"""
+
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Tuple
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.areas.models import Area
+from apps.auditoria.models import LogAuditoria
+from apps.authentication.models import Usuario
+from apps.calculos.antiguedad import CalculadoraAntiguedad
+from apps.calculos.periodos import AÑOS_ADELANTE, buscar_periodo, generar_periodos_empleados, periodos_por_empleado
+from apps.catalogos.models import TipoDiaEconomico, TipoVacacion
+from apps.empleados.busqueda import indexar_empleados
+from apps.empleados.models import Empleado, PeriodoEmpleado
+from apps.solicitudes.models import HistorialSaldo, SaldoVacaciones, Solicitud
+from apps.solicitudes.services import recalcular_ocupacion
+from apps.solicitudes.validators import ESTADOS_ACTIVOS
+
+
+NOMBRES = [
+    'José', 'María', 'Juan', 'Guadalupe', 'Luis', 'Ana', 'Carlos', 'Rosa', 'Jorge', 'Patricia',
+    'Miguel', 'Laura', 'Francisco', 'Leticia', 'Alejandro', 'Elizabeth', 'Ricardo', 'Verónica',
+    'Fernando', 'Gabriela', 'Roberto', 'Adriana', 'Eduardo', 'Claudia', 'Arturo', 'Silvia',
+    'Héctor', 'Alejandra', 'Raúl', 'Martha', 'Sergio', 'Norma', 'Javier', 'Araceli',
+]
+APELLIDOS = [
+    'Hernández', 'García', 'Martínez', 'López', 'González', 'Pérez', 'Rodríguez', 'Sánchez',
+    'Ramírez', 'Cruz', 'Flores', 'Gómez', 'Morales', 'Vázquez', 'Reyes', 'Jiménez', 'Torres',
+    'Díaz', 'Gutiérrez', 'Ruiz', 'Mendoza', 'Aguilar', 'Ortiz', 'Moreno', 'Castillo', 'Romero',
+    'Álvarez', 'Méndez', 'Chávez', 'Rivera', 'Juárez', 'Ramos', 'Domínguez', 'Herrera', 'Medina',
+    'Castro', 'Vargas', 'Guzmán', 'Velázquez', 'Muñoz', 'Rojas', 'Salazar', 'Contreras', 'Luna',
+    'Ortega', 'Guerrero', 'Estrada', 'Bautista', 'Cortés', 'Soto', 'Alvarado', 'Espinoza',
+    'Lara', 'Ávila', 'Ríos', 'Cervantes', 'Silva', 'Delgado', 'Vega', 'Márquez', 'Sandoval',
+    'Fernández', 'León', 'Carrillo', 'Mejía', 'Solís', 'Núñez', 'Rosas', 'Campos', 'Santiago',
+]
+PESOS_APELLIDOS = [1 / (i + 1) for i in range(len(APELLIDOS))]
+CATEGORIAS = ['Conductor', 'Taquillero', 'Mantenimiento', 'Vigilancia', 'Administrativo', 'Supervisor']
+LINEAS = ['1', '2', '3', '4', '5', '6', '7', '8', '9', 'A', 'B', '12']
+TURNOS = ['Matutino', 'Vespertino', 'Nocturno']
+
+# Peso relativo de cada mes como inicio de vacaciones
+PESOS_MES = {1: 0.6, 2: 0.5, 3: 0.9, 4: 1.6, 5: 0.8, 6: 0.9,
+             7: 2.0, 8: 1.4, 9: 0.6, 10: 0.6, 11: 0.9, 12: 2.2}
+MAX_PESO_MES = max(PESOS_MES.values())
+
+DIAS_VACACIONES = [1, 2, 3, 4, 5, 6, 8, 10]
+PESOS_DIAS_VACACIONES = [6, 8, 10, 6, 12, 5, 3, 2]
+DIAS_ECONOMICOS = [1, 2, 3]
+PESOS_DIAS_ECONOMICOS = [7, 2, 1]
+PROPORCION_DIA_ECONOMICO = 0.25
+
+ESTADOS_PASADOS = ['aprobada', 'rechazada', 'cancelada', 'pendiente']
+PESOS_ESTADOS_PASADOS = [80, 8, 7, 5]
+ESTADOS_FUTUROS = ['pendiente', 'aprobada']
+PESOS_ESTADOS_FUTUROS = [60, 40]
+
+ACCIONES_AUDITORIA = [
+    ('login', 'usuarios'), ('crear', 'solicitudes'), ('aprobar', 'solicitudes'),
+    ('rechazar', 'solicitudes'), ('actualizar', 'empleados'), ('crear', 'empleados'),
+    ('generar_pdf', 'solicitudes'), ('actualizar', 'saldos_vacaciones'),
+]
+PESOS_AUDITORIA = [30, 25, 20, 3, 8, 2, 10, 2]
+AGENTES = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5) AppleWebKit/605.1.15 Version/17.0 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0',
+]
+
+
+@contextmanager
+def fechas_explicitas(*campos):
+    """Desactiva auto_now/auto_now_add para guardar fechas históricas con bulk_create"""
+    originales = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originales:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Genera áreas, empleados, solicitudes, saldos y auditoría sintéticos para pruebas de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--areas', type=int, default=50)
+        parser.add_argument('--empleados', type=int, default=100000)
+        parser.add_argument('--solicitudes', type=int, default=2000000)
+        parser.add_argument('--auditoria', type=int, help='Renglones de auditoría (default: solicitudes / 4)')
+        parser.add_argument('--anios', type=int, default=3, help='Años de historial hasta la fecha de corte')
+        parser.add_argument('--fecha-corte', type=date.fromisoformat, default=date.today(),
+                            help='Fecha AAAA-MM-DD que separa solicitudes pasadas de futuras (default: hoy)')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--lote', type=int, default=5000, help='Registros por bulk_create')
+        parser.add_argument('--prefijo', default='SINT', help='Prefijo de códigos de área y expedientes')
+
+    def handle(self, *args, **options):
+        self.prefijo = options['prefijo'].upper()
+        self.lote = options['lote']
+        self.corte = options['fecha_corte']
+        self.rng = random.Random(options['semilla'])
+        self.calculadora = CalculadoraAntiguedad()
+        self.inicio = date(self.corte.year - options['anios'] + 1, 1, 1)
+        self.fin = date(self.corte.year, 12, 31)
+
+        if options['areas'] < 1 or options['empleados'] < 1:
+            raise CommandError('Se requiere al menos un área y un empleado.')
+        if Area.objects.filter(codigo__startswith=f'{self.prefijo}_').exists():
+            raise CommandError(f'Ya existen áreas con el prefijo {self.prefijo}; use otro --prefijo.')
+
+        areas = self.crear_areas(options['areas'])
+        self.stdout.write(f'Áreas: {len(areas)}')
+
+        empleados = self.crear_empleados(areas, options['empleados'])
+        self.stdout.write(f'Empleados: {len(empleados)}')
+
+        totales = self.crear_solicitudes_y_saldos(areas, empleados, options['solicitudes'])
+        self.stdout.write(
+            f"Solicitudes: {totales['solicitudes']}, saldos: {totales['saldos']}, "
+            f"historial: {totales['historial']}"
+        )
+
+        auditoria = options['auditoria']
+        if auditoria is None:
+            auditoria = options['solicitudes'] // 4
+        self.stdout.write(f'Auditoría: {self.crear_auditoria(empleados, auditoria)}')
+
+        for area_id, *_ in areas:
+            for año in range(self.inicio.year, self.fin.year + 1):
+                recalcular_ocupacion(area_id, año)
+        self.stdout.write(self.style.SUCCESS('Datos sintéticos generados'))
+
+    def guardar(self, modelo, objetos: List):
+        if objetos:
+            modelo.objects.bulk_create(objetos, batch_size=self.lote)
+            objetos.clear()
+
+    # ========================================================================
+    # ÁREAS Y EMPLEADOS
+    # ========================================================================
+
+    def crear_areas(self, total: int) -> List[Tuple[int, int, int, int]]:
+        """Crea áreas con su admin y catálogos; regresa (area_id, tipo_vacacion_id, tipo_dia_id, admin_id)"""
+        codigos = [f'{self.prefijo}_{i:03d}' for i in range(1, total + 1)]
+        with transaction.atomic():
+            Area.objects.bulk_create([
+                Area(nombre=f'Área sintética {i}', codigo=codigo, descripcion='Datos para pruebas de carga')
+                for i, codigo in enumerate(codigos, 1)
+            ])
+            # MySQL no regresa los ids de bulk_create
+            ids = dict(Area.objects.filter(codigo__in=codigos).values_list('codigo', 'id'))
+            area_ids = [ids[codigo] for codigo in codigos]
+
+            TipoVacacion.objects.bulk_create([
+                TipoVacacion(nombre='Vacaciones ordinarias', codigo='ORDINARIAS', area_id=area_id)
+                for area_id in area_ids
+            ])
+            TipoDiaEconomico.objects.bulk_create([
+                TipoDiaEconomico(nombre='Día económico', codigo='ECONOMICO', categoria='con_goce',
+                                 limite_dias=6, area_id=area_id)
+                for area_id in area_ids
+            ])
+            usuarios = []
+            for i, area_id in enumerate(area_ids, 1):
+                usuario = Usuario(email=f'{self.prefijo.lower()}{i:03d}@sintetico.local', nombre='Admin',
+                                  apellidos=f'Área {i}', rol='admin_area', area_id=area_id)
+                usuario.set_unusable_password()
+                usuarios.append(usuario)
+            Usuario.objects.bulk_create(usuarios)
+
+        tipos_vacacion = dict(
+            TipoVacacion.objects.filter(area_id__in=area_ids, codigo='ORDINARIAS').values_list('area_id', 'id')
+        )
+        tipos_dia = dict(
+            TipoDiaEconomico.objects.filter(area_id__in=area_ids, codigo='ECONOMICO').values_list('area_id', 'id')
+        )
+        admins = dict(
+            Usuario.objects.filter(area_id__in=area_ids, rol='admin_area').values_list('area_id', 'id')
+        )
+        return [
+            (area_id, tipos_vacacion[area_id], tipos_dia[area_id], admins[area_id]) for area_id in area_ids
+        ]
+
+    def fecha_ingreso(self) -> date:
+        rng = self.rng
+        antiguedad = min(rng.expovariate(1 / 9), 35)
+        fecha = self.corte - timedelta(days=int(antiguedad * 365.25) + 30)
+        # Sin 29 de febrero: el aniversario debe existir en todos los años
+        if fecha.month == 2 and fecha.day == 29:
+            fecha = fecha.replace(day=28)
+        return fecha
+
+    def crear_empleados(self, areas, total: int) -> List[Tuple[int, int, date]]:
+        """Crea los empleados por lotes; regresa (empleado_id, índice de área, fecha_ingreso)"""
+        rng = self.rng
+        pesos_area = [rng.lognormvariate(0, 1) for _ in areas]
+        indices_area = rng.choices(range(len(areas)), weights=pesos_area, k=total)
+
+        empleados = []
+        for inicio in range(0, total, self.lote):
+            lote = {}
+            for i in range(inicio, min(inicio + self.lote, total)):
+                indice_area = indices_area[i]
+                categoria = rng.choice(CATEGORIAS)
+                expediente = f'{self.prefijo}{i + 1:07d}'
+                lote[expediente] = (indice_area, Empleado(
+                    area_id=areas[indice_area][0],
+                    numero_expediente=expediente,
+                    nombre=rng.choice(NOMBRES),
+                    apellidos=' '.join(rng.choices(APELLIDOS, weights=PESOS_APELLIDOS, k=2)),
+                    fecha_ingreso=self.fecha_ingreso(),
+                    categoria_laboral=categoria,
+                    linea_metro=rng.choice(LINEAS),
+                    turno=rng.choice(TURNOS),
+                    es_taquilla=categoria == 'Taquillero',
+                    activo=rng.random() > 0.03,
+                ))
+
+            with transaction.atomic():
+                Empleado.objects.bulk_create([empleado for _, empleado in lote.values()])
+                guardados = list(
+                    Empleado.objects.filter(numero_expediente__in=lote.keys())
+                    .only('id', 'numero_expediente', 'nombre', 'apellidos', 'fecha_ingreso')
+                )
+                indexar_empleados(guardados)
+                # Hasta el periodo 1 del año siguiente a la fecha de corte
+                generar_periodos_empleados(
+                    guardados, max(AÑOS_ADELANTE, self.fin.year + 1 - date.today().year)
+                )
+
+            guardados.sort(key=lambda empleado: empleado.numero_expediente)
+            empleados.extend(
+                (empleado.id, lote[empleado.numero_expediente][0], empleado.fecha_ingreso)
+                for empleado in guardados
+            )
+        return empleados
+
+    # ========================================================================
+    # SOLICITUDES, SALDOS E HISTORIAL
+    # ========================================================================
+
+    def fecha_estacional(self, desde: date, hasta: date) -> date:
+        """Día hábil entre desde y hasta con más peso en temporadas vacacionales"""
+        rng = self.rng
+        dias = (hasta - desde).days
+        while True:
+            fecha = desde + timedelta(days=rng.randint(0, dias))
+            if fecha.weekday() < 5 and rng.random() * MAX_PESO_MES < PESOS_MES[fecha.month]:
+                return fecha
+
+    def crear_solicitudes_y_saldos(self, areas, empleados, total: int) -> Dict[str, int]:
+        """
+        Genera las solicitudes de cada empleado en orden cronológico
+
+        Una vacación que excede el saldo del periodo se registra como
+        rechazada, de modo que los saldos nunca quedan negativos. Las
+        pendientes y aprobadas de un empleado no se empalman entre sí (como
+        en validar_traslapes_lote); la que chocaría queda rechazada.
+        """
+        rng = self.rng
+        # Actividad por empleado: unos pocos concentran muchas solicitudes
+        pesos = [rng.gammavariate(2, 1) for _ in empleados]
+        conteos = [0] * len(empleados)
+        for indice in rng.choices(range(len(empleados)), weights=pesos, k=total):
+            conteos[indice] += 1
+
+        solicitudes, saldos, historial = [], [], []
+        totales = {'solicitudes': 0, 'saldos': 0, 'historial': 0}
+        campos_fecha = [Solicitud._meta.get_field('fecha_creacion'), Solicitud._meta.get_field('fecha_actualizacion'),
+                        HistorialSaldo._meta.get_field('fecha_movimiento')]
+        folio = 0
+
+        def escribir():
+            with transaction.atomic(), fechas_explicitas(*campos_fecha):
+                self.guardar(Solicitud, solicitudes)
+                self.guardar(SaldoVacaciones, saldos)
+                self.guardar(HistorialSaldo, historial)
+
+        for indice, ((empleado_id, indice_area, fecha_ingreso), conteo) in enumerate(zip(empleados, conteos)):
+            if indice % self.lote == 0:
+                periodos_lote = periodos_por_empleado(
+                    [empleado[0] for empleado in empleados[indice:indice + self.lote]], self.inicio, self.fin
+                )
+            periodos = periodos_lote.get(empleado_id, [])
+            area_id, tipo_vacacion_id, tipo_dia_id, admin_id = areas[indice_area]
+            elegible = max(self.inicio, fecha_ingreso + relativedelta(months=6))
+            desde_ingreso = max(self.inicio, fecha_ingreso)
+
+            fechas = []
+            for _ in range(conteo):
+                es_vacacion = elegible <= self.fin - timedelta(days=7) and rng.random() >= PROPORCION_DIA_ECONOMICO
+                fechas.append((self.fecha_estacional(elegible if es_vacacion else desde_ingreso, self.fin), es_vacacion))
+            fechas.sort()
+
+            usados: Dict[str, List] = {}
+            ultimo_reanudar = date.min
+            for fecha_inicio, es_vacacion in fechas:
+                if es_vacacion:
+                    dias = rng.choices(DIAS_VACACIONES, weights=PESOS_DIAS_VACACIONES)[0]
+                else:
+                    dias = rng.choices(DIAS_ECONOMICOS, weights=PESOS_DIAS_ECONOMICOS)[0]
+                if fecha_inicio <= self.corte:
+                    estado = rng.choices(ESTADOS_PASADOS, weights=PESOS_ESTADOS_PASADOS)[0]
+                else:
+                    estado = rng.choices(ESTADOS_FUTUROS, weights=PESOS_ESTADOS_FUTUROS)[0]
+
+                fecha_reanudar = self.calculadora.calcular_fecha_reanudacion(fecha_inicio, dias)
+                if estado in ESTADOS_ACTIVOS and fecha_inicio < ultimo_reanudar:
+                    # Se empalma con otra solicitud pendiente o aprobada del empleado
+                    estado = 'rechazada'
+
+                periodo = buscar_periodo(periodos, fecha_inicio) if es_vacacion else None
+                if es_vacacion and periodo is None:
+                    # Cae entre dos periodos (ingresos a fin de mes): no hay saldo que descontar
+                    estado = 'rechazada'
+                if es_vacacion and estado == 'aprobada':
+                    movimientos = usados.setdefault(periodo.periodo, [periodo.dias_otorgados, []])
+                    if dias > movimientos[0] - sum(d for d, _, _ in movimientos[1]):
+                        estado = 'rechazada'
+
+                folio += 1
+                fecha_solicitud = fecha_inicio - timedelta(days=rng.randint(3, 45))
+                creacion = timezone.make_aware(
+                    datetime.combine(fecha_solicitud, time(rng.randint(7, 19), rng.randint(0, 59)))
+                )
+                solicitud = Solicitud(
+                    id=uuid.UUID(int=rng.getrandbits(128), version=4),
+                    folio=f'{self.prefijo}-{fecha_solicitud:%Y}-{folio:08d}',
+                    tipo_solicitud='vacaciones' if es_vacacion else 'dia_economico',
+                    tipo_vacacion_id=tipo_vacacion_id if es_vacacion else None,
+                    tipo_dia_economico_id=None if es_vacacion else tipo_dia_id,
+                    empleado_id=empleado_id,
+                    area_id=area_id,
+                    fecha_solicitud=fecha_solicitud,
+                    fecha_inicio=fecha_inicio,
+                    fecha_reanudar=fecha_reanudar,
+                    dias_habiles=dias,
+                    periodo=periodo.periodo if periodo else None,
+                    estado=estado,
+                    creado_por_id=admin_id,
+                    fecha_creacion=creacion,
+                    fecha_actualizacion=creacion + timedelta(hours=rng.randint(1, 72)),
+                )
+                solicitudes.append(solicitud)
+                if estado in ESTADOS_ACTIVOS:
+                    ultimo_reanudar = fecha_reanudar
+                if es_vacacion and estado == 'aprobada':
+                    usados[periodo.periodo][1].append((dias, solicitud.id, solicitud.fecha_actualizacion))
+
+            self.saldos_empleado(empleado_id, fecha_ingreso, periodos, usados, saldos, historial)
+            totales['solicitudes'] += len(fechas)
+
+            if len(solicitudes) >= self.lote:
+                totales['saldos'] += len(saldos)
+                totales['historial'] += len(historial)
+                escribir()
+
+        totales['saldos'] += len(saldos)
+        totales['historial'] += len(historial)
+        escribir()
+        return totales
+
+    def saldos_empleado(self, empleado_id: int, fecha_ingreso: date, periodos: List[PeriodoEmpleado],
+                        usados: Dict[str, List], saldos: List, historial: List):
+        """Saldos de los periodos del historial con su otorgamiento y usos"""
+        # Periodos de los años del historial (el primero elegible es el 1 del
+        # año siguiente al ingreso) y los de los bordes que recibieron solicitudes
+        primer_año = max(self.inicio.year, fecha_ingreso.year + 1)
+        for periodo in periodos:
+            clave = periodo.periodo
+            if clave not in usados and not primer_año <= int(clave.split('-')[0]) <= self.fin.year:
+                continue
+            otorgados, movimientos = usados.get(clave, (periodo.dias_otorgados, []))
+            utilizados = sum(dias for dias, _, _ in movimientos)
+            saldos.append(SaldoVacaciones(
+                empleado_id=empleado_id,
+                periodo=clave,
+                dias_otorgados=otorgados,
+                dias_utilizados=utilizados,
+                dias_disponibles=otorgados - utilizados,
+                fecha_inicio_periodo=periodo.fecha_inicio,
+                fecha_fin_periodo=periodo.fecha_fin,
+            ))
+
+            historial.append(HistorialSaldo(
+                empleado_id=empleado_id, periodo=clave, tipo_movimiento='otorgamiento',
+                dias_antes=0, dias_movimiento=otorgados, dias_despues=otorgados,
+                descripcion='Otorgamiento por antigüedad',
+                fecha_movimiento=timezone.make_aware(datetime.combine(periodo.fecha_inicio, time(6))),
+            ))
+            disponibles = otorgados
+            for dias, solicitud_id, fecha in movimientos:
+                historial.append(HistorialSaldo(
+                    empleado_id=empleado_id, periodo=clave, tipo_movimiento='uso',
+                    dias_antes=disponibles, dias_movimiento=-dias, dias_despues=disponibles - dias,
+                    solicitud_id=solicitud_id, descripcion='Solicitud aprobada', fecha_movimiento=fecha,
+                ))
+                disponibles -= dias
+
+    # ========================================================================
+    # AUDITORÍA
+    # ========================================================================
+
+    def crear_auditoria(self, empleados, total: int) -> int:
+        rng = self.rng
+        usuarios = list(
+            Usuario.objects.filter(area__codigo__startswith=f'{self.prefijo}_', rol='admin_area')
+            .order_by('email').values_list('id', flat=True)
+        )
+        dias = (min(self.corte, self.fin) - self.inicio).days
+        campo_fecha = LogAuditoria._meta.get_field('fecha_hora')
+
+        logs = []
+        for i in range(total):
+            while True:
+                dia = self.inicio + timedelta(days=rng.randint(0, dias))
+                if dia.weekday() < 5 or rng.random() < 0.1:
+                    break
+            hora = min(max(int(rng.gauss(12, 3)), 6), 22)
+            accion, tabla = rng.choices(ACCIONES_AUDITORIA, weights=PESOS_AUDITORIA)[0]
+            empleado_id = rng.choice(empleados)[0]
+            logs.append(LogAuditoria(
+                usuario_id=rng.choice(usuarios),
+                accion=accion,
+                tabla_afectada=tabla,
+                registro_id=empleado_id if tabla == 'empleados' else None,
+                datos_nuevos={'empleado_id': empleado_id} if tabla != 'usuarios' else None,
+                ip_address=f'10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+                user_agent=rng.choice(AGENTES),
+                fecha_hora=timezone.make_aware(datetime.combine(dia, time(hora, rng.randint(0, 59)))),
+            ))
+            if len(logs) >= self.lote:
+                with fechas_explicitas(campo_fecha):
+                    self.guardar(LogAuditoria, logs)
+
+        with fechas_explicitas(campo_fecha):
+            self.guardar(LogAuditoria, logs)
+        return total
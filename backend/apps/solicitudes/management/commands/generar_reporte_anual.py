@@ -0,0 +1,39 @@
+"""
+Genera los reportes anuales de uso por área (PDF y XLSX)
+Ejecutar: python manage.py generar_reporte_anual --anio 2025 [--area 3] [--forzar]
+
+Pensado para cron: solo regenera los reportes cuyos datos cambiaron desde
+la última generación. Las lecturas van a la réplica si está configurada.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.areas.models import Area
+from apps.solicitudes.reportes import FORMATOS_REPORTE, archivos_reporte_anual, generar_reporte_anual
+from utils.replicas import lecturas_en_replica
+
+
+class Command(BaseCommand):
+    help = 'Genera los reportes anuales de uso por área'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--anio', type=int, default=date.today().year)
+        parser.add_argument('--area', type=int, help='ID del área (default: todas las activas)')
+        parser.add_argument('--forzar', action='store_true', help='Regenerar aunque los datos no hayan cambiado')
+
+    def handle(self, *args, **options):
+        año = options['anio']
+        areas = Area.objects.filter(activo=True)
+        if options['area']:
+            areas = Area.objects.filter(pk=options['area'])
+
+        with lecturas_en_replica():
+            for area_id in areas.order_by('id').values_list('id', flat=True):
+                _, archivos = archivos_reporte_anual(area_id, año)
+                if len(archivos) == len(FORMATOS_REPORTE) and not options['forzar']:
+                    self.stdout.write(f"Área {area_id}: vigente")
+                    continue
+                huella = generar_reporte_anual(area_id, año)
+                self.stdout.write(f"Área {area_id}: generado ({huella})")
@@ -0,0 +1,44 @@
+"""
+Vence periodos y aplica el tope de días acumulables
+Ejecutar: python manage.py procesar_vencimientos_saldos [--fecha 2025-01-31] [--area 3] [--simular]
+
+Pensado para cron (diario). Con --simular solo muestra los ajustes que se
+harían; con --verbosity 2 los lista por empleado.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.areas.models import Area
+from apps.solicitudes.vencimientos import procesar_vencimientos
+
+
+class Command(BaseCommand):
+    help = 'Vence los días de periodos vencidos y recorta los saldos que exceden el tope'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', type=date.fromisoformat, default=date.today(), help='Fecha de referencia')
+        parser.add_argument('--area', type=int, help='ID del área (default: todas las activas)')
+        parser.add_argument('--simular', '--dry-run', dest='simular', action='store_true',
+                            help='Mostrar los ajustes sin aplicarlos')
+
+    def handle(self, *args, **options):
+        areas = Area.objects.filter(pk=options['area']) if options['area'] else None
+        resultado = procesar_vencimientos(options['fecha'], areas, options['simular'])
+
+        total_dias = 0
+        for area_id, movimientos in resultado.items():
+            dias = -sum(movimiento.dias_movimiento for movimiento in movimientos)
+            total_dias += dias
+            if movimientos:
+                self.stdout.write(f"Área {area_id}: {len(movimientos)} ajustes, {dias} días")
+            if options['verbosity'] > 1:
+                for movimiento in movimientos:
+                    self.stdout.write(
+                        f"  Empleado {movimiento.empleado_id} periodo {movimiento.periodo}: "
+                        f"{movimiento.dias_antes} -> {movimiento.dias_despues} ({movimiento.descripcion})"
+                    )
+
+        accion = 'se ajustarían' if options['simular'] else 'ajustados'
+        self.stdout.write(self.style.SUCCESS(f"Días {accion}: {total_dias}"))
@@ -0,0 +1,28 @@
+"""
+Reconstruye los contadores de ocupación diaria a partir de las solicitudes aprobadas
+Ejecutar: python manage.py recalcular_ocupacion --anio 2025 [--area 3]
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.areas.models import Area
+from apps.solicitudes.services import recalcular_ocupacion
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los contadores de ocupación diaria por área'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--anio', type=int, default=date.today().year)
+        parser.add_argument('--area', type=int, help='ID del área (default: todas)')
+
+    def handle(self, *args, **options):
+        areas = Area.objects.all()
+        if options['area']:
+            areas = areas.filter(pk=options['area'])
+
+        for area_id in areas.values_list('id', flat=True):
+            total = recalcular_ocupacion(area_id, options['anio'])
+            self.stdout.write(f"Área {area_id}: {total} contadores")
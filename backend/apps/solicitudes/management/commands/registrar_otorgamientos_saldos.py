@@ -0,0 +1,23 @@
+"""
+Registra en el historial el otorgamiento de los saldos que no lo tienen
+Ejecutar: python manage.py registrar_otorgamientos_saldos [--lote 1000]
+
+Los saldos creados antes de que se registrara el otorgamiento al crearlos
+no tienen movimientos de apertura y verificar_saldos los reporta como
+'sin_movimientos'. Se ejecuta una vez; volver a ejecutarlo no cambia nada.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.solicitudes.libro_saldos import lotes_empleados, registrar_otorgamientos
+
+
+class Command(BaseCommand):
+    help = 'Abre en el historial los saldos sin otorgamiento'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Empleados por transacción')
+
+    def handle(self, *args, **options):
+        total = sum(registrar_otorgamientos(lote) for lote in lotes_empleados(options['lote']))
+        self.stdout.write(self.style.SUCCESS(f"{total} saldos abiertos en el historial"))
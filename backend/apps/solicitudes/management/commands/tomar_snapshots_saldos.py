@@ -0,0 +1,41 @@
+"""
+Toma un corte de los saldos de todos los empleados a partir del historial
+Ejecutar: python manage.py tomar_snapshots_saldos [--lote 1000] [--hilos 4]
+
+Pensado para cron (p. ej. diario). Cada corte parte del anterior, de modo
+que solo suma los movimientos nuevos.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.solicitudes.libro_saldos import corte_seguro, lotes_empleados, tomar_snapshots
+
+
+def _procesar(empleado_ids, corte):
+    try:
+        return tomar_snapshots(empleado_ids, corte)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Guarda el corte de saldos por empleado calculado desde el historial'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Empleados por transacción')
+        parser.add_argument('--hilos', type=int, default=4)
+
+    def handle(self, *args, **options):
+        corte = corte_seguro()
+        lotes = lotes_empleados(options['lote'])
+        if options['hilos'] <= 1:
+            total = sum(tomar_snapshots(lote, corte) for lote in lotes)
+        else:
+            with ThreadPoolExecutor(max_workers=options['hilos']) as ejecutor:
+                futuros = [ejecutor.submit(contextvars.copy_context().run, _procesar, lote, corte) for lote in lotes]
+                total = sum(futuro.result() for futuro in futuros)
+        self.stdout.write(self.style.SUCCESS(f"Corte hasta el movimiento {corte}: {total} renglones"))
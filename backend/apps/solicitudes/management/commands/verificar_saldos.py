@@ -0,0 +1,81 @@
+"""
+Verifica que historial, saldos y solicitudes aprobadas coincidan
+Ejecutar: python manage.py verificar_saldos [--lote 1000] [--hilos 4]
+          [--empleado 10 --empleado 11] [--salida diferencias.json] [--reparar]
+
+Recorre los empleados en lotes repartidos entre hilos (cada hilo usa su
+propia conexión). Los empleados con diferencias se vuelven a verificar al
+final, para descartar las causadas por escrituras durante el recorrido.
+Con --reparar los saldos que no coinciden con el historial se reescriben
+desde él (el historial es la fuente de verdad). Sin --reparar, las
+lecturas van a la réplica si está configurada. Termina con error si
+quedan diferencias.
+"""
+
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.solicitudes.libro_saldos import lotes_empleados, reparar_desde_libro, verificar_lote
+from utils.replicas import lecturas_en_replica
+
+
+def _procesar(empleado_ids):
+    try:
+        return verificar_lote(empleado_ids)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Compara historial, saldos y solicitudes aprobadas de todos los empleados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Empleados por lote')
+        parser.add_argument('--hilos', type=int, default=4)
+        parser.add_argument('--empleado', type=int, action='append', help='Solo estos empleados')
+        parser.add_argument('--salida', help='Archivo JSON donde escribir las diferencias')
+        parser.add_argument('--reparar', action='store_true', help='Reescribir los saldos desde el historial')
+        parser.add_argument('--mostrar', type=int, default=20, help='Diferencias a imprimir')
+
+    def handle(self, *args, **options):
+        if options['reparar']:
+            diferencias = self.verificar(options)
+        else:
+            with lecturas_en_replica():
+                diferencias = self.verificar(options)
+
+        if options['reparar'] and diferencias:
+            reparados = reparar_desde_libro(diferencias)
+            self.stdout.write(f"Saldos reparados desde el historial: {reparados}")
+            diferencias = self.verificar(dict(options, empleado=sorted({d['empleado_id'] for d in diferencias})))
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(diferencias, archivo, indent=2, ensure_ascii=False)
+
+        for d in diferencias[:options['mostrar']]:
+            self.stdout.write(
+                f"Empleado {d['empleado_id']} periodo {d['periodo']}: {d['tipo']} "
+                f"(saldo={d['saldo']}, historial={d['historial']}, solicitudes={d['solicitudes']}) {d['detalle']}"
+            )
+        if diferencias:
+            empleados = len({d['empleado_id'] for d in diferencias})
+            raise CommandError(f"{len(diferencias)} diferencias en {empleados} empleados")
+        self.stdout.write(self.style.SUCCESS('Historial, saldos y solicitudes coinciden'))
+
+    def verificar(self, options):
+        lotes = lotes_empleados(options['lote'], options['empleado'])
+        if options['hilos'] <= 1:
+            diferencias = [d for lote in lotes for d in verificar_lote(lote)]
+        else:
+            with ThreadPoolExecutor(max_workers=options['hilos']) as ejecutor:
+                futuros = [ejecutor.submit(contextvars.copy_context().run, _procesar, lote) for lote in lotes]
+                diferencias = [d for futuro in futuros for d in futuro.result()]
+        if not diferencias:
+            return []
+        # Segunda pasada solo sobre los empleados con diferencias
+        return verificar_lote(sorted({d['empleado_id'] for d in diferencias}))
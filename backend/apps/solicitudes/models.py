@@ -97,7 +97,8 @@ class Solicitud(models.Model):
         indexes = [
             models.Index(fields=['folio']),
             models.Index(fields=['empleado', 'tipo_solicitud']),
-            models.Index(fields=['area', 'estado']),
+            models.Index(fields=['empleado', 'estado', 'fecha_inicio']),
+            models.Index(fields=['area', 'estado', 'fecha_inicio']),
             models.Index(fields=['fecha_inicio']),
         ]
     
@@ -169,6 +170,7 @@ class SaldoVacaciones(models.Model):
         ordering = ['empleado', '-periodo']
         indexes = [
             models.Index(fields=['empleado', 'periodo']),
+            models.Index(fields=['fecha_fin_periodo']),
         ]
     
     def __str__(self):
@@ -227,4 +229,69 @@ class HistorialSaldo(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.empleado.get_full_name()} - {self.tipo_movimiento} - {self.dias_movimiento} días"
\ No newline at end of file
+        return f"{self.empleado.get_full_name()} - {self.tipo_movimiento} - {self.dias_movimiento} días"
+
+
+class SnapshotSaldo(models.Model):
+    """
+    Corte de los saldos de un empleado calculado a partir del historial
+
+    Guarda los totales por periodo que resultan de aplicar los movimientos
+    de HistorialSaldo hasta ultimo_movimiento_id (el mismo para todos los
+    periodos del empleado). La reconstrucción de saldos parte del corte y
+    solo suma los movimientos posteriores. Ver libro_saldos.py.
+    """
+
+    empleado = models.ForeignKey(
+        'empleados.Empleado',
+        on_delete=models.CASCADE,
+        related_name='snapshots_saldo'
+    )
+    periodo = models.CharField(max_length=50)
+
+    dias_otorgados = models.IntegerField()
+    dias_utilizados = models.IntegerField()
+    ultimo_movimiento_id = models.BigIntegerField()
+    fecha_corte = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'snapshots_saldo'
+        verbose_name = 'Corte de Saldo'
+        verbose_name_plural = 'Cortes de Saldo'
+        unique_together = ('empleado', 'periodo')
+
+    def __str__(self):
+        return f"{self.empleado_id} - {self.periodo} - hasta {self.ultimo_movimiento_id}"
+
+    @property
+    def dias_disponibles(self):
+        return self.dias_otorgados - self.dias_utilizados
+
+
+class OcupacionDiaria(models.Model):
+    """
+    Contador de personas ausentes por área, día y ámbito
+
+    El ámbito identifica el grupo contado: 'area' (toda el área),
+    'linea_metro:<línea>', 'turno:<turno>' o 'taquilla'. Se actualiza al
+    aprobar y cancelar solicitudes para validar la capacidad con una sola
+    lectura indexada.
+    """
+    
+    area = models.ForeignKey(
+        'areas.Area',
+        on_delete=models.CASCADE,
+        related_name='ocupacion_diaria'
+    )
+    ambito = models.CharField(max_length=100)
+    fecha = models.DateField()
+    ausentes = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'ocupacion_diaria'
+        verbose_name = 'Ocupación Diaria'
+        verbose_name_plural = 'Ocupación Diaria'
+        unique_together = ('area', 'ambito', 'fecha')
+    
+    def __str__(self):
+        return f"{self.area_id} - {self.ambito} - {self.fecha}: {self.ausentes}"
@@ -0,0 +1,321 @@
+"""
+Reporte anual de uso por área
+
+Resume un año de un área: días tomados por empleado y por tipo, saldos
+restantes y distribución mensual. Todo se calcula con agregaciones
+agrupadas en SQL sobre solicitudes y saldos_vacaciones (unas cuantas
+consultas por reporte, sin importar el número de empleados).
+
+Los archivos PDF y XLSX se generan en segundo plano (utils.tareas) y se
+guardan en MEDIA_ROOT/reportes/anual/<área>/<año>/ con el nombre de la
+huella de los datos: consultas agregadas baratas que cambian cuando cambia
+cualquier solicitud, saldo o empleado del área en ese año. Los agregados de
+saldos no cambian si se mueven días entre dos saldos del área, por lo que
+la huella incluye también la versión de saldos del área
+(services.version_saldos_area), que cambia con cada escritura. Mientras la
+huella no cambie, el reporte guardado sigue vigente. Que la misma huella
+no se genere dos veces a la vez depende de que el estado de las tareas
+esté en el caché compartido (ver utils/checks.py).
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import ExtractMonth
+from django.utils import timezone
+
+from apps.areas.models import Area
+from apps.empleados.models import Empleado
+from utils import tareas
+from .models import SaldoVacaciones, Solicitud
+from .services import version_saldos_area
+
+# Cambiar al modificar el contenido del reporte para invalidar los guardados
+VERSION_REPORTE = 1
+FORMATOS_REPORTE = ('pdf', 'xlsx')
+MESES = ('Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic')
+
+
+def _solicitudes_del_año(area_id: int, año: int):
+    """Solicitudes del área que inician en el año (mismo criterio que las exportaciones)"""
+    return Solicitud.objects.filter(
+        area_id=area_id, fecha_inicio__gte=date(año, 1, 1), fecha_inicio__lte=date(año, 12, 31)
+    ).order_by()
+
+
+def _saldos_del_año(area_id: int, año: int):
+    """Periodos de saldo vigentes en algún momento del año"""
+    return SaldoVacaciones.objects.filter(
+        empleado__area_id=area_id,
+        fecha_inicio_periodo__lte=date(año, 12, 31),
+        fecha_fin_periodo__gte=date(año, 1, 1),
+    ).order_by()
+
+
+def huella_reporte_anual(area_id: int, año: int) -> str:
+    """Identifica el estado de los datos del reporte con tres consultas agregadas y la versión de saldos"""
+    solicitudes = _solicitudes_del_año(area_id, año).aggregate(
+        total=Count('id'), actualizacion=Max('fecha_actualizacion'), dias=Sum('dias_habiles')
+    )
+    saldos = _saldos_del_año(area_id, año).aggregate(
+        total=Count('id'), otorgados=Sum('dias_otorgados'),
+        utilizados=Sum('dias_utilizados'), disponibles=Sum('dias_disponibles'),
+    )
+    empleados = Empleado.objects.filter(area_id=area_id).order_by().aggregate(
+        total=Count('id'), actualizacion=Max('fecha_actualizacion')
+    )
+    partes = [VERSION_REPORTE, area_id, año, version_saldos_area(area_id)]
+    for resultado in (solicitudes, saldos, empleados):
+        partes += [resultado[campo] for campo in sorted(resultado)]
+    return hashlib.sha1(repr(partes).encode()).hexdigest()[:20]
+
+
+# ============================================================================
+# DATOS
+# ============================================================================
+
+def datos_reporte_anual(area_id: int, año: int) -> Dict:
+    """
+    Calcula el contenido del reporte
+
+    Returns:
+        Diccionario con el área, los renglones por empleado (días por tipo de
+        solicitud, por mes y saldos), los días por tipo, la distribución
+        mensual del área, los conteos por estado y los totales
+    """
+    area = Area.objects.values('id', 'nombre', 'codigo').get(pk=area_id)
+    solicitudes = _solicitudes_del_año(area_id, año)
+    aprobadas = solicitudes.filter(estado='aprobada')
+
+    por_tipo = list(
+        aprobadas.values('empleado_id', 'tipo_solicitud', 'tipo_vacacion__nombre', 'tipo_dia_economico__nombre')
+        .annotate(dias=Sum('dias_habiles'), solicitudes=Count('id'))
+    )
+    por_mes = list(
+        aprobadas.annotate(mes=ExtractMonth('fecha_inicio'))
+        .values('empleado_id', 'mes', 'tipo_solicitud')
+        .annotate(dias=Sum('dias_habiles'))
+    )
+    saldos = {
+        fila['empleado_id']: fila
+        for fila in _saldos_del_año(area_id, año).values('empleado_id').annotate(
+            otorgados=Sum('dias_otorgados'), utilizados=Sum('dias_utilizados'), disponibles=Sum('dias_disponibles')
+        )
+    }
+    estados = dict(solicitudes.values_list('estado').annotate(total=Count('id')))
+
+    # Empleados del área más los que tuvieron solicitudes en ella y ya cambiaron de área
+    campos = ('id', 'numero_expediente', 'nombre', 'apellidos', 'activo')
+    empleados = {fila['id']: fila for fila in Empleado.objects.filter(area_id=area_id).values(*campos)}
+    faltantes = {fila['empleado_id'] for fila in por_tipo} - empleados.keys()
+    if faltantes:
+        empleados.update({fila['id']: fila for fila in Empleado.objects.filter(pk__in=faltantes).values(*campos)})
+
+    renglones = {
+        empleado_id: {
+            'expediente': fila['numero_expediente'],
+            'nombre': f"{fila['nombre']} {fila['apellidos']}",
+            'activo': fila['activo'],
+            'dias_vacaciones': 0,
+            'dias_economicos': 0,
+            'solicitudes': 0,
+            'por_mes': [0] * 12,
+            'otorgados': saldos.get(empleado_id, {}).get('otorgados') or 0,
+            'utilizados': saldos.get(empleado_id, {}).get('utilizados') or 0,
+            'disponibles': saldos.get(empleado_id, {}).get('disponibles') or 0,
+        }
+        for empleado_id, fila in empleados.items()
+    }
+
+    tipos = {}
+    detalle_tipos = []
+    for fila in por_tipo:
+        renglon = renglones[fila['empleado_id']]
+        vacaciones = fila['tipo_solicitud'] == 'vacaciones'
+        renglon['dias_vacaciones' if vacaciones else 'dias_economicos'] += fila['dias']
+        renglon['solicitudes'] += fila['solicitudes']
+        nombre_tipo = (fila['tipo_vacacion__nombre'] if vacaciones else fila['tipo_dia_economico__nombre']) or '-'
+        clave = (fila['tipo_solicitud'], nombre_tipo)
+        acumulado = tipos.setdefault(clave, {'dias': 0, 'solicitudes': 0, 'empleados': 0})
+        acumulado['dias'] += fila['dias']
+        acumulado['solicitudes'] += fila['solicitudes']
+        acumulado['empleados'] += 1
+        detalle_tipos.append((renglon['expediente'], renglon['nombre'], fila['tipo_solicitud'],
+                              nombre_tipo, fila['dias'], fila['solicitudes']))
+
+    mensual = {'vacaciones': [0] * 12, 'dia_economico': [0] * 12}
+    for fila in por_mes:
+        renglones[fila['empleado_id']]['por_mes'][fila['mes'] - 1] += fila['dias']
+        mensual[fila['tipo_solicitud']][fila['mes'] - 1] += fila['dias']
+
+    empleados_ordenados = sorted(renglones.values(), key=lambda renglon: renglon['expediente'])
+    return {
+        'area': area,
+        'anio': año,
+        'generado': timezone.localtime().strftime('%Y-%m-%d %H:%M'),
+        'meses': MESES,
+        'empleados': empleados_ordenados,
+        'por_tipo': [
+            {'tipo_solicitud': tipo_solicitud, 'tipo': nombre, **valores}
+            for (tipo_solicitud, nombre), valores in sorted(tipos.items())
+        ],
+        'detalle_tipos': sorted(detalle_tipos),
+        'mensual': mensual,
+        'estados': estados,
+        'totales': {
+            'empleados': len(empleados_ordenados),
+            'dias_vacaciones': sum(mensual['vacaciones']),
+            'dias_economicos': sum(mensual['dia_economico']),
+            'solicitudes_aprobadas': estados.get('aprobada', 0),
+            'disponibles': sum(renglon['disponibles'] for renglon in empleados_ordenados),
+        },
+    }
+
+
+# ============================================================================
+# ARCHIVOS
+# ============================================================================
+
+def escribir_xlsx_reporte(datos: Dict, ruta: str):
+    """Libro con hojas Resumen, Empleados, Por tipo y Mensual (modo write_only)"""
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    resumen = libro.create_sheet('Resumen')
+    resumen.append([f"Reporte anual {datos['anio']} - {datos['area']['nombre']} ({datos['area']['codigo']})"])
+    resumen.append(['Generado', datos['generado']])
+    resumen.append([])
+    for clave, etiqueta in (
+        ('empleados', 'Empleados'),
+        ('solicitudes_aprobadas', 'Solicitudes aprobadas'),
+        ('dias_vacaciones', 'Días de vacaciones'),
+        ('dias_economicos', 'Días económicos'),
+        ('disponibles', 'Días disponibles en saldos'),
+    ):
+        resumen.append([etiqueta, datos['totales'][clave]])
+    resumen.append([])
+    resumen.append(['Solicitudes por estado'])
+    for estado_solicitud, total in sorted(datos['estados'].items()):
+        resumen.append([estado_solicitud, total])
+    resumen.append([])
+    resumen.append(['Tipo de solicitud', 'Tipo', 'Días', 'Solicitudes', 'Empleados'])
+    for fila in datos['por_tipo']:
+        resumen.append([fila['tipo_solicitud'], fila['tipo'], fila['dias'], fila['solicitudes'], fila['empleados']])
+
+    empleados = libro.create_sheet('Empleados')
+    empleados.append(['Expediente', 'Nombre', 'Activo', 'Solicitudes', 'Días de vacaciones', 'Días económicos',
+                      'Días otorgados', 'Días utilizados', 'Días disponibles'])
+    for renglon in datos['empleados']:
+        empleados.append([renglon['expediente'], renglon['nombre'], 'Sí' if renglon['activo'] else 'No',
+                          renglon['solicitudes'], renglon['dias_vacaciones'], renglon['dias_economicos'],
+                          renglon['otorgados'], renglon['utilizados'], renglon['disponibles']])
+
+    por_tipo = libro.create_sheet('Por tipo')
+    por_tipo.append(['Expediente', 'Nombre', 'Tipo de solicitud', 'Tipo', 'Días', 'Solicitudes'])
+    for fila in datos['detalle_tipos']:
+        por_tipo.append(list(fila))
+
+    mensual = libro.create_sheet('Mensual')
+    mensual.append(['Expediente', 'Nombre', *datos['meses'], 'Total'])
+    for renglon in datos['empleados']:
+        mensual.append([renglon['expediente'], renglon['nombre'], *renglon['por_mes'], sum(renglon['por_mes'])])
+    for tipo_solicitud, etiqueta in (('vacaciones', 'Total vacaciones'), ('dia_economico', 'Total días económicos')):
+        dias = datos['mensual'][tipo_solicitud]
+        mensual.append(['', etiqueta, *dias, sum(dias)])
+
+    libro.save(ruta)
+
+
+def directorio_reporte(area_id: int, año: int) -> str:
+    return os.path.join(str(settings.MEDIA_ROOT), 'reportes', 'anual', str(area_id), str(año))
+
+
+def _guardar(directorio: str, nombre: str, escribir):
+    """Escribe en un temporal del mismo directorio y lo renombra (nunca se ve a medias)"""
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    os.close(descriptor)
+    try:
+        escribir(temporal)
+        os.replace(temporal, os.path.join(directorio, nombre))
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def generar_reporte_anual(area_id: int, año: int) -> str:
+    """
+    Genera el XLSX y el PDF del reporte y borra los de huellas anteriores
+
+    Returns:
+        Huella con la que se guardaron los archivos
+    """
+    from apps.pdf_generation.reporte_anual import generar_pdf_reporte_anual
+
+    inicio = time.time()
+    huella = huella_reporte_anual(area_id, año)
+    datos = datos_reporte_anual(area_id, año)
+    directorio = directorio_reporte(area_id, año)
+    os.makedirs(directorio, exist_ok=True)
+
+    _guardar(directorio, f'{huella}.xlsx', lambda ruta: escribir_xlsx_reporte(datos, ruta))
+    _guardar(directorio, f'{huella}.pdf', lambda ruta: generar_pdf_reporte_anual(datos, ruta))
+
+    # Solo los de huellas anteriores: una generación más reciente de otra
+    # huella (con datos más nuevos) pudo terminar mientras corría esta
+    for nombre in os.listdir(directorio):
+        if nombre.startswith(huella) or nombre.endswith('.tmp'):
+            continue
+        ruta = os.path.join(directorio, nombre)
+        try:
+            if os.path.getmtime(ruta) < inicio:
+                os.remove(ruta)
+        except FileNotFoundError:
+            # Otra generación ya lo borró
+            pass
+    return huella
+
+
+def archivos_reporte_anual(area_id: int, año: int, huella: Optional[str] = None) -> Tuple[str, Dict[str, str]]:
+    """Regresa (huella vigente, {formato: ruta}) de los archivos ya generados"""
+    huella = huella or huella_reporte_anual(area_id, año)
+    directorio = directorio_reporte(area_id, año)
+    archivos = {}
+    for formato in FORMATOS_REPORTE:
+        ruta = os.path.join(directorio, f'{huella}.{formato}')
+        if os.path.exists(ruta):
+            archivos[formato] = ruta
+    return huella, archivos
+
+
+def estado_reporte_anual(area_id: int, año: int, generar: bool = False) -> Dict:
+    """
+    Estado del reporte vigente; con generar=True lo encola si falta
+
+    Returns:
+        {'estado': 'listo' | 'en_proceso' | 'error' | 'pendiente',
+         'formatos': [...], 'detalle': ...}
+    """
+    huella, archivos = archivos_reporte_anual(area_id, año)
+    resultado = {'area_id': area_id, 'anio': año, 'formatos': sorted(archivos), 'detalle': ''}
+    if len(archivos) == len(FORMATOS_REPORTE):
+        return dict(resultado, estado='listo')
+
+    clave = f'reporte_anual:{area_id}:{año}:{huella}'
+    if generar:
+        tareas.encolar(clave, generar_reporte_anual, area_id, año)
+        # Con tareas síncronas el reporte ya quedó generado (o falló)
+        huella, archivos = archivos_reporte_anual(area_id, año, huella)
+        resultado['formatos'] = sorted(archivos)
+        if len(archivos) == len(FORMATOS_REPORTE):
+            return dict(resultado, estado='listo')
+
+    tarea = tareas.estado(clave)
+    if tarea is None:
+        return dict(resultado, estado='pendiente')
+    return dict(resultado, estado=tarea['estado'], detalle=tarea['detalle'])
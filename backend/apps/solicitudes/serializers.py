@@ -1,17 +1,151 @@
+from datetime import timedelta
+
+from django.conf import settings
 from rest_framework import serializers
+from apps.catalogos.models import TipoDiaEconomico, TipoVacacion
+from apps.empleados.models import Empleado
+from utils.helpers import AÑO_MAXIMO
 from .models import *
+from .validators import ValidadorSolicitud
+
+# Campos que determinan los contadores de ocupación y el saldo descontado
+CAMPOS_OCUPACION = (
+    'empleado', 'area', 'tipo_solicitud', 'tipo_vacacion', 'tipo_dia_economico',
+    'fecha_inicio', 'fecha_reanudar',
+)
+
+
+def validar_rango(fecha_inicio, fecha_fin, campo: str):
+    """
+    Limita el rango antes de contar sus días hábiles (se recorre día por día)
+
+    Raises:
+        serializers.ValidationError: Si el inicio pasa de AÑO_MAXIMO o el
+            rango excede MAX_DIAS_RANGO_SOLICITUD días naturales
+    """
+    if fecha_inicio.year > AÑO_MAXIMO:
+        raise serializers.ValidationError({'fecha_inicio': f'El año no puede ser posterior a {AÑO_MAXIMO}.'})
+    maximo = settings.APP_SETTINGS['MAX_DIAS_RANGO_SOLICITUD']
+    if fecha_fin is not None and (fecha_fin - fecha_inicio).days > maximo:
+        raise serializers.ValidationError({campo: f'El rango no puede exceder {maximo} días naturales.'})
+
 
 class SolicitudSerializer(serializers.ModelSerializer):
     class Meta:
         model = Solicitud
         fields = '__all__'
+        # El estado solo cambia en los servicios (aprobar, rechazar, cancelar);
+        # los demás se calculan al validar
+        read_only_fields = ('estado', 'dias_habiles', 'periodo', 'tiene_conflicto_descanso', 'mensaje_warning')
+        # Por omisión, el área del empleado
+        extra_kwargs = {'area': {'required': False}}
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        # El área de la solicitud es la del empleado; se valida contra la del
+        # usuario antes de consultar saldos, reglas y traslapes
+        empleado = attrs.get('empleado', getattr(self.instance, 'empleado', None))
+        if empleado is None:
+            raise serializers.ValidationError({'empleado': 'Este campo es requerido.'})
+        area = attrs.get('area', getattr(self.instance, 'area', None))
+        if area is None:
+            area = attrs['area'] = empleado.area
+        if area.pk != empleado.area_id:
+            raise serializers.ValidationError({'area': 'Debe ser el área del empleado.'})
+        vista = self.context.get('view')
+        if hasattr(vista, 'validar_area'):
+            vista.validar_area({'area': area})
+
+        if self.instance is not None and self.instance.estado != 'pendiente':
+            # Sus días ya se contaron (o se liberaron): no se recalculan aquí
+            cambiados = [
+                campo for campo in CAMPOS_OCUPACION
+                if campo in attrs and attrs[campo] != getattr(self.instance, campo)
+            ]
+            if cambiados:
+                raise serializers.ValidationError(
+                    f"Solo se pueden modificar {', '.join(cambiados)} en solicitudes pendientes"
+                )
+            return attrs
+
+        # En ediciones parciales se completan los datos con los de la instancia
+        datos = {
+            campo: attrs.get(campo, getattr(self.instance, campo, None))
+            for campo in (
+                'empleado', 'area', 'tipo_solicitud', 'tipo_vacacion', 'tipo_dia_economico',
+                'fecha_solicitud', 'fecha_inicio', 'fecha_reanudar',
+            )
+        }
+        validador = ValidadorSolicitud(datos['empleado'])
+        # Los días hábiles salen de las fechas (el último día de ausencia es el anterior a reanudar)
+        if datos['fecha_reanudar'] > datos['fecha_inicio']:
+            validar_rango(datos['fecha_inicio'], datos['fecha_reanudar'], 'fecha_reanudar')
+            datos['dias_habiles'] = validador.calculadora.calcular_dias_habiles(
+                datos['fecha_inicio'], datos['fecha_reanudar'] - timedelta(days=1),
+                dias_festivos=validador.festivos,
+            )
+            if not datos['dias_habiles']:
+                raise serializers.ValidationError({'fecha_inicio': 'El rango no contiene días hábiles.'})
+        # En importaciones el traslape se valida por lote (validar_traslapes_lote)
+        resultado = validador.validar(
+            datos,
+            excluir_id=self.instance.pk if self.instance else None,
+            validar_traslapes=not self.context.get('importacion', False),
+        )
+        if not resultado['valido']:
+            raise serializers.ValidationError({
+                'errores': resultado['errores'],
+                'advertencias': resultado['advertencias'],
+            })
+
+        attrs['dias_habiles'] = datos['dias_habiles']
+        attrs['periodo'] = resultado['periodo']
+        attrs['tiene_conflicto_descanso'] = resultado['tiene_conflicto_descanso']
+        attrs['mensaje_warning'] = '\n'.join(a['mensaje'] for a in resultado['advertencias']) or None
+        return attrs
 
 class SaldoVacacionesSerializer(serializers.ModelSerializer):
     class Meta:
         model = SaldoVacaciones
         fields = '__all__'
 
+class AjusteSaldoSerializer(serializers.Serializer):
+    """Ajuste manual de días otorgados (negativo para restar)"""
+
+    dias = serializers.IntegerField()
+    descripcion = serializers.CharField()
+
+    def validate_dias(self, valor):
+        if valor == 0:
+            raise serializers.ValidationError('El ajuste no puede ser de 0 días.')
+        return valor
+
 class HistorialSaldoSerializer(serializers.ModelSerializer):
     class Meta:
         model = HistorialSaldo
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+class SimulacionSolicitudSerializer(serializers.Serializer):
+    """Datos para simular una solicitud: fecha_inicio más dias_habiles o fecha_fin"""
+
+    empleado = serializers.PrimaryKeyRelatedField(queryset=Empleado.objects.all())
+    tipo_solicitud = serializers.ChoiceField(choices=Solicitud.TIPO_SOLICITUD)
+    tipo_vacacion = serializers.PrimaryKeyRelatedField(queryset=TipoVacacion.objects.all(), required=False, allow_null=True)
+    tipo_dia_economico = serializers.PrimaryKeyRelatedField(queryset=TipoDiaEconomico.objects.all(), required=False, allow_null=True)
+    fecha_solicitud = serializers.DateField(required=False)
+    fecha_inicio = serializers.DateField()
+    dias_habiles = serializers.IntegerField(
+        required=False, allow_null=True, min_value=1, max_value=settings.APP_SETTINGS['MAX_DIAS_SOLICITUD']
+    )
+    fecha_fin = serializers.DateField(required=False, allow_null=True)
+    periodo = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if not attrs.get('dias_habiles') and not attrs.get('fecha_fin'):
+            raise serializers.ValidationError('Debe indicar dias_habiles o fecha_fin.')
+        if attrs.get('fecha_fin') and attrs['fecha_fin'] < attrs['fecha_inicio']:
+            raise serializers.ValidationError({'fecha_fin': 'Debe ser igual o posterior a la fecha de inicio.'})
+        validar_rango(attrs['fecha_inicio'], attrs.get('fecha_fin'), 'fecha_fin')
+        return attrs
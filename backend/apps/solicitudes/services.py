@@ -0,0 +1,394 @@
+"""
+Servicios de negocio para solicitudes
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+
+from apps.calculos.ocupacion import calcular_ocupacion_anual, dias_ausencia
+from apps.configuracion.services import EvaluadorCapacidad, obtener_motor_reglas
+from apps.empleados.models import Empleado
+from utils.cache_condicional import invalidar_version, obtener_version
+from .models import Solicitud, SaldoVacaciones, HistorialSaldo, OcupacionDiaria
+
+
+# Campos de Empleado que pueden usarse como ámbito de una regla de capacidad
+CAMPOS_AMBITO = EvaluadorCapacidad.CAMPOS
+
+
+def obtener_ocupacion_area(area_id: int, año: int, turno: str = None) -> dict:
+    """
+    Calcula las personas ausentes por día en un área durante un año
+
+    Ejecuta una sola consulta por rango sobre las solicitudes aprobadas que
+    tocan el año y resuelve los conteos en memoria.
+
+    Args:
+        area_id: ID del área
+        año: Año a consultar
+        turno: Si se indica, solo cuenta empleados de ese turno
+
+    Returns:
+        Diccionario con el arreglo de conteos diarios y su máximo
+    """
+    solicitudes = Solicitud.objects.filter(
+        area_id=area_id,
+        estado='aprobada',
+        fecha_inicio__lte=date(año, 12, 31),
+        fecha_reanudar__gt=date(año, 1, 1),
+    )
+    if turno:
+        solicitudes = solicitudes.filter(empleado__turno=turno)
+
+    rangos = solicitudes.order_by().values_list('fecha_inicio', 'fecha_reanudar')
+    conteos = calcular_ocupacion_anual(rangos.iterator(chunk_size=2000), año)
+
+    return {
+        'area_id': area_id,
+        'anio': año,
+        'turno': turno,
+        'fecha_inicio': date(año, 1, 1),
+        'conteos': conteos,
+        'maximo': max(conteos),
+    }
+
+
+# ============================================================================
+# SALDOS EN CACHÉ
+# ============================================================================
+
+# Margen de seguridad por si algún proceso actualiza saldos sin pasar por save()
+SEGUNDOS_CACHE_SALDOS = 300
+
+
+def _clave_saldos(empleado_id: int) -> str:
+    return f'saldos_empleado:{empleado_id}'
+
+
+def obtener_saldos_empleado(empleado_id: int) -> Dict[str, SaldoVacaciones]:
+    """Saldos del empleado por periodo, desde caché (para consultas de solo lectura)"""
+    saldos = cache.get(_clave_saldos(empleado_id))
+    if saldos is None:
+        saldos = {s.periodo: s for s in SaldoVacaciones.objects.filter(empleado_id=empleado_id)}
+        cache.set(_clave_saldos(empleado_id), saldos, SEGUNDOS_CACHE_SALDOS)
+    return saldos
+
+
+def _grupo_saldos_area(area_id: int) -> str:
+    return f'saldos_area:{area_id}'
+
+
+def version_saldos_area(area_id: int) -> str:
+    """Versión de los saldos del área; cambia con cada escritura (huella del reporte anual)"""
+    return obtener_version(_grupo_saldos_area(area_id))[0]
+
+
+def invalidar_saldos_empleado(empleado_id: int, area_id: Optional[int] = None):
+    """Descarta los saldos en caché del empleado y cambia la versión de su área"""
+    cache.delete(_clave_saldos(empleado_id))
+    if area_id is None:
+        area_id = Empleado.objects.filter(pk=empleado_id).values_list('area_id', flat=True).first()
+    if area_id is not None:
+        invalidar_version(_grupo_saldos_area(area_id))
+
+
+# ============================================================================
+# CAPACIDAD DIARIA
+# ============================================================================
+
+def ambitos_empleado(empleado) -> List[str]:
+    """Ámbitos de ocupación en los que cuenta la ausencia de un empleado"""
+    ambitos = ['area']
+    for campo in CAMPOS_AMBITO:
+        valor = getattr(empleado, campo)
+        if valor:
+            ambitos.append(f'{campo}:{valor}')
+    if empleado.es_taquilla:
+        ambitos.append('taquilla')
+    return ambitos
+
+
+def limites_capacidad(area_id: int, empleado) -> Dict[str, int]:
+    """
+    Obtiene el máximo de ausentes por ámbito que aplica a un empleado
+
+    Configuración de la regla 'capacidad_diaria':
+        {'max_ausentes': 3, 'ambito': 'area' | 'linea_metro' | 'turno' | 'taquilla',
+         'valor': 'L1'}  # valor opcional para limitar a una línea o turno
+
+    Returns:
+        Diccionario {ambito: max_ausentes}; si varias reglas coinciden
+        se conserva la más restrictiva
+    """
+    return obtener_motor_reglas(area_id).limites_capacidad(empleado)
+
+
+def verificar_capacidad(empleado, area_id: int, fecha_inicio: date, fecha_reanudar: date,
+                        bloquear: bool = False) -> List[Dict]:
+    """
+    Busca los días en que una nueva ausencia excedería la capacidad del área
+
+    Lee los contadores de ocupación con una consulta indexada por
+    (area, ambito, fecha). Con bloquear=True los renglones se leen con
+    SELECT ... FOR UPDATE y debe llamarse dentro de una transacción.
+
+    Returns:
+        Lista de excesos con fecha, ámbito, ausentes actuales y máximo
+    """
+    limites = limites_capacidad(area_id, empleado)
+    if not limites:
+        return []
+
+    contadores = OcupacionDiaria.objects.filter(
+        area_id=area_id,
+        ambito__in=limites.keys(),
+        fecha__gte=fecha_inicio,
+        fecha__lt=fecha_reanudar,
+    )
+    if bloquear:
+        contadores = contadores.select_for_update()
+
+    excesos = []
+    ocupados = {(c.ambito, c.fecha): c.ausentes for c in contadores}
+    for dia in dias_ausencia(fecha_inicio, fecha_reanudar):
+        for ambito, maximo in limites.items():
+            ausentes = ocupados.get((ambito, dia), 0)
+            if ausentes + 1 > maximo:
+                excesos.append({
+                    'fecha': dia,
+                    'ambito': ambito,
+                    'ausentes': ausentes,
+                    'max_ausentes': maximo,
+                })
+    return excesos
+
+
+def mensaje_excesos(excesos: List[Dict]) -> str:
+    """Resume una lista de excesos de capacidad en un mensaje"""
+    fechas = sorted({e['fecha'] for e in excesos})
+    listado = ', '.join(f.strftime('%d/%m/%Y') for f in fechas[:5])
+    if len(fechas) > 5:
+        listado += f' y {len(fechas) - 5} más'
+    return f"Se excede la capacidad de personal ausente en: {listado}"
+
+
+def _actualizar_ocupacion(solicitud, delta: int):
+    """Suma delta a los contadores de cada día y ámbito de la solicitud"""
+    ambitos = ambitos_empleado(solicitud.empleado)
+    dias = dias_ausencia(solicitud.fecha_inicio, solicitud.fecha_reanudar)
+
+    OcupacionDiaria.objects.bulk_create(
+        [
+            OcupacionDiaria(area_id=solicitud.area_id, ambito=ambito, fecha=dia)
+            for ambito in ambitos
+            for dia in dias
+        ],
+        ignore_conflicts=True,
+    )
+    OcupacionDiaria.objects.filter(
+        area_id=solicitud.area_id,
+        ambito__in=ambitos,
+        fecha__gte=solicitud.fecha_inicio,
+        fecha__lt=solicitud.fecha_reanudar,
+    ).update(ausentes=F('ausentes') + delta)
+
+
+def recalcular_ocupacion(area_id: int, año: int) -> int:
+    """
+    Reconstruye los contadores de ocupación de un área para un año
+
+    Útil cuando cambia la línea, turno o taquilla de empleados con
+    solicitudes ya aprobadas.
+
+    Returns:
+        Número de contadores escritos
+    """
+    inicio = date(año, 1, 1)
+    rangos_por_ambito = {}
+    solicitudes = Solicitud.objects.filter(
+        area_id=area_id,
+        estado='aprobada',
+        fecha_inicio__lte=date(año, 12, 31),
+        fecha_reanudar__gt=inicio,
+    ).select_related('empleado').order_by()
+
+    for solicitud in solicitudes.iterator(chunk_size=2000):
+        for ambito in ambitos_empleado(solicitud.empleado):
+            rangos_por_ambito.setdefault(ambito, []).append(
+                (solicitud.fecha_inicio, solicitud.fecha_reanudar)
+            )
+
+    contadores = [
+        OcupacionDiaria(area_id=area_id, ambito=ambito, fecha=inicio + timedelta(days=i), ausentes=ausentes)
+        for ambito, rangos in rangos_por_ambito.items()
+        for i, ausentes in enumerate(calcular_ocupacion_anual(rangos, año))
+        if ausentes
+    ]
+
+    with transaction.atomic():
+        OcupacionDiaria.objects.filter(
+            area_id=area_id, fecha__year=año
+        ).delete()
+        OcupacionDiaria.objects.bulk_create(contadores, batch_size=1000)
+
+    return len(contadores)
+
+
+def ajustar_saldo(saldo_id: int, dias: int, descripcion: str) -> SaldoVacaciones:
+    """
+    Ajuste manual de los días otorgados de un saldo, registrado en el historial
+
+    Args:
+        saldo_id: Saldo a ajustar
+        dias: Días a sumar (negativo para restar)
+        descripcion: Motivo del ajuste
+
+    Raises:
+        ValidationError: Si el ajuste deja días disponibles negativos
+    """
+    with transaction.atomic():
+        saldo = SaldoVacaciones.objects.select_for_update().get(pk=saldo_id)
+        if saldo.dias_disponibles + dias < 0:
+            raise ValidationError(
+                f"El ajuste deja días negativos. Disponible: {saldo.dias_disponibles}, Ajuste: {dias}"
+            )
+
+        dias_antes = saldo.dias_disponibles
+        saldo.dias_otorgados += dias
+        saldo.dias_disponibles = saldo.dias_otorgados - saldo.dias_utilizados
+        saldo.save(update_fields=['dias_otorgados', 'dias_disponibles'])
+        HistorialSaldo.objects.create(
+            empleado_id=saldo.empleado_id,
+            periodo=saldo.periodo,
+            tipo_movimiento='ajuste',
+            dias_antes=dias_antes,
+            dias_movimiento=dias,
+            dias_despues=saldo.dias_disponibles,
+            descripcion=descripcion,
+        )
+
+    return saldo
+
+
+# ============================================================================
+# APROBACIÓN Y CANCELACIÓN
+# ============================================================================
+
+def _registrar_movimiento_saldo(solicitud, tipo_movimiento: str, dias: int):
+    """Aplica un movimiento de días al saldo del periodo y lo registra en el historial"""
+    if solicitud.tipo_solicitud != 'vacaciones' or not solicitud.periodo:
+        return
+
+    saldo = SaldoVacaciones.objects.select_for_update().filter(
+        empleado_id=solicitud.empleado_id, periodo=solicitud.periodo
+    ).first()
+    if saldo is None:
+        return
+
+    if dias > saldo.dias_disponibles:
+        raise ValidationError(
+            f"Días insuficientes. Disponible: {saldo.dias_disponibles}, Solicitado: {dias}"
+        )
+
+    dias_antes = saldo.dias_disponibles
+    saldo.actualizar_dias_utilizados(dias)
+    HistorialSaldo.objects.create(
+        empleado_id=solicitud.empleado_id,
+        periodo=solicitud.periodo,
+        tipo_movimiento=tipo_movimiento,
+        dias_antes=dias_antes,
+        dias_movimiento=-dias,
+        dias_despues=saldo.dias_disponibles,
+        solicitud=solicitud,
+        descripcion=f'Solicitud {solicitud.folio}',
+    )
+
+
+def aprobar_solicitud(solicitud_id) -> Solicitud:
+    """
+    Aprueba una solicitud pendiente
+
+    Bloquea la solicitud y los contadores de ocupación de sus días, valida la
+    capacidad y, si hay lugar, incrementa los contadores y descuenta el saldo
+    en la misma transacción.
+
+    Raises:
+        ValidationError: Si la solicitud no está pendiente o excede la capacidad
+    """
+    with transaction.atomic():
+        solicitud = Solicitud.objects.select_for_update().select_related('empleado').get(pk=solicitud_id)
+        if solicitud.estado != 'pendiente':
+            raise ValidationError('Solo se pueden aprobar solicitudes pendientes')
+
+        # Materializar los contadores para poder bloquearlos aunque sea el primer uso del día
+        OcupacionDiaria.objects.bulk_create(
+            [
+                OcupacionDiaria(area_id=solicitud.area_id, ambito=ambito, fecha=dia)
+                for ambito in limites_capacidad(solicitud.area_id, solicitud.empleado)
+                for dia in dias_ausencia(solicitud.fecha_inicio, solicitud.fecha_reanudar)
+            ],
+            ignore_conflicts=True,
+        )
+        excesos = verificar_capacidad(
+            solicitud.empleado, solicitud.area_id,
+            solicitud.fecha_inicio, solicitud.fecha_reanudar,
+            bloquear=True,
+        )
+        if excesos:
+            raise ValidationError(mensaje_excesos(excesos))
+
+        _actualizar_ocupacion(solicitud, 1)
+        _registrar_movimiento_saldo(solicitud, 'uso', solicitud.dias_habiles)
+
+        solicitud.estado = 'aprobada'
+        solicitud.save(update_fields=['estado', 'fecha_actualizacion'])
+
+    return solicitud
+
+
+def rechazar_solicitud(solicitud_id) -> Solicitud:
+    """
+    Rechaza una solicitud pendiente (no ocupa contadores ni saldo)
+
+    Raises:
+        ValidationError: Si la solicitud no está pendiente
+    """
+    with transaction.atomic():
+        solicitud = Solicitud.objects.select_for_update().get(pk=solicitud_id)
+        if solicitud.estado != 'pendiente':
+            raise ValidationError('Solo se pueden rechazar solicitudes pendientes')
+
+        solicitud.estado = 'rechazada'
+        solicitud.save(update_fields=['estado', 'fecha_actualizacion'])
+
+    return solicitud
+
+
+def cancelar_solicitud(solicitud_id) -> Solicitud:
+    """
+    Cancela una solicitud pendiente o aprobada
+
+    Si estaba aprobada libera su lugar en los contadores de ocupación y
+    devuelve los días al saldo.
+
+    Raises:
+        ValidationError: Si la solicitud ya estaba rechazada o cancelada
+    """
+    with transaction.atomic():
+        solicitud = Solicitud.objects.select_for_update().select_related('empleado').get(pk=solicitud_id)
+        if solicitud.estado not in ('pendiente', 'aprobada'):
+            raise ValidationError('La solicitud ya no puede cancelarse')
+
+        if solicitud.estado == 'aprobada':
+            _actualizar_ocupacion(solicitud, -1)
+            _registrar_movimiento_saldo(solicitud, 'cancelacion', -solicitud.dias_habiles)
+
+        solicitud.estado = 'cancelada'
+        solicitud.save(update_fields=['estado', 'fecha_actualizacion'])
+
+    return solicitud
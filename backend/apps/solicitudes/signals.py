@@ -0,0 +1,23 @@
+"""
+Señales de solicitudes: abren el historial de los saldos nuevos e invalidan
+el caché de saldos al modificarse
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .libro_saldos import movimientos_apertura
+from .models import HistorialSaldo, SaldoVacaciones
+from .services import invalidar_saldos_empleado
+
+
+@receiver(post_save, sender=SaldoVacaciones)
+@receiver(post_delete, sender=SaldoVacaciones)
+def saldo_modificado(sender, instance, **kwargs):
+    invalidar_saldos_empleado(instance.empleado_id)
+
+
+@receiver(post_save, sender=SaldoVacaciones)
+def saldo_creado(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        HistorialSaldo.objects.bulk_create(movimientos_apertura(instance))
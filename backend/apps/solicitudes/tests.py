@@ -0,0 +1,666 @@
+"""
+Pruebas de traslapes, aprobación con capacidad diaria, escritura de solicitudes
+por la API y lecturas en la réplica
+"""
+
+from datetime import date
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.areas.models import Area
+from apps.authentication.models import Usuario
+from apps.catalogos.models import TipoVacacion
+from apps.configuracion.models import ReglaArea
+from apps.empleados.models import Empleado
+from utils.replicas import ALIAS as ALIAS_REPLICA, lecturas_en_replica
+from . import services
+from .libro_saldos import registrar_otorgamientos, reparar_desde_libro, tomar_snapshots, totales_libro, verificar_lote
+from .models import HistorialSaldo, OcupacionDiaria, SaldoVacaciones, SnapshotSaldo, Solicitud
+from .vencimientos import procesar_area
+from .validators import ValidadorSolicitud, validar_traslapes_lote
+
+
+class TraslapesTestCase(TestCase):
+    """Traslapes con rangos semiabiertos [fecha_inicio, fecha_reanudar)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        cls.tipo = TipoVacacion.objects.create(nombre='Vacaciones Regulares', codigo='VAC_REG')
+        cls.usuario = Usuario.objects.create_user(
+            email='admin@metro.gob.mx', nombre='Admin', apellidos='Área', rol='admin_area', area=cls.area
+        )
+        cls.empleado = cls.crear_empleado('1001')
+        cls.otro_empleado = cls.crear_empleado('1002')
+        # Ausente del lunes 3 al viernes 7; reanuda el lunes 10
+        cls.existente = cls.crear_solicitud(cls.empleado, date(2025, 3, 3), date(2025, 3, 10), 'SOL-1')
+
+    @classmethod
+    def crear_empleado(cls, expediente):
+        return Empleado.objects.create(
+            area=cls.area,
+            numero_expediente=expediente,
+            nombre='Nombre',
+            apellidos='Apellidos',
+            fecha_ingreso=date(2015, 1, 1),
+        )
+
+    @classmethod
+    def crear_solicitud(cls, empleado, fecha_inicio, fecha_reanudar, folio, estado='pendiente'):
+        return Solicitud.objects.create(
+            folio=folio,
+            empleado=empleado,
+            area=cls.area,
+            tipo_solicitud='vacaciones',
+            tipo_vacacion=cls.tipo,
+            fecha_inicio=fecha_inicio,
+            fecha_reanudar=fecha_reanudar,
+            dias_habiles=5,
+            estado=estado,
+            creado_por=cls.usuario,
+        )
+
+    def traslapa(self, fecha_inicio, fecha_reanudar, empleado=None, excluir_id=None):
+        validador = ValidadorSolicitud(empleado or self.empleado)
+        resultado = validador.validar({'fecha_inicio': fecha_inicio, 'fecha_reanudar': fecha_reanudar}, excluir_id)
+        return 'traslape' in [error['codigo'] for error in resultado['errores']]
+
+    def test_inicia_el_dia_de_reanudacion(self):
+        self.assertFalse(self.traslapa(date(2025, 3, 10), date(2025, 3, 12)))
+
+    def test_inicia_un_dia_antes_de_reanudar(self):
+        self.assertTrue(self.traslapa(date(2025, 3, 7), date(2025, 3, 12)))
+
+    def test_reanuda_el_dia_de_inicio_existente(self):
+        self.assertFalse(self.traslapa(date(2025, 2, 24), date(2025, 3, 3)))
+
+    def test_reanuda_un_dia_despues_del_inicio_existente(self):
+        self.assertTrue(self.traslapa(date(2025, 2, 24), date(2025, 3, 4)))
+
+    def test_rango_contenido_y_contenedor(self):
+        self.assertTrue(self.traslapa(date(2025, 3, 4), date(2025, 3, 5)))
+        self.assertTrue(self.traslapa(date(2025, 3, 1), date(2025, 3, 15)))
+
+    def test_ignora_canceladas_y_rechazadas(self):
+        self.crear_solicitud(self.empleado, date(2025, 4, 1), date(2025, 4, 3), 'SOL-2', 'cancelada')
+        self.crear_solicitud(self.empleado, date(2025, 4, 7), date(2025, 4, 9), 'SOL-3', 'rechazada')
+        self.assertFalse(self.traslapa(date(2025, 4, 1), date(2025, 4, 10)))
+
+    def test_considera_aprobadas(self):
+        self.crear_solicitud(self.empleado, date(2025, 4, 1), date(2025, 4, 3), 'SOL-2', 'aprobada')
+        self.assertTrue(self.traslapa(date(2025, 4, 2), date(2025, 4, 4)))
+
+    def test_ignora_otros_empleados(self):
+        self.assertFalse(self.traslapa(date(2025, 3, 3), date(2025, 3, 10), self.otro_empleado))
+
+    def test_excluye_la_propia_solicitud_al_editar(self):
+        self.assertFalse(self.traslapa(date(2025, 3, 4), date(2025, 3, 11), excluir_id=self.existente.pk))
+        self.assertTrue(self.traslapa(date(2025, 3, 4), date(2025, 3, 11)))
+
+    def test_lote_contra_existentes(self):
+        errores = validar_traslapes_lote([
+            {'empleado_id': self.empleado.id, 'fecha_inicio': date(2025, 3, 10), 'fecha_reanudar': date(2025, 3, 12)},
+            {'empleado_id': self.empleado.id, 'fecha_inicio': date(2025, 2, 28), 'fecha_reanudar': date(2025, 3, 4)},
+        ])
+        self.assertEqual([e['indice'] for e in errores], [1])
+        self.assertIn('SOL-1', errores[0]['mensaje'])
+
+    def test_lote_entre_filas(self):
+        errores = validar_traslapes_lote([
+            {'empleado_id': self.otro_empleado.id, 'fecha_inicio': date(2025, 5, 5), 'fecha_reanudar': date(2025, 5, 9)},
+            {'empleado_id': self.otro_empleado.id, 'fecha_inicio': date(2025, 5, 9), 'fecha_reanudar': date(2025, 5, 12)},
+            {'empleado_id': self.otro_empleado.id, 'fecha_inicio': date(2025, 5, 1), 'fecha_reanudar': date(2025, 5, 6)},
+        ])
+        self.assertEqual([e['indice'] for e in errores], [0, 2])
+
+    def test_lote_sin_traslapes(self):
+        errores = validar_traslapes_lote([
+            {'empleado_id': self.empleado.id, 'fecha_inicio': date(2025, 3, 10), 'fecha_reanudar': date(2025, 3, 12)},
+            {'empleado_id': self.empleado.id, 'fecha_inicio': date(2025, 3, 12), 'fecha_reanudar': date(2025, 3, 13)},
+            {'empleado_id': self.otro_empleado.id, 'fecha_inicio': date(2025, 3, 3), 'fecha_reanudar': date(2025, 3, 10)},
+        ])
+        self.assertEqual(errores, [])
+
+
+class AprobacionBaseTestCase(TestCase):
+    """Área con capacidad de una persona ausente por día y saldos de 20 días"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        cls.tipo = TipoVacacion.objects.create(nombre='Vacaciones Regulares', codigo='VAC_REG')
+        cls.usuario = Usuario.objects.create_superuser(
+            email='admin@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Sistema'
+        )
+        cls.empleado = cls.crear_empleado('1001')
+        cls.otro_empleado = cls.crear_empleado('1002')
+        ReglaArea.objects.create(area=cls.area, tipo_regla='capacidad_diaria', configuracion={'max_ausentes': 1})
+
+    @classmethod
+    def crear_empleado(cls, expediente):
+        empleado = Empleado.objects.create(
+            area=cls.area, numero_expediente=expediente, nombre='Nombre', apellidos='Apellidos',
+            fecha_ingreso=date(2015, 1, 1),
+        )
+        SaldoVacaciones.objects.create(
+            empleado=empleado, periodo='2030-1', dias_otorgados=20, dias_utilizados=0, dias_disponibles=20,
+            fecha_inicio_periodo=date(2029, 7, 1), fecha_fin_periodo=date(2030, 12, 31),
+        )
+        return empleado
+
+    def setUp(self):
+        cache.clear()
+
+    def crear_solicitud(self, empleado, fecha_inicio, fecha_reanudar, folio, dias_habiles=5):
+        return Solicitud.objects.create(
+            folio=folio, empleado=empleado, area=self.area, tipo_solicitud='vacaciones', tipo_vacacion=self.tipo,
+            fecha_inicio=fecha_inicio, fecha_reanudar=fecha_reanudar, dias_habiles=dias_habiles,
+            periodo='2030-1', creado_por=self.usuario,
+        )
+
+    def ausentes(self, fecha):
+        return OcupacionDiaria.objects.filter(area=self.area, ambito='area', fecha=fecha).values_list(
+            'ausentes', flat=True
+        ).first() or 0
+
+    def disponibles(self, empleado):
+        return SaldoVacaciones.objects.get(empleado=empleado, periodo='2030-1').dias_disponibles
+
+
+class AprobacionTestCase(AprobacionBaseTestCase):
+    """aprobar_solicitud: capacidad diaria, contadores, saldo y bloqueos"""
+
+    def test_aprueba_cuenta_ocupacion_y_descuenta_saldo(self):
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        services.aprobar_solicitud(solicitud.pk)
+        self.assertEqual(Solicitud.objects.get(pk=solicitud.pk).estado, 'aprobada')
+        self.assertEqual(self.ausentes(date(2030, 3, 4)), 1)
+        self.assertEqual(self.ausentes(date(2030, 3, 11)), 0)
+        self.assertEqual(self.disponibles(self.empleado), 15)
+        self.assertTrue(HistorialSaldo.objects.filter(solicitud=solicitud, tipo_movimiento='uso').exists())
+
+    def test_rechaza_si_excede_la_capacidad(self):
+        primera = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        segunda = self.crear_solicitud(self.otro_empleado, date(2030, 3, 8), date(2030, 3, 12), 'SOL-2', 2)
+        services.aprobar_solicitud(primera.pk)
+        with self.assertRaises(ValidationError):
+            services.aprobar_solicitud(segunda.pk)
+        self.assertEqual(Solicitud.objects.get(pk=segunda.pk).estado, 'pendiente')
+        self.assertEqual(self.ausentes(date(2030, 3, 8)), 1)
+        self.assertEqual(self.disponibles(self.otro_empleado), 20)
+
+    def test_cancelar_libera_capacidad_y_saldo(self):
+        primera = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        segunda = self.crear_solicitud(self.otro_empleado, date(2030, 3, 8), date(2030, 3, 12), 'SOL-2', 2)
+        services.aprobar_solicitud(primera.pk)
+        services.cancelar_solicitud(primera.pk)
+        self.assertEqual(self.ausentes(date(2030, 3, 4)), 0)
+        self.assertEqual(self.disponibles(self.empleado), 20)
+        services.aprobar_solicitud(segunda.pk)
+        self.assertEqual(self.ausentes(date(2030, 3, 8)), 1)
+
+    def test_solo_aprueba_pendientes(self):
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        services.aprobar_solicitud(solicitud.pk)
+        with self.assertRaises(ValidationError):
+            services.aprobar_solicitud(solicitud.pk)
+        self.assertEqual(self.ausentes(date(2030, 3, 4)), 1)
+
+    def test_lee_los_contadores_con_bloqueo(self):
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        with mock.patch.object(services, 'verificar_capacidad', wraps=services.verificar_capacidad) as verificar:
+            services.aprobar_solicitud(solicitud.pk)
+        self.assertTrue(verificar.call_args.kwargs['bloquear'])
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_bloquea_solicitud_contadores_y_saldo(self):
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        with CaptureQueriesContext(connection) as consultas:
+            services.aprobar_solicitud(solicitud.pk)
+        bloqueadas = ' '.join(q['sql'] for q in consultas.captured_queries if 'FOR UPDATE' in q['sql'])
+        for tabla in ('solicitudes', 'ocupacion_diaria', 'saldos_vacaciones'):
+            self.assertIn(tabla, bloqueadas)
+
+
+class SolicitudApiTestCase(AprobacionBaseTestCase):
+    """El estado y los campos calculados no se escriben desde la API"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def datos(self, **cambios):
+        datos = {
+            'folio': 'SOL-API', 'empleado': self.empleado.id, 'area': self.area.id,
+            'tipo_solicitud': 'vacaciones', 'tipo_vacacion': self.tipo.id,
+            'fecha_inicio': '2030-03-04', 'fecha_reanudar': '2030-03-11', 'creado_por': self.usuario.id,
+        }
+        datos.update(cambios)
+        return datos
+
+    def test_crear_ignora_estado_y_calcula_dias(self):
+        respuesta = self.client.post(
+            '/api/solicitudes/', self.datos(estado='aprobada', dias_habiles=1, periodo='otro'), format='json'
+        )
+        self.assertEqual(respuesta.status_code, 201, respuesta.data)
+        solicitud = Solicitud.objects.get(folio='SOL-API')
+        self.assertEqual((solicitud.estado, solicitud.dias_habiles, solicitud.periodo), ('pendiente', 5, '2030-1'))
+        self.assertEqual(self.ausentes(date(2030, 3, 4)), 0)
+        self.assertEqual(self.disponibles(self.empleado), 20)
+
+    def test_no_cambia_estado_por_patch(self):
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        self.client.patch(f'/api/solicitudes/{solicitud.pk}/', {'estado': 'aprobada'}, format='json')
+        self.assertEqual(Solicitud.objects.get(pk=solicitud.pk).estado, 'pendiente')
+
+    def test_no_edita_fechas_ni_borra_aprobadas(self):
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        services.aprobar_solicitud(solicitud.pk)
+        url = f'/api/solicitudes/{solicitud.pk}/'
+        self.assertEqual(self.client.patch(url, {'fecha_reanudar': '2030-03-13'}, format='json').status_code, 400)
+        self.assertEqual(self.client.patch(url, {'observaciones': 'Nota'}, format='json').status_code, 200)
+        self.assertEqual(self.client.delete(url).status_code, 400)
+        self.assertEqual(Solicitud.objects.get(pk=solicitud.pk).fecha_reanudar, date(2030, 3, 11))
+
+    def test_rechazar_por_la_accion(self):
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        respuesta = self.client.post(f'/api/solicitudes/{solicitud.pk}/rechazar/')
+        self.assertEqual(respuesta.data['estado'], 'rechazada')
+
+    def test_importar_registra_pendientes(self):
+        respuesta = self.client.post(
+            '/api/solicitudes/importar/', [self.datos(estado='aprobada')], format='json'
+        )
+        self.assertEqual(respuesta.status_code, 201, respuesta.data)
+        self.assertEqual(Solicitud.objects.get(folio='SOL-API').estado, 'pendiente')
+
+
+class SimulacionApiTestCase(AprobacionBaseTestCase):
+    """POST /solicitudes/simular/ calcula sin guardar y limita el rango"""
+
+    url = '/api/solicitudes/simular/'
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def simular(self, **cambios):
+        datos = {
+            'empleado': self.empleado.id, 'tipo_solicitud': 'vacaciones', 'tipo_vacacion': self.tipo.id,
+            'fecha_inicio': '2030-03-04', 'fecha_solicitud': '2030-01-02',
+        }
+        datos.update(cambios)
+        return self.client.post(self.url, datos, format='json')
+
+    def test_por_dias_habiles(self):
+        respuesta = self.simular(dias_habiles=5)
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        self.assertEqual(respuesta.data['fecha_reanudar'], date(2030, 3, 11))
+        self.assertEqual((respuesta.data['saldo_disponible'], respuesta.data['saldo_restante']), (20, 15))
+        self.assertFalse(Solicitud.objects.exists())
+
+    def test_por_fecha_fin(self):
+        respuesta = self.simular(fecha_fin='2030-03-08')
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        self.assertEqual((respuesta.data['dias_habiles'], respuesta.data['fecha_reanudar']), (5, date(2030, 3, 11)))
+
+    def test_sin_saldo_usa_el_periodo_de_la_fecha(self):
+        # Ingreso 2015-01-01: el 2 de marzo de 2026 cae en el periodo 2026-2
+        datos = {'fecha_inicio': '2026-03-02', 'fecha_solicitud': '2026-01-02', 'dias_habiles': 5}
+        respuesta = self.simular(**datos)
+        self.assertIn('2026-2', ' '.join(e['mensaje'] for e in respuesta.data['errores']))
+
+        SaldoVacaciones.objects.create(
+            empleado=self.empleado, periodo='2026-2', dias_otorgados=20, dias_utilizados=20, dias_disponibles=0,
+            fecha_inicio_periodo=date(2026, 1, 1), fecha_fin_periodo=date(2026, 6, 30),
+        )
+        cache.clear()
+        respuesta = self.simular(**datos)
+        self.assertEqual((respuesta.data['periodo'], respuesta.data['saldo_disponible']), ('2026-2', 0))
+        self.assertIn('saldo', [e['codigo'] for e in respuesta.data['errores']])
+
+    def test_limita_dias_y_rango(self):
+        self.assertEqual(self.simular(dias_habiles=91).status_code, 400)
+        self.assertIn('fecha_fin', self.simular(fecha_fin='9999-12-31').data)
+        self.assertIn('fecha_inicio', self.simular(fecha_inicio='9999-12-30', dias_habiles=5).data)
+
+    def test_limita_rango_al_registrar(self):
+        respuesta = self.client.post('/api/solicitudes/', {
+            'folio': 'SOL-API', 'empleado': self.empleado.id, 'tipo_solicitud': 'vacaciones',
+            'tipo_vacacion': self.tipo.id, 'fecha_inicio': '2030-03-04', 'fecha_reanudar': '9999-12-31',
+            'creado_por': self.usuario.id,
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('fecha_reanudar', respuesta.data)
+
+
+class SaldosApiTestCase(AprobacionBaseTestCase):
+    """Saldos e historial son de solo lectura; los ajustes pasan por el servicio"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        self.saldo = SaldoVacaciones.objects.get(empleado=self.empleado, periodo='2030-1')
+
+    def test_no_se_escriben_directamente(self):
+        self.assertEqual(
+            self.client.patch(f'/api/solicitudes/saldos/{self.saldo.pk}/', {'dias_disponibles': 99}, format='json').status_code,
+            405,
+        )
+        respuesta = self.client.post('/api/solicitudes/historial/', {
+            'empleado': self.empleado.id, 'periodo': '2030-1', 'tipo_movimiento': 'ajuste',
+            'dias_antes': 0, 'dias_movimiento': 5, 'dias_despues': 5,
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 405)
+        self.assertEqual(self.disponibles(self.empleado), 20)
+        self.assertFalse(HistorialSaldo.objects.exclude(tipo_movimiento='otorgamiento').exists())
+
+    def test_ajuste_registra_movimiento(self):
+        url = f'/api/solicitudes/saldos/{self.saldo.pk}/ajustar/'
+        respuesta = self.client.post(url, {'dias': -3, 'descripcion': 'Corrección'}, format='json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        self.assertEqual((respuesta.data['dias_otorgados'], respuesta.data['dias_disponibles']), (17, 17))
+        movimiento = HistorialSaldo.objects.get(empleado=self.empleado, tipo_movimiento='ajuste')
+        self.assertEqual(
+            (movimiento.tipo_movimiento, movimiento.dias_antes, movimiento.dias_movimiento, movimiento.dias_despues),
+            ('ajuste', 20, -3, 17),
+        )
+        self.assertEqual(self.client.post(url, {'dias': -30, 'descripcion': 'x'}, format='json').status_code, 400)
+
+
+class DatosSinteticosTestCase(TestCase):
+    """Los datos sintéticos respetan las mismas reglas que la captura"""
+
+    def test_sin_traslapes_por_empleado(self):
+        call_command(
+            'generar_datos_sinteticos', '--areas', '2', '--empleados', '20', '--solicitudes', '400',
+            '--auditoria', '0', '--semilla', '7', '--fecha-corte', '2025-06-30', stdout=StringIO(),
+        )
+        activas = Solicitud.objects.filter(estado__in=('pendiente', 'aprobada')).order_by('empleado_id', 'fecha_inicio')
+        self.assertTrue(activas.filter(estado='pendiente').exists())
+        anterior = None
+        for solicitud in activas.values('empleado_id', 'fecha_inicio', 'fecha_reanudar'):
+            if anterior is not None and anterior['empleado_id'] == solicitud['empleado_id']:
+                self.assertGreaterEqual(solicitud['fecha_inicio'], anterior['fecha_reanudar'])
+            anterior = solicitud
+        self.assertEqual(verificar_lote(Empleado.objects.values_list('id', flat=True)), [])
+
+
+class LibroSaldosTestCase(AprobacionBaseTestCase):
+    """El historial abre cada saldo con su otorgamiento y cuadra con los saldos"""
+
+    def clave(self):
+        return (self.empleado.id, '2030-1')
+
+    def test_saldo_nuevo_registra_otorgamiento(self):
+        movimiento = HistorialSaldo.objects.get(empleado=self.empleado)
+        self.assertEqual(
+            (movimiento.tipo_movimiento, movimiento.dias_antes, movimiento.dias_movimiento, movimiento.dias_despues),
+            ('otorgamiento', 0, 20, 20),
+        )
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        services.aprobar_solicitud(solicitud.pk)
+        self.assertEqual(verificar_lote([self.empleado.id, self.otro_empleado.id]), [])
+
+    def test_totales_sin_corte(self):
+        services.ajustar_saldo(SaldoVacaciones.objects.get(empleado=self.empleado).pk, 2, 'Corrección')
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        services.aprobar_solicitud(solicitud.pk)
+        self.assertEqual(totales_libro([self.empleado.id])[self.clave()], [22, 5])
+        self.assertEqual(totales_libro([self.empleado.id], hasta=0), {})
+
+    def test_totales_parten_del_corte(self):
+        saldo = SaldoVacaciones.objects.get(empleado=self.empleado)
+        corte = HistorialSaldo.objects.latest('id').id
+        tomar_snapshots([self.empleado.id], corte)
+        self.assertEqual(
+            SnapshotSaldo.objects.filter(empleado=self.empleado).values_list('dias_otorgados', 'dias_utilizados').get(),
+            (20, 0),
+        )
+        services.ajustar_saldo(saldo.pk, -1, 'Corrección')
+        self.assertEqual(totales_libro([self.empleado.id])[self.clave()], [19, 0])
+
+        # Solo se suman los movimientos posteriores al corte
+        SnapshotSaldo.objects.filter(empleado=self.empleado).update(dias_otorgados=100)
+        self.assertEqual(totales_libro([self.empleado.id])[self.clave()], [99, 0])
+        self.assertEqual(totales_libro([self.otro_empleado.id])[(self.otro_empleado.id, '2030-1')], [20, 0])
+
+    def test_reparar_desde_libro(self):
+        SaldoVacaciones.objects.filter(empleado=self.empleado).update(dias_otorgados=30, dias_disponibles=25)
+        diferencias = verificar_lote([self.empleado.id])
+        self.assertEqual({d['tipo'] for d in diferencias}, {'dias_otorgados', 'dias_disponibles'})
+        self.assertEqual(reparar_desde_libro(diferencias), 1)
+        saldo = SaldoVacaciones.objects.get(empleado=self.empleado)
+        self.assertEqual((saldo.dias_otorgados, saldo.dias_utilizados, saldo.dias_disponibles), (20, 0, 20))
+        self.assertEqual(verificar_lote([self.empleado.id]), [])
+        self.assertEqual(reparar_desde_libro([]), 0)
+
+    def test_registra_otorgamientos_faltantes(self):
+        solicitud = self.crear_solicitud(self.empleado, date(2030, 3, 4), date(2030, 3, 11), 'SOL-1')
+        services.aprobar_solicitud(solicitud.pk)
+        HistorialSaldo.objects.filter(tipo_movimiento='otorgamiento').delete()
+        SaldoVacaciones.objects.filter(empleado=self.otro_empleado).update(dias_utilizados=4, dias_disponibles=16)
+        self.assertNotEqual(verificar_lote([self.empleado.id]), [])
+
+        ids = [self.empleado.id, self.otro_empleado.id]
+        self.assertEqual(registrar_otorgamientos(ids), 2)
+        self.assertEqual(totales_libro(ids), {self.clave(): [20, 5], (self.otro_empleado.id, '2030-1'): [20, 4]})
+        self.assertEqual(
+            [d['tipo'] for d in verificar_lote(ids)], ['solicitudes_aprobadas'],
+        )
+        self.assertEqual(registrar_otorgamientos(ids), 0)
+
+
+class VencimientosTestCase(TestCase):
+    """Vencimiento de periodos con la prórroga del área y tope de días acumulables"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        cls.empleado = Empleado.objects.create(
+            area=cls.area, numero_expediente='1001', nombre='Nombre', apellidos='Apellidos',
+            fecha_ingreso=date(2015, 1, 1),
+        )
+        for periodo, fin, usados in (('2023', date(2024, 12, 31), 4), ('2024', date(2025, 12, 31), 0),
+                                     ('2025', date(2026, 12, 31), 0)):
+            SaldoVacaciones.objects.create(
+                empleado=cls.empleado, periodo=periodo, dias_otorgados=14, dias_utilizados=usados,
+                dias_disponibles=14 - usados, fecha_inicio_periodo=date(int(periodo), 1, 1), fecha_fin_periodo=fin,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def disponibles(self):
+        return dict(SaldoVacaciones.objects.filter(empleado=self.empleado).values_list('periodo', 'dias_disponibles'))
+
+    def ajustes(self):
+        return list(HistorialSaldo.objects.filter(tipo_movimiento='ajuste').order_by('id').values_list(
+            'periodo', 'dias_antes', 'dias_movimiento', 'dias_despues'
+        ))
+
+    def test_vence_y_recorta_el_excedente(self):
+        movimientos = procesar_area(self.area, date(2025, 1, 10), 24)
+        self.assertEqual(len(movimientos), 2)
+        # Vence 2023; de 2024 y 2025 (28 días) se recortan 4 del más antiguo
+        self.assertEqual(self.disponibles(), {'2023': 0, '2024': 10, '2025': 14})
+        self.assertEqual(self.ajustes(), [('2023', 10, -10, 0), ('2024', 14, -4, 10)])
+        self.assertEqual(
+            SaldoVacaciones.objects.get(empleado=self.empleado, periodo='2023').dias_otorgados, 4
+        )
+        # El historial cuadra con los saldos
+        saldos = SaldoVacaciones.objects.filter(empleado=self.empleado)
+        self.assertEqual(
+            totales_libro([self.empleado.id]),
+            {(self.empleado.id, s.periodo): [s.dias_otorgados, s.dias_utilizados] for s in saldos},
+        )
+
+    def test_prorroga_del_area(self):
+        self.area.configuracion = {'prorroga_activa': True, 'prorroga_dias': 30}
+        self.area.save()
+
+        # Dentro de la prórroga 2023 sigue vigente y cuenta para el tope
+        procesar_area(self.area, date(2025, 1, 10), 24)
+        self.assertEqual(self.disponibles(), {'2023': 0, '2024': 10, '2025': 14})
+        self.assertEqual(self.ajustes(), [('2023', 10, -10, 0), ('2024', 14, -4, 10)])
+        self.assertIn('Excede el tope', HistorialSaldo.objects.get(periodo='2023', tipo_movimiento='ajuste').descripcion)
+
+    def test_vence_al_terminar_la_prorroga(self):
+        self.area.configuracion = {'prorroga_activa': True, 'prorroga_dias': 30}
+        self.area.save()
+        self.assertEqual(procesar_area(self.area, date(2025, 1, 30), 40), [])
+        movimientos = procesar_area(self.area, date(2025, 1, 31), 40)
+        self.assertEqual([(m.periodo, m.dias_movimiento) for m in movimientos], [('2023', -10)])
+        self.assertIn('prórroga de 30 días', movimientos[0].descripcion)
+
+    def test_simulacion_no_escribe_ni_bloquea(self):
+        antes = self.disponibles()
+        with mock.patch('django.db.models.query.QuerySet.select_for_update', autospec=True,
+                        side_effect=lambda queryset, *args, **kwargs: queryset) as bloquear:
+            movimientos = procesar_area(self.area, date(2025, 1, 10), 24, simular=True)
+        bloquear.assert_not_called()
+        self.assertEqual([(m.periodo, m.dias_movimiento) for m in movimientos], [('2023', -10), ('2024', -4)])
+        self.assertTrue(all(m.pk is None for m in movimientos))
+        self.assertEqual(self.disponibles(), antes)
+        self.assertEqual(self.ajustes(), [])
+
+        with mock.patch('django.db.models.query.QuerySet.select_for_update', autospec=True,
+                        side_effect=lambda queryset, *args, **kwargs: queryset) as bloquear:
+            procesar_area(self.area, date(2025, 1, 10), 24)
+        self.assertEqual(bloquear.call_count, 2)
+
+
+class SolicitudAreaTestCase(AprobacionBaseTestCase):
+    """Un admin_area solo registra solicitudes de empleados de su área"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.otra_area = Area.objects.create(nombre='Otra Área', codigo='OTRA')
+        cls.empleado_otra_area = Empleado.objects.create(
+            area=cls.otra_area, numero_expediente='2001', nombre='Nombre', apellidos='Apellidos',
+            fecha_ingreso=date(2015, 1, 1),
+        )
+        cls.admin_area = Usuario.objects.create_user(
+            email='area@metro.gob.mx', nombre='Admin', apellidos='Área', rol='admin_area', area=cls.area
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin_area)
+
+    def datos(self, empleado, **cambios):
+        datos = {
+            'folio': 'SOL-AREA', 'empleado': empleado.id, 'tipo_solicitud': 'vacaciones',
+            'tipo_vacacion': self.tipo.id, 'fecha_inicio': '2030-03-04', 'fecha_reanudar': '2030-03-11',
+            'creado_por': self.admin_area.id,
+        }
+        datos.update(cambios)
+        return datos
+
+    def test_empleado_de_otra_area_con_area_propia(self):
+        with mock.patch('apps.solicitudes.serializers.ValidadorSolicitud') as validador:
+            respuesta = self.client.post(
+                '/api/solicitudes/', self.datos(self.empleado_otra_area, area=self.area.id), format='json'
+            )
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('area', respuesta.data)
+        validador.assert_not_called()
+
+    def test_empleado_de_otra_area_con_su_area(self):
+        respuesta = self.client.post(
+            '/api/solicitudes/', self.datos(self.empleado_otra_area, area=self.otra_area.id), format='json'
+        )
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertFalse(Solicitud.objects.exists())
+
+    def test_area_por_omision_del_empleado(self):
+        respuesta = self.client.post('/api/solicitudes/', self.datos(self.empleado), format='json')
+        self.assertEqual(respuesta.status_code, 201, respuesta.data)
+        self.assertEqual(Solicitud.objects.get(folio='SOL-AREA').area_id, self.area.id)
+        respuesta = self.client.post('/api/solicitudes/', self.datos(self.empleado_otra_area, folio='SOL-2'), format='json')
+        self.assertEqual(respuesta.status_code, 403)
+
+
+@skipUnless(ALIAS_REPLICA in settings.DATABASES, 'Sin la réplica en settings.DATABASES')
+class ReplicaTestCase(TransactionTestCase):
+    """
+    Ruteo entre la primaria y la réplica con dos conexiones
+
+    Con `manage.py test` la réplica es un espejo de la base de pruebas
+    (config/settings.py); se verifica qué conexión ejecuta cada consulta.
+    """
+
+    databases = {'default', ALIAS_REPLICA} & set(settings.DATABASES)
+
+    def setUp(self):
+        cache.clear()
+        self.area = Area.objects.create(nombre='Área Prueba', codigo='PRUEBA')
+        self.usuario = Usuario.objects.create_superuser(
+            email='admin@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Sistema'
+        )
+        empleado = Empleado.objects.create(
+            area=self.area, numero_expediente='1001', nombre='Nombre', apellidos='Apellidos',
+            fecha_ingreso=date(2015, 1, 1),
+        )
+        self.saldo = SaldoVacaciones.objects.create(
+            empleado=empleado, periodo='2030-1', dias_otorgados=20, dias_utilizados=0, dias_disponibles=20,
+            fecha_inicio_periodo=date(2029, 7, 1), fecha_fin_periodo=date(2030, 12, 31),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def consultas(self, url, metodo='get'):
+        """Número de consultas de la petición en (primaria, réplica)"""
+        with CaptureQueriesContext(connections['default']) as primaria, \
+                CaptureQueriesContext(connections[ALIAS_REPLICA]) as replica:
+            respuesta = getattr(self.client, metodo)(url)
+            if respuesta.streaming:
+                b''.join(respuesta.streaming_content)
+            respuesta.close()
+        self.assertLess(respuesta.status_code, 400)
+        return len(primaria), len(replica)
+
+    def test_exportar_lee_de_la_replica(self):
+        primaria, replica = self.consultas('/api/solicitudes/saldos/exportar/')
+        self.assertEqual(primaria, 0)
+        self.assertGreater(replica, 0)
+
+    def test_lista_lee_de_la_primaria(self):
+        primaria, replica = self.consultas('/api/solicitudes/saldos/')
+        self.assertGreater(primaria, 0)
+        self.assertEqual(replica, 0)
+
+    def test_escritura_fija_a_la_primaria(self):
+        respuesta = self.client.post(
+            f'/api/solicitudes/saldos/{self.saldo.pk}/ajustar/', {'dias': 1, 'descripcion': 'Corrección'}, format='json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.consultas('/api/solicitudes/saldos/exportar/')[1], 0)
+
+        # Termina la ventana
+        cache.clear()
+        self.assertEqual(self.consultas('/api/solicitudes/saldos/exportar/')[0], 0)
+
+    def test_bloque_de_comando(self):
+        with CaptureQueriesContext(connections[ALIAS_REPLICA]) as replica:
+            with lecturas_en_replica():
+                self.assertEqual(SaldoVacaciones.objects.count(), 1)
+                # Dentro de una transacción se lee de la primaria
+                with transaction.atomic():
+                    SaldoVacaciones.objects.count()
+            SaldoVacaciones.objects.count()
+        self.assertEqual(len(replica), 1)
@@ -1,9 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import views
 
 router = DefaultRouter()
-# ViewSets se registrarán en views.py
+router.register(r'saldos', views.SaldoVacacionesViewSet, basename='saldo')
+router.register(r'historial', views.HistorialSaldoViewSet, basename='historial-saldo')
+router.register(r'', views.SolicitudViewSet, basename='solicitud')
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
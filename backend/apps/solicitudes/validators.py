@@ -0,0 +1,326 @@
+"""
+Validaciones de solicitudes que requieren consultar la base de datos
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from apps.calculos.antiguedad import CalculadoraAntiguedad, ValidadorDiasEconomicos
+from apps.calculos.periodos import periodo_en_fecha
+from apps.configuracion.services import obtener_config_calculos, obtener_motor_reglas
+from .models import Solicitud, SaldoVacaciones
+from .services import verificar_capacidad, mensaje_excesos, obtener_saldos_empleado
+
+
+# Estados que ocupan días del empleado
+ESTADOS_ACTIVOS = ('pendiente', 'aprobada')
+
+
+def validar_traslapes_lote(filas: Iterable[Dict]) -> List[Dict]:
+    """
+    Valida traslapes para un lote de solicitudes (importaciones masivas)
+
+    Hace una sola consulta para todos los empleados del lote y detecta tanto
+    choques contra solicitudes existentes como choques entre filas del mismo
+    lote, recorriendo los rangos de cada empleado ordenados por fecha.
+
+    Args:
+        filas: Diccionarios con 'empleado_id', 'fecha_inicio' y 'fecha_reanudar'
+
+    Returns:
+        Lista de errores {'indice', 'empleado_id', 'mensaje'}; vacía si el lote es válido
+    """
+    filas = list(filas)
+    if not filas:
+        return []
+
+    rangos = {}
+    for indice, fila in enumerate(filas):
+        rangos.setdefault(fila['empleado_id'], []).append(
+            (fila['fecha_inicio'], fila['fecha_reanudar'], indice)
+        )
+
+    existentes = Solicitud.objects.filter(
+        empleado_id__in=rangos.keys(),
+        estado__in=ESTADOS_ACTIVOS,
+        fecha_inicio__lt=max(f['fecha_reanudar'] for f in filas),
+        fecha_reanudar__gt=min(f['fecha_inicio'] for f in filas),
+    ).order_by().values_list('empleado_id', 'fecha_inicio', 'fecha_reanudar', 'folio')
+
+    for empleado_id, fecha_inicio, fecha_reanudar, folio in existentes:
+        rangos[empleado_id].append((fecha_inicio, fecha_reanudar, folio))
+
+    errores = []
+    for empleado_id, lista in rangos.items():
+        lista.sort(key=lambda r: (r[0], r[1]))
+        # Rango con la reanudación más tardía entre los anteriores
+        fin_maximo, origen_maximo = None, None
+        for posicion, (inicio, fin, origen) in enumerate(lista):
+            if isinstance(origen, int):
+                otro = None
+                if fin_maximo is not None and inicio < fin_maximo:
+                    otro = origen_maximo
+                elif posicion + 1 < len(lista) and lista[posicion + 1][0] < fin:
+                    otro = lista[posicion + 1][2]
+                if otro is not None:
+                    errores.append({
+                        'indice': origen,
+                        'empleado_id': empleado_id,
+                        'mensaje': f"Se traslapa con {_describir(otro)}",
+                    })
+            if fin_maximo is None or fin > fin_maximo:
+                fin_maximo, origen_maximo = fin, origen
+
+    return sorted(errores, key=lambda e: e['indice'])
+
+
+def _describir(origen) -> str:
+    """Describe el origen de un rango: índice del lote o folio existente"""
+    if isinstance(origen, int):
+        return f"la fila {origen + 1} del lote"
+    return f"la solicitud {origen}"
+
+
+class ValidadorSolicitud:
+    """
+    Valida una solicitud completa en una sola pasada
+
+    Precarga todo lo que necesitan las validaciones de un empleado con un
+    número fijo de consultas (saldos, solicitudes activas y, si hay reglas de capacidad, contadores de
+    ocupación). La configuración global con los festivos y las reglas del
+    área salen del caché y el calendario de descansos viene en el propio
+    empleado.
+    """
+
+    def __init__(self, empleado, config: Optional[Dict] = None, saldos: Optional[Dict] = None):
+        """
+        Args:
+            empleado: Instancia de Empleado
+            config: Configuración de cálculos ya cargada (opcional)
+            saldos: Saldos del empleado por periodo ya cargados (opcional)
+        """
+        self.empleado = empleado
+        self.config = config or obtener_config_calculos()
+        self.calculadora = CalculadoraAntiguedad(self.config)
+        self.festivos = self.config['dias_festivos']
+        if saldos is None:
+            saldos = {s.periodo: s for s in SaldoVacaciones.objects.filter(empleado_id=empleado.id)}
+        self.saldos = saldos
+        self.solicitudes = list(
+            Solicitud.objects.filter(empleado_id=empleado.id, estado__in=ESTADOS_ACTIVOS)
+            .order_by()
+            .values('id', 'folio', 'estado', 'periodo', 'tipo_dia_economico_id',
+                    'fecha_inicio', 'fecha_reanudar', 'dias_habiles')
+        )
+        self.dias_descanso = self._leer_descansos(empleado.calendario_descansos)
+
+    @staticmethod
+    def _leer_descansos(calendario) -> set:
+        if not calendario:
+            return set()
+        return {date.fromisoformat(d) for d in calendario.get('dias_rolados', [])}
+
+    def validar(self, datos: Dict, excluir_id=None, validar_traslapes: bool = True) -> Dict:
+        """
+        Ejecuta todas las validaciones sobre los datos de una solicitud
+
+        Args:
+            datos: Campos de la solicitud (area, tipo_solicitud, tipo_vacacion,
+                tipo_dia_economico, fecha_solicitud, fecha_inicio,
+                fecha_reanudar, dias_habiles, periodo)
+            excluir_id: Solicitud a ignorar al editar una existente
+            validar_traslapes: False si los traslapes se validan por lote
+
+        Returns:
+            Diccionario con 'valido', 'errores', 'advertencias' (listas de
+            {'codigo', 'mensaje'}) y 'tiene_conflicto_descanso'
+        """
+        errores, advertencias = [], []
+        tipo_solicitud = datos.get('tipo_solicitud')
+        fecha_inicio = datos['fecha_inicio']
+        fecha_reanudar = datos['fecha_reanudar']
+        fecha_solicitud = datos.get('fecha_solicitud') or date.today()
+        dias_habiles = datos.get('dias_habiles') or 0
+
+        # Tipo de solicitud (equivalente a Solicitud.clean)
+        if tipo_solicitud == 'vacaciones':
+            if not datos.get('tipo_vacacion'):
+                errores.append(('tipo', 'Debe seleccionar un tipo de vacación'))
+            if datos.get('tipo_dia_economico'):
+                errores.append(('tipo', 'No puede tener tipo de día económico en solicitud de vacaciones'))
+        elif tipo_solicitud == 'dia_economico':
+            if not datos.get('tipo_dia_economico'):
+                errores.append(('tipo', 'Debe seleccionar un tipo de día económico'))
+            if datos.get('tipo_vacacion'):
+                errores.append(('tipo', 'No puede tener tipo de vacación en solicitud de día económico'))
+
+        if fecha_reanudar <= fecha_inicio:
+            errores.append(('fechas', 'La fecha de reanudación debe ser posterior a la fecha de inicio'))
+            return self._resultado(errores, advertencias, False)
+
+        max_dias = settings.APP_SETTINGS.get('MAX_DIAS_SOLICITUD')
+        if max_dias and dias_habiles > max_dias:
+            errores.append(('max_dias', f"No se pueden solicitar más de {max_dias} días hábiles"))
+
+        calculados = self.calculadora.calcular_dias_habiles(
+            fecha_inicio, fecha_reanudar - timedelta(days=1), dias_festivos=self.festivos
+        )
+        if calculados != dias_habiles:
+            advertencias.append((
+                'dias_habiles',
+                f"Entre las fechas hay {calculados} días hábiles y se registraron {dias_habiles}",
+            ))
+
+        # Elegibilidad y saldo de vacaciones
+        saldo = None
+        if tipo_solicitud == 'vacaciones':
+            puede, mensaje = self.calculadora.puede_solicitar_vacaciones(
+                self.empleado.fecha_ingreso, fecha_solicitud
+            )
+            if not puede:
+                errores.append(('elegibilidad', mensaje))
+
+            periodo = datos.get('periodo')
+            saldo = self.saldos.get(periodo) if periodo else self.seleccionar_saldo(fecha_inicio)
+            if saldo is None and not periodo:
+                # Sin saldo con días: el del periodo que contiene la fecha de inicio
+                en_fecha = periodo_en_fecha(self.empleado.id, fecha_inicio)
+                if en_fecha is not None:
+                    periodo = en_fecha.periodo
+                    saldo = self.saldos.get(periodo)
+            if saldo is None:
+                errores.append(('saldo', f"No hay saldo registrado para el periodo {periodo or ''}".strip()))
+            else:
+                # Al editar una solicitud aprobada sus días ya están descontados del saldo
+                disponibles = saldo.dias_disponibles + sum(
+                    s['dias_habiles'] for s in self.solicitudes
+                    if s['id'] == excluir_id and s['estado'] == 'aprobada' and s['periodo'] == saldo.periodo
+                )
+                es_valido, mensaje = self.calculadora.validar_saldo_disponible(dias_habiles, disponibles)
+                if not es_valido:
+                    errores.append(('saldo', mensaje))
+
+        # Límite de días económicos en el año
+        tipo_dia_economico = datos.get('tipo_dia_economico')
+        if tipo_solicitud == 'dia_economico' and tipo_dia_economico:
+            utilizados = sum(
+                s['dias_habiles'] for s in self.solicitudes
+                if s['tipo_dia_economico_id'] == tipo_dia_economico.id
+                and s['fecha_inicio'].year == fecha_inicio.year
+                and s['id'] != excluir_id
+            )
+            es_valido, mensaje = ValidadorDiasEconomicos(tipo_dia_economico).validar_limite_dias(
+                dias_habiles, utilizados
+            )
+            if not es_valido:
+                errores.append(('limite_dias', mensaje))
+
+        # Traslapes contra las solicitudes activas ya cargadas
+        if validar_traslapes:
+            folios = [
+                s['folio'] for s in self.solicitudes
+                if s['id'] != excluir_id
+                and s['fecha_inicio'] < fecha_reanudar
+                and s['fecha_reanudar'] > fecha_inicio
+            ]
+            if folios:
+                errores.append(('traslape', f"El empleado ya tiene solicitudes en esas fechas: {', '.join(folios[:3])}"))
+
+        # Reglas del área (anticipación, prórroga, taquilla)
+        area_id = datos['area'].id if datos.get('area') else self.empleado.area_id
+        resultado_reglas = obtener_motor_reglas(area_id).evaluar({
+            'empleado': self.empleado,
+            'fecha_solicitud': fecha_solicitud,
+            'fecha_inicio': fecha_inicio,
+            'fecha_reanudar': fecha_reanudar,
+            'fecha_fin_periodo': saldo.fecha_fin_periodo if saldo else None,
+            'dias_descanso': self.dias_descanso,
+        })
+        conflicto_descanso = False
+        for error in resultado_reglas['errores']:
+            errores.append((error['regla'], error['mensaje']))
+            conflicto_descanso |= error['regla'] == 'taquilla_validacion'
+        for advertencia in resultado_reglas['advertencias']:
+            advertencias.append((advertencia['regla'], advertencia['mensaje']))
+            conflicto_descanso |= advertencia['regla'] == 'taquilla_validacion'
+
+        # Capacidad diaria (una lectura indexada de contadores)
+        if excluir_id is None:
+            excesos = verificar_capacidad(self.empleado, area_id, fecha_inicio, fecha_reanudar)
+            if excesos:
+                errores.append(('capacidad', mensaje_excesos(excesos)))
+
+        return self._resultado(errores, advertencias, conflicto_descanso, saldo)
+
+    def seleccionar_saldo(self, fecha_inicio: date) -> Optional[SaldoVacaciones]:
+        """Periodo a usar si no se indica: el más antiguo con días disponibles ya iniciado"""
+        candidatos = [
+            s for s in self.saldos.values()
+            if s.dias_disponibles > 0 and s.fecha_inicio_periodo <= fecha_inicio
+        ]
+        return min(candidatos, key=lambda s: s.fecha_fin_periodo, default=None)
+
+    @staticmethod
+    def _resultado(errores, advertencias, conflicto_descanso, saldo=None) -> Dict:
+        return {
+            'valido': not errores,
+            'errores': [{'codigo': c, 'mensaje': m} for c, m in errores],
+            'advertencias': [{'codigo': c, 'mensaje': m} for c, m in advertencias],
+            'tiene_conflicto_descanso': conflicto_descanso,
+            'periodo': saldo.periodo if saldo else None,
+        }
+
+
+def simular_solicitud(datos: Dict) -> Dict:
+    """
+    Calcula una solicitud sin guardarla (vista previa del formulario)
+
+    Usa el calendario de festivos, la tabla de antigüedad y los saldos en
+    caché; no escribe en la base de datos.
+
+    Args:
+        datos: empleado, tipo_solicitud, tipo_vacacion / tipo_dia_economico,
+            fecha_inicio y dias_habiles o fecha_fin (último día de ausencia);
+            opcionalmente fecha_solicitud y periodo
+
+    Returns:
+        Diccionario con dias_habiles, fecha_reanudar, periodo, saldos y el
+        resultado de las validaciones
+    """
+    empleado = datos['empleado']
+    validador = ValidadorSolicitud(empleado, saldos=obtener_saldos_empleado(empleado.id))
+    calculadora, festivos = validador.calculadora, validador.festivos
+    fecha_inicio = datos['fecha_inicio']
+
+    if datos.get('dias_habiles'):
+        dias_habiles = datos['dias_habiles']
+        fecha_reanudar = calculadora.calcular_fecha_reanudacion(
+            fecha_inicio, dias_habiles, dias_festivos=festivos
+        )
+    else:
+        fecha_fin = datos['fecha_fin']
+        dias_habiles = calculadora.calcular_dias_habiles(fecha_inicio, fecha_fin, dias_festivos=festivos)
+        fecha_reanudar = fecha_fin + timedelta(days=1)
+        while fecha_reanudar.weekday() >= 5 or fecha_reanudar in festivos:
+            fecha_reanudar += timedelta(days=1)
+
+    resultado = validador.validar(dict(datos, dias_habiles=dias_habiles, fecha_reanudar=fecha_reanudar))
+    if dias_habiles == 0:
+        resultado['valido'] = False
+        resultado['errores'].insert(0, {'codigo': 'dias_habiles', 'mensaje': 'El rango no contiene días hábiles'})
+
+    saldo = validador.saldos.get(resultado['periodo'])
+    return {
+        'fecha_inicio': fecha_inicio,
+        'fecha_reanudar': fecha_reanudar,
+        'dias_habiles': dias_habiles,
+        'periodo': resultado['periodo'],
+        'saldo_disponible': saldo.dias_disponibles if saldo else None,
+        'saldo_restante': saldo.dias_disponibles - dias_habiles if saldo else None,
+        'valido': resultado['valido'],
+        'errores': resultado['errores'],
+        'advertencias': resultado['advertencias'],
+        'tiene_conflicto_descanso': resultado['tiene_conflicto_descanso'],
+    }
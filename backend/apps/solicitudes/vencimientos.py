@@ -0,0 +1,158 @@
+"""
+Vencimiento de periodos y tope de días acumulables
+
+Dos ajustes sobre SaldoVacaciones que se aplican en lote (p. ej. cada
+noche con procesar_vencimientos_saldos):
+- Vencimiento: los días disponibles de un periodo cuyo fin, más la
+  prórroga del área, ya pasó se pierden.
+- Tope: si la suma de días disponibles de los periodos vigentes de un
+  empleado excede dias_acumulables_max (ConfigGlobal), el excedente se
+  descuenta de los periodos más antiguos.
+
+Ambos reducen dias_otorgados y dias_disponibles y quedan en el historial
+como movimientos 'ajuste', de modo que el libro (libro_saldos) sigue
+cuadrando. Las lecturas usan el índice de fecha_fin_periodo y las
+escrituras son un UPDATE por área para los vencimientos y un bulk_update
+para los topes, con un bulk_create de su historial.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from apps.areas.models import Area
+from apps.configuracion.services import EvaluadorProrroga, obtener_config_calculos, obtener_motor_reglas
+from apps.empleados.models import Empleado
+from .models import HistorialSaldo, SaldoVacaciones
+from .services import invalidar_saldos_empleado
+
+
+def dias_prorroga_area(area: Area) -> int:
+    """
+    Días de prórroga de los periodos del área
+
+    La mayor entre la configuración del área (prorroga_activa /
+    prorroga_dias) y su regla de prórroga activa, para no vencer días que
+    la validación de solicitudes todavía permite usar.
+    """
+    dias = int(area.get_dias_prorroga()) if area.tiene_prorroga_activa() else 0
+    for evaluador in obtener_motor_reglas(area.id).evaluadores:
+        if isinstance(evaluador, EvaluadorProrroga):
+            dias = max(dias, evaluador.prorroga.days)
+    return dias
+
+
+def _movimiento(saldo: Dict, dias: int, descripcion: str) -> HistorialSaldo:
+    return HistorialSaldo(
+        empleado_id=saldo['empleado_id'],
+        periodo=saldo['periodo'],
+        tipo_movimiento='ajuste',
+        dias_antes=saldo['dias_disponibles'],
+        dias_movimiento=-dias,
+        dias_despues=saldo['dias_disponibles'] - dias,
+        descripcion=descripcion,
+    )
+
+
+def procesar_area(area: Area, fecha: date, dias_maximos: int, simular: bool = False) -> List[HistorialSaldo]:
+    """
+    Vence los periodos y aplica el tope de días acumulables de un área
+
+    Args:
+        area: Área a procesar
+        fecha: Fecha de referencia (normalmente hoy)
+        dias_maximos: Tope de días disponibles por empleado
+        simular: Calcular los ajustes sin escribirlos
+
+    Returns:
+        Movimientos de ajuste (guardados, o sin guardar si simular)
+    """
+    prorroga = dias_prorroga_area(area)
+    limite = fecha - timedelta(days=prorroga)
+    # Subconsulta en lugar de join: el bloqueo queda solo sobre saldos_vacaciones
+    saldos = SaldoVacaciones.objects.filter(
+        empleado_id__in=Empleado.objects.filter(area_id=area.id).values('id'),
+        dias_disponibles__gt=0,
+    ).order_by()
+    campos = ('id', 'empleado_id', 'periodo', 'dias_disponibles', 'fecha_fin_periodo')
+
+    def leer(queryset):
+        # La simulación no escribe: no bloquea los saldos
+        return queryset if simular else queryset.select_for_update()
+
+    with transaction.atomic():
+        # Vencimientos: fin del periodo + prórroga anterior a la fecha
+        vencidos = saldos.filter(fecha_fin_periodo__lt=limite)
+        movimientos = [
+            _movimiento(saldo, saldo['dias_disponibles'], (
+                f"Vencimiento del periodo (fin {saldo['fecha_fin_periodo'].strftime('%d/%m/%Y')}"
+                f", prórroga de {prorroga} días)"
+            ))
+            for saldo in leer(vencidos).values(*campos)
+        ]
+        if movimientos and not simular:
+            vencidos.update(dias_otorgados=F('dias_otorgados') - F('dias_disponibles'), dias_disponibles=0)
+
+        # Tope: periodos ya iniciados y no vencidos, del más antiguo al más reciente
+        vigentes = saldos.filter(fecha_fin_periodo__gte=limite, fecha_inicio_periodo__lte=fecha)
+        excedidos = (
+            vigentes.values('empleado_id').annotate(total=Sum('dias_disponibles'))
+            .filter(total__gt=dias_maximos).values('empleado_id')
+        )
+        por_empleado = defaultdict(list)
+        for saldo in leer(vigentes.filter(empleado_id__in=excedidos)).order_by(
+            'empleado_id', 'fecha_fin_periodo'
+        ).values(*campos):
+            por_empleado[saldo['empleado_id']].append(saldo)
+
+        recortados = []
+        for periodos in por_empleado.values():
+            excedente = sum(saldo['dias_disponibles'] for saldo in periodos) - dias_maximos
+            for saldo in periodos:
+                if excedente <= 0:
+                    break
+                dias = min(excedente, saldo['dias_disponibles'])
+                excedente -= dias
+                movimientos.append(_movimiento(saldo, dias, f"Excede el tope de {dias_maximos} días acumulables"))
+                recortados.append((saldo, dias))
+
+        if simular or not movimientos:
+            return movimientos
+
+        SaldoVacaciones.objects.bulk_update(
+            [
+                SaldoVacaciones(
+                    id=saldo['id'],
+                    dias_otorgados=F('dias_otorgados') - dias,
+                    dias_disponibles=F('dias_disponibles') - dias,
+                )
+                for saldo, dias in recortados
+            ],
+            ['dias_otorgados', 'dias_disponibles'],
+            batch_size=1000,
+        )
+        HistorialSaldo.objects.bulk_create(movimientos, batch_size=1000)
+        # update y bulk_update no emiten post_save: invalidar el caché de saldos a mano
+        for empleado_id in {movimiento.empleado_id for movimiento in movimientos}:
+            transaction.on_commit(lambda empleado_id=empleado_id: invalidar_saldos_empleado(empleado_id, area.id))
+    return movimientos
+
+
+def procesar_vencimientos(fecha: date = None, areas=None, simular: bool = False) -> Dict[int, List[HistorialSaldo]]:
+    """
+    Procesa vencimientos y topes de las áreas activas (una transacción por área)
+
+    Returns:
+        {area_id: movimientos de ajuste}
+    """
+    fecha = fecha or date.today()
+    dias_maximos = obtener_config_calculos()['dias_acumulables_max']
+    if areas is None:
+        areas = Area.objects.filter(activo=True)
+    return {
+        area.id: procesar_area(area, fecha, dias_maximos, simular)
+        for area in areas.order_by('id')
+    }
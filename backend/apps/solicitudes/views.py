@@ -1,15 +1,216 @@
-from rest_framework import viewsets
+from datetime import date, datetime, time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from apps.authentication.mixins import AreaScopedMixin
+from utils.exportacion import ExportacionMixin
+from utils.helpers import leer_año
+from utils.replicas import LecturaReplicaMixin
 from .models import *
 from .serializers import *
+from . import services
+from .validators import simular_solicitud, validar_traslapes_lote
+
+def _año_exportacion(params):
+    """Año opcional de los filtros de exportación"""
+    if not params.get('anio'):
+        return None
+    return leer_año(params['anio'])
 
-class SolicitudViewSet(viewsets.ModelViewSet):
+class SolicitudViewSet(AreaScopedMixin, ExportacionMixin, LecturaReplicaMixin, viewsets.ModelViewSet):
     queryset = Solicitud.objects.all()
     serializer_class = SolicitudSerializer
 
-class SaldoVacacionesViewSet(viewsets.ModelViewSet):
+    acciones_replica = ('exportar',)
+
+    nombre_exportacion = 'solicitudes'
+    orden_exportacion = 'fecha_inicio'
+    columnas_exportacion = [
+        ('folio', 'Folio'),
+        ('empleado__numero_expediente', 'Expediente'),
+        ('empleado__nombre', 'Nombre'),
+        ('empleado__apellidos', 'Apellidos'),
+        ('area__codigo', 'Área'),
+        ('tipo_solicitud', 'Tipo'),
+        ('tipo_vacacion__nombre', 'Tipo de vacación'),
+        ('tipo_dia_economico__nombre', 'Tipo de día económico'),
+        ('fecha_solicitud', 'Fecha de solicitud'),
+        ('fecha_inicio', 'Fecha de inicio'),
+        ('fecha_reanudar', 'Fecha de reanudación'),
+        ('dias_habiles', 'Días hábiles'),
+        ('periodo', 'Periodo'),
+        ('estado', 'Estado'),
+        ('tiene_conflicto_descanso', 'Conflicto con descanso'),
+        ('fecha_creacion', 'Fecha de registro'),
+    ]
+
+    def filtrar_exportacion(self, queryset, params):
+        """Filtros: ?anio= (fecha de inicio), ?area=, ?estado=, ?tipo_solicitud="""
+        año = _año_exportacion(params)
+        if año:
+            queryset = queryset.filter(fecha_inicio__gte=date(año, 1, 1), fecha_inicio__lte=date(año, 12, 31))
+        if params.get('area'):
+            queryset = queryset.filter(area_id=params['area'])
+        if params.get('estado'):
+            queryset = queryset.filter(estado=params['estado'])
+        if params.get('tipo_solicitud'):
+            queryset = queryset.filter(tipo_solicitud=params['tipo_solicitud'])
+        return queryset
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # Bloquear la solicitud: la validación partió de su estado, que
+            # no debe cambiar (p. ej. aprobarse) antes de guardar
+            estado = (
+                Solicitud.objects.select_for_update().filter(pk=serializer.instance.pk)
+                .values_list('estado', flat=True).first()
+            )
+            if estado != serializer.instance.estado:
+                raise ValidationError('La solicitud cambió de estado; vuelva a consultarla')
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            estado = (
+                Solicitud.objects.select_for_update().filter(pk=instance.pk)
+                .values_list('estado', flat=True).first()
+            )
+            if estado == 'aprobada':
+                raise ValidationError('Cancele la solicitud aprobada antes de eliminarla')
+            instance.delete()
+
+    @action(detail=True, methods=['post'])
+    def aprobar(self, request, pk=None):
+        """Aprobar solicitud validando la capacidad diaria del área"""
+        solicitud = services.aprobar_solicitud(self.get_object().pk)
+        return Response(self.get_serializer(solicitud).data)
+
+    @action(detail=True, methods=['post'])
+    def rechazar(self, request, pk=None):
+        """Rechazar una solicitud pendiente"""
+        solicitud = services.rechazar_solicitud(self.get_object().pk)
+        return Response(self.get_serializer(solicitud).data)
+
+    @action(detail=True, methods=['post'])
+    def cancelar(self, request, pk=None):
+        """Cancelar solicitud y liberar su lugar en la ocupación"""
+        solicitud = services.cancelar_solicitud(self.get_object().pk)
+        return Response(self.get_serializer(solicitud).data)
+
+    @action(detail=False, methods=['post'])
+    def simular(self, request):
+        """Calcular días hábiles, reanudación y saldo sin registrar la solicitud"""
+        serializer = SimulacionSolicitudSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.validar_area({'area': serializer.validated_data['empleado'].area_id})
+        return Response(simular_solicitud(serializer.validated_data))
+
+    @action(detail=False, methods=['post'])
+    def importar(self, request):
+        """Registrar un lote de solicitudes validando traslapes en una sola consulta"""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.context['importacion'] = True
+        serializer.is_valid(raise_exception=True)
+
+        filas = serializer.validated_data
+        for fila in filas:
+            self.validar_area(fila)
+        errores = validar_traslapes_lote(
+            {
+                'empleado_id': fila['empleado'].id,
+                'fecha_inicio': fila['fecha_inicio'],
+                'fecha_reanudar': fila['fecha_reanudar'],
+            }
+            for fila in filas
+        )
+        if errores:
+            return Response({'errores': errores}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Se registran pendientes: la aprobación descuenta saldo y ocupación
+        with transaction.atomic():
+            creadas = Solicitud.objects.bulk_create(
+                [Solicitud(**dict(fila, estado='pendiente')) for fila in filas], batch_size=500
+            )
+        return Response({'creadas': len(creadas)}, status=status.HTTP_201_CREATED)
+
+class SaldoVacacionesViewSet(AreaScopedMixin, ExportacionMixin, LecturaReplicaMixin, viewsets.ReadOnlyModelViewSet):
+    """Saldos de solo lectura: cambian con solicitudes o ajustes que quedan en el historial"""
+
     queryset = SaldoVacaciones.objects.all()
     serializer_class = SaldoVacacionesSerializer
+    campo_area = 'empleado__area_id'
+
+    acciones_replica = ('exportar',)
+
+    nombre_exportacion = 'saldos'
+    columnas_exportacion = [
+        ('empleado__numero_expediente', 'Expediente'),
+        ('empleado__nombre', 'Nombre'),
+        ('empleado__apellidos', 'Apellidos'),
+        ('empleado__area__codigo', 'Área'),
+        ('periodo', 'Periodo'),
+        ('dias_otorgados', 'Días otorgados'),
+        ('dias_utilizados', 'Días utilizados'),
+        ('dias_disponibles', 'Días disponibles'),
+        ('fecha_inicio_periodo', 'Inicio del periodo'),
+        ('fecha_fin_periodo', 'Fin del periodo'),
+    ]
+
+    def filtrar_exportacion(self, queryset, params):
+        """Filtros: ?anio= (año del periodo), ?area="""
+        año = _año_exportacion(params)
+        if año:
+            queryset = queryset.filter(periodo__startswith=f'{año}-')
+        if params.get('area'):
+            queryset = queryset.filter(empleado__area_id=params['area'])
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def ajustar(self, request, pk=None):
+        """Ajustar los días otorgados del saldo registrando el movimiento"""
+        serializer = AjusteSaldoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        saldo = services.ajustar_saldo(self.get_object().pk, **serializer.validated_data)
+        return Response(self.get_serializer(saldo).data)
+
+class HistorialSaldoViewSet(AreaScopedMixin, ExportacionMixin, LecturaReplicaMixin, viewsets.ReadOnlyModelViewSet):
+    """Libro de movimientos de saldos: solo lo escriben los servicios"""
 
-class HistorialSaldoViewSet(viewsets.ModelViewSet):
     queryset = HistorialSaldo.objects.all()
     serializer_class = HistorialSaldoSerializer
+    campo_area = 'empleado__area_id'
+
+    acciones_replica = ('exportar',)
+
+    nombre_exportacion = 'historial_saldos'
+    columnas_exportacion = [
+        ('fecha_movimiento', 'Fecha'),
+        ('empleado__numero_expediente', 'Expediente'),
+        ('empleado__nombre', 'Nombre'),
+        ('empleado__apellidos', 'Apellidos'),
+        ('periodo', 'Periodo'),
+        ('tipo_movimiento', 'Movimiento'),
+        ('dias_antes', 'Días antes'),
+        ('dias_movimiento', 'Días del movimiento'),
+        ('dias_despues', 'Días después'),
+        ('solicitud__folio', 'Folio de solicitud'),
+        ('descripcion', 'Descripción'),
+    ]
+
+    def filtrar_exportacion(self, queryset, params):
+        """Filtros: ?anio= (fecha del movimiento), ?area=, ?tipo_movimiento="""
+        año = _año_exportacion(params)
+        if año:
+            inicio = timezone.make_aware(datetime.combine(date(año, 1, 1), time.min))
+            fin = timezone.make_aware(datetime.combine(date(año + 1, 1, 1), time.min))
+            queryset = queryset.filter(fecha_movimiento__gte=inicio, fecha_movimiento__lt=fin)
+        if params.get('area'):
+            queryset = queryset.filter(empleado__area_id=params['area'])
+        if params.get('tipo_movimiento'):
+            queryset = queryset.filter(tipo_movimiento=params['tipo_movimiento'])
+        return queryset
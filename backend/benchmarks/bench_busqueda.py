@@ -0,0 +1,120 @@
+"""
+Benchmark: búsqueda de empleados con LIKE '%texto%' vs. índice de términos
+Ejecutar: python benchmarks/bench_busqueda.py [--empleados 100000]
+
+Crea los empleados dentro de una transacción que se revierte al terminar,
+por lo que puede ejecutarse contra una base con datos reales.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+
+import django
+
+# Configurar Django
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.db import transaction
+from django.db.models import Q
+
+from apps.areas.models import Area
+from apps.empleados.busqueda import buscar_empleados, indexar_empleados
+from apps.empleados.models import Empleado
+
+
+NOMBRES = ['José', 'María', 'Juan', 'Guadalupe', 'Francisco', 'Verónica', 'Ángel', 'Sofía',
+           'Luis', 'Andrés', 'Mónica', 'Raúl', 'Itzel', 'Héctor', 'Beatriz', 'Jesús']
+APELLIDOS = ['Hernández', 'García', 'Martínez', 'López', 'González', 'Pérez', 'Rodríguez',
+             'Sánchez', 'Ramírez', 'Cruz', 'Flores', 'Gómez', 'Núñez', 'Díaz', 'Vázquez', 'Ortiz']
+SILABAS = ['ca', 'ma', 'ro', 'te', 'li', 'za', 'vi', 'llo', 'gue', 'rra', 'ba', 'ño', 'tor', 'mon', 'que', 'sal']
+
+# Comunes (Hernández ~10 %), infijos, dos palabras y expedientes; se agrega un
+# apellido poco frecuente del catálogo generado
+BUSQUEDAS = ['hernandez', 'Núñez', 'ver', 'jose garcia', 'tiz', 'mon', 'EXP-0004', 'EXP-0123456']
+
+
+def generar_apellidos(aleatorio, total=3000):
+    """Apellidos comunes seguidos de apellidos sintéticos con frecuencia de Zipf"""
+    apellidos = list(APELLIDOS)
+    vistos = {apellido.lower() for apellido in APELLIDOS}
+    while len(apellidos) < total:
+        apellido = ''.join(aleatorio.choice(SILABAS) for _ in range(aleatorio.randint(2, 3))).capitalize()
+        if apellido.lower() not in vistos:
+            vistos.add(apellido.lower())
+            apellidos.append(apellido)
+    pesos = [1 / (posicion + 1) for posicion in range(len(apellidos))]
+    return apellidos, pesos
+
+
+def busqueda_like(texto):
+    """Línea base: lo que genera SearchFilter con search_fields de Empleado"""
+    condicion = Q()
+    for palabra in texto.split():
+        condicion &= (
+            Q(nombre__icontains=palabra)
+            | Q(apellidos__icontains=palabra)
+            | Q(numero_expediente__icontains=palabra)
+        )
+    return Empleado.objects.filter(condicion)
+
+
+def crear_empleados(total):
+    aleatorio = random.Random(42)
+    apellidos, pesos = generar_apellidos(aleatorio)
+    area = Area.objects.create(nombre='Benchmark búsqueda', codigo='BENCH_BUSQ')
+    for inicio in range(0, total, 5000):
+        lote = Empleado.objects.bulk_create([
+            Empleado(
+                area=area,
+                numero_expediente=f'EXP-{i:07d}',
+                nombre=aleatorio.choice(NOMBRES),
+                apellidos=' '.join(aleatorio.choices(apellidos, pesos, k=2)),
+                fecha_ingreso=date(2010, 1, 1),
+            )
+            for i in range(inicio, min(inicio + 5000, total))
+        ])
+        if lote[0].pk is None:
+            lote = Empleado.objects.filter(area=area, numero_expediente__in=[e.numero_expediente for e in lote])
+        indexar_empleados(lote)
+    return apellidos
+
+
+def medir(funcion, texto, repeticiones):
+    """Milisegundos promedio de una página de resultados (count + 20 renglones)"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        consulta = funcion(texto)
+        consulta.count()
+        list(consulta.values_list('id', flat=True)[:20])
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--empleados', type=int, default=100000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        inicio = time.perf_counter()
+        apellidos = crear_empleados(args.empleados)
+        print(f"Empleados: {args.empleados:,}  (creados e indexados en {time.perf_counter() - inicio:.1f} s)\n")
+
+        print(f"{'Búsqueda':<14} {'Resultados':>10} {'LIKE (ms)':>10} {'Índice (ms)':>12} {'Aceleración':>12}")
+        for texto in BUSQUEDAS + [apellidos[len(apellidos) // 2]]:
+            base = medir(busqueda_like, texto, args.repeticiones)
+            indice = medir(buscar_empleados, texto, args.repeticiones)
+            resultados = buscar_empleados(texto).count()
+            print(f"{texto:<14} {resultados:>10,} {base:10.2f} {indice:12.2f} {base / indice:11.1f}x")
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
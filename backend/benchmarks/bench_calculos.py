@@ -0,0 +1,228 @@
+"""
+Benchmark: motor de fechas de apps.calculos con comparación contra una línea base
+Ejecutar: python benchmarks/bench_calculos.py [--salida resultados.json]
+          [--baseline benchmarks/baseline_calculos.json] [--tolerancia 0.5]
+          [--guardar-baseline]
+
+Mide CalculadoraAntiguedad variando la longitud del rango y el número de
+días festivos. Cada caso reporta microsegundos por llamada (mediana y
+mínimo de varias repeticiones) y el mínimo normalizado contra una carga de
+referencia en Python puro, de modo que la comparación con la línea base
+tolera máquinas de distinta velocidad. El mínimo es la medición menos
+afectada por el ruido del sistema; un caso que excede la tolerancia se
+vuelve a medir antes de reportarlo. La tolerancia por omisión (50%) apunta
+a regresiones algorítmicas; las variaciones menores quedan dentro del
+ruido de una máquina compartida. El script se ejecuta con
+PYTHONHASHSEED=0: el hash de las fechas varía entre procesos y con él las
+colisiones en el conjunto de festivos.
+
+Termina con código 1 si algún caso es más lento que la línea base por
+encima de la tolerancia. Para regenerar la línea base (p. ej. después de
+una optimización intencional) usar --guardar-baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Configurar rutas (el motor de cálculo no requiere Django)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.calculos.antiguedad import CalculadoraAntiguedad
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_calculos.json')
+RANGOS = [5, 30, 90, 365]
+DIAS_HABILES = [1, 5, 20, 60]
+FESTIVOS = [0, 10, 50, 200]
+ENTRADAS_POR_CASO = 50
+# Veces que se vuelve a medir un caso antes de reportarlo como regresión
+REINTENTOS = 2
+
+
+def generar_festivos(total):
+    """Festivos repartidos en los años que cubren los rangos (como en config_global)"""
+    inicio = date(2024, 1, 1)
+    paso = max(1, 3 * 365 // max(total, 1))
+    return {inicio + timedelta(days=i * paso) for i in range(total)}
+
+
+def fechas_inicio(total):
+    return [date(2025, 1, 1) + timedelta(days=i * 7) for i in range(total)]
+
+
+def generar_casos(calculadora):
+    """Regresa {nombre: (función, entradas)}; la función recibe una entrada"""
+    ingresos = [date(1990, 1, 15) + timedelta(days=i * 200) for i in range(ENTRADAS_POR_CASO)]
+    casos = {
+        'calcular_antiguedad': (
+            lambda ingreso: calculadora.calcular_antiguedad(ingreso, date(2025, 6, 30)),
+            ingresos,
+        ),
+        'obtener_dias_por_antiguedad': (
+            calculadora.obtener_dias_por_antiguedad,
+            [i * 0.73 for i in range(ENTRADAS_POR_CASO)],
+        ),
+        'calcular_periodos_disponibles': (
+            lambda ingreso: calculadora.calcular_periodos_disponibles(ingreso, 2025),
+            [ingreso for ingreso in ingresos if not (ingreso.month == 2 and ingreso.day == 29)],
+        ),
+    }
+
+    for festivos_total in FESTIVOS:
+        festivos = generar_festivos(festivos_total)
+        for dias in RANGOS:
+            casos[f'calcular_dias_habiles[rango={dias},festivos={festivos_total}]'] = (
+                lambda inicio, d=dias, f=festivos: calculadora.calcular_dias_habiles(
+                    inicio, inicio + timedelta(days=d - 1), dias_festivos=f
+                ),
+                fechas_inicio(ENTRADAS_POR_CASO),
+            )
+        for dias in DIAS_HABILES:
+            casos[f'calcular_fecha_reanudacion[dias={dias},festivos={festivos_total}]'] = (
+                lambda inicio, d=dias, f=festivos: calculadora.calcular_fecha_reanudacion(
+                    inicio, d, dias_festivos=f
+                ),
+                fechas_inicio(ENTRADAS_POR_CASO),
+            )
+    return casos
+
+
+def medir(funcion, entradas, repeticiones, tiempo_minimo):
+    """Microsegundos por llamada: mediana y mínimo de las repeticiones"""
+    # Calibrar cuántas pasadas sobre las entradas llenan tiempo_minimo
+    pasadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(pasadas):
+            for entrada in entradas:
+                funcion(entrada)
+        if time.perf_counter() - inicio >= tiempo_minimo:
+            break
+        pasadas *= 2
+
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(pasadas):
+            for entrada in entradas:
+                funcion(entrada)
+        muestras.append((time.perf_counter() - inicio) / (pasadas * len(entradas)) * 1e6)
+    return statistics.median(muestras), min(muestras)
+
+
+def referencia(entrada):
+    """Carga fija en Python puro con aritmética de fechas, para normalizar"""
+    fecha = entrada
+    total = 0
+    for _ in range(20):
+        fecha += timedelta(days=1)
+        total += fecha.weekday() < 5
+    return total
+
+
+def comparar(resultados, baseline, tolerancia, volver_a_medir):
+    """Regresa los casos cuyo tiempo normalizado supera la línea base"""
+    regresiones = []
+    for nombre, actual in resultados['casos'].items():
+        anterior = baseline['casos'].get(nombre)
+        if anterior is None:
+            continue
+        cambio = actual['normalizado'] / anterior['normalizado'] - 1
+        for _ in range(REINTENTOS):
+            if cambio <= tolerancia:
+                break
+            cambio = min(cambio, volver_a_medir(nombre) / anterior['normalizado'] - 1)
+        if cambio > tolerancia:
+            regresiones.append((nombre, cambio))
+    return regresiones
+
+
+def main():
+    if os.environ.get('PYTHONHASHSEED') != '0':
+        os.environ['PYTHONHASHSEED'] = '0'
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--salida', help='Archivo JSON donde escribir los resultados')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerancia', type=float, default=0.5, help='Aumento permitido (0.5 = 50%%)')
+    parser.add_argument('--guardar-baseline', action='store_true', help='Sobrescribe la línea base')
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--tiempo-minimo', type=float, default=0.05, help='Segundos por repetición')
+    parser.add_argument('--filtro', default='', help='Solo casos cuyo nombre contiene este texto')
+    args = parser.parse_args()
+
+    calculadora = CalculadoraAntiguedad()
+    casos = {
+        nombre: caso for nombre, caso in generar_casos(calculadora).items() if args.filtro in nombre
+    }
+
+    entradas_referencia = fechas_inicio(ENTRADAS_POR_CASO)
+    ref_minimo = float('inf')
+    mediciones = {}
+
+    print(f"{'Caso':<58} {'mediana µs':>11} {'mín µs':>9}")
+    for nombre, (funcion, entradas) in casos.items():
+        # La referencia se mide junto a cada caso y se conserva el mínimo de
+        # la corrida, para que una racha lenta al inicio no la distorsione
+        ref_minimo = min(ref_minimo, medir(referencia, entradas_referencia, 3, args.tiempo_minimo)[1])
+        mediana, minimo = medir(funcion, entradas, args.repeticiones, args.tiempo_minimo)
+        mediciones[nombre] = (mediana, minimo)
+        print(f"{nombre:<58} {mediana:11.3f} {minimo:9.3f}")
+
+    print(f"\nReferencia: {ref_minimo:.3f} µs/llamada")
+    resultados = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'referencia_us': round(ref_minimo, 4),
+        'casos': {
+            nombre: {
+                'mediana_us': round(mediana, 4),
+                'minimo_us': round(minimo, 4),
+                'normalizado': round(minimo / ref_minimo, 4),
+            }
+            for nombre, (mediana, minimo) in mediciones.items()
+        },
+    }
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+
+    if args.guardar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+            archivo.write('\n')
+        print(f"\nLínea base guardada en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nSin línea base en {args.baseline}; usar --guardar-baseline para crearla")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as archivo:
+        baseline = json.load(archivo)
+    def volver_a_medir(nombre):
+        funcion, entradas = casos[nombre]
+        return medir(funcion, entradas, args.repeticiones, args.tiempo_minimo)[1] / ref_minimo
+
+    regresiones = comparar(resultados, baseline, args.tolerancia, volver_a_medir)
+    if not regresiones:
+        print(f"\nSin regresiones contra la línea base (tolerancia {args.tolerancia:.0%})")
+        return 0
+
+    print(f"\nRegresiones contra la línea base (tolerancia {args.tolerancia:.0%}):")
+    for nombre, cambio in regresiones:
+        print(f"  {nombre:<58} +{cambio:.0%}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Benchmark: motor de reglas compilado vs. interpretación del JSON en cada solicitud
+Ejecutar: python benchmarks/bench_reglas.py [--solicitudes 100000]
+
+Ambas variantes reciben las reglas ya en memoria; en producción la
+interpretación además consulta reglas_area en cada solicitud, mientras que el
+motor solo lee la versión del caché.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import django
+
+# Configurar Django
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from apps.configuracion.models import ReglaArea
+from apps.configuracion.services import MotorReglas
+from apps.empleados.models import Empleado
+
+
+# Reglas tal como se guardan en reglas_area.configuracion
+REGLAS = [
+    ('dias_anticipacion', {'dias': 30}),
+    ('prorroga', {'dias': 45}),
+    ('taquilla_validacion', {'bloquear_conflictos': False}),
+    ('capacidad_diaria', {'ambito': 'linea_metro', 'valor': 'L1', 'max_ausentes': 4}),
+]
+
+
+def interpretar_json(reglas_json, contexto):
+    """Línea base: decodifica e interpreta la configuración en cada solicitud"""
+    errores, advertencias = [], []
+    for tipo_regla, texto in reglas_json:
+        config = json.loads(texto)
+        if tipo_regla == 'dias_anticipacion':
+            dias = int(config.get('dias', 30))
+            if (contexto['fecha_inicio'] - contexto['fecha_solicitud']).days < dias:
+                errores.append({'regla': tipo_regla, 'mensaje': f"Debe solicitarse con al menos {dias} días de anticipación"})
+        elif tipo_regla == 'prorroga':
+            fin = contexto.get('fecha_fin_periodo')
+            if fin is not None and contexto['fecha_inicio'] > fin:
+                limite = fin + timedelta(days=int(config.get('dias', 30)))
+                if contexto['fecha_inicio'] <= limite:
+                    advertencias.append({'regla': tipo_regla, 'mensaje': f"Se usa la prórroga del periodo (vence el {limite.strftime('%d/%m/%Y')})"})
+                else:
+                    errores.append({'regla': tipo_regla, 'mensaje': f"El periodo y su prórroga vencieron el {limite.strftime('%d/%m/%Y')}"})
+        elif tipo_regla == 'taquilla_validacion':
+            descansos = contexto.get('dias_descanso')
+            if contexto['empleado'].es_taquilla and descansos:
+                inicio, reanudar = contexto['fecha_inicio'], contexto['fecha_reanudar']
+                conflictos = sorted(d for d in descansos if inicio <= d <= reanudar)
+                if conflictos:
+                    fechas = ', '.join(d.strftime('%d/%m/%Y') for d in conflictos)
+                    destino = errores if config.get('bloquear_conflictos') else advertencias
+                    destino.append({'regla': tipo_regla, 'mensaje': f"Conflicto con días de descanso rolados: {fechas}"})
+        elif tipo_regla == 'capacidad_diaria':
+            # Se interpreta para obtener el ámbito aunque la validación use contadores
+            config.get('ambito', 'area'), config.get('max_ausentes')
+    return {'errores': errores, 'advertencias': advertencias}
+
+
+def generar_contextos(total):
+    empleado = Empleado(linea_metro='L1', turno='Matutino', es_taquilla=True)
+    descansos = {date(2025, 1, 1) + timedelta(days=d) for d in range(0, 365, 6)}
+    contextos = []
+    for i in range(total):
+        fecha_inicio = date(2025, 1, 1) + timedelta(days=i % 330)
+        contextos.append({
+            'empleado': empleado,
+            'fecha_solicitud': fecha_inicio - timedelta(days=i % 60),
+            'fecha_inicio': fecha_inicio,
+            'fecha_reanudar': fecha_inicio + timedelta(days=1 + i % 10),
+            'fecha_fin_periodo': date(2025, 6, 30),
+            'dias_descanso': descansos,
+        })
+    return contextos
+
+
+def medir(nombre, funcion, contextos):
+    inicio = time.perf_counter()
+    for contexto in contextos:
+        funcion(contexto)
+    transcurrido = time.perf_counter() - inicio
+    print(f"{nombre:<28} {transcurrido:8.3f} s  {len(contextos) / transcurrido:12,.0f} solicitudes/s")
+    return transcurrido
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--solicitudes', type=int, default=100000)
+    args = parser.parse_args()
+
+    contextos = generar_contextos(args.solicitudes)
+    reglas_json = [(tipo, json.dumps(config)) for tipo, config in REGLAS]
+    reglas = [
+        ReglaArea(id=i, tipo_regla=tipo, configuracion=config)
+        for i, (tipo, config) in enumerate(REGLAS, start=1)
+    ]
+    motor = MotorReglas.compilar(reglas, version='benchmark')
+
+    print(f"Reglas: {len(REGLAS)}  Solicitudes: {args.solicitudes:,}\n")
+    base = medir('Interpretación JSON', lambda c: interpretar_json(reglas_json, c), contextos)
+    compilado = medir('Motor compilado', motor.evaluar, contextos)
+    print(f"\nAceleración: {base / compilado:.2f}x\n")
+
+    print("Tiempos por regla (motor compilado):")
+    for stats in motor.estadisticas():
+        print(f"  {stats['tipo_regla']:<22} {stats['tiempo_promedio_us']:8.3f} µs promedio")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: revocación de refresh tokens con filtro de Bloom vs. consulta a la BD
+Ejecutar: python benchmarks/bench_revocacion.py [--revocados 100000] [--operaciones 2000]
+
+La línea base consulta tokens_revocados en cada verificación, como lo hace
+token_blacklist. Los datos se crean en una transacción que se revierte.
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+import django
+
+# Configurar Django
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.authentication.models import TokenRevocado, Usuario
+from apps.authentication.revocacion import (
+    RefreshTokenRevocable,
+    TokenRefreshRevocableSerializer,
+    almacen,
+)
+
+
+class RefreshTokenConsultaBD(RefreshTokenRevocable):
+    """Línea base: una consulta a la base de datos por verificación"""
+
+    def verify(self, *args, **kwargs):
+        super(RefreshTokenRevocable, self).verify(*args, **kwargs)
+        if TokenRevocado.objects.filter(jti=self.payload[api_settings.JTI_CLAIM]).exists():
+            raise TokenError('Token is blacklisted')
+
+
+class RefreshConsultaBDSerializer(TokenRefreshRevocableSerializer):
+    token_class = RefreshTokenConsultaBD
+
+
+def medir(nombre, funcion, operaciones):
+    inicio = time.perf_counter()
+    for _ in range(operaciones):
+        funcion()
+    transcurrido = time.perf_counter() - inicio
+    print(f"{nombre:<34} {operaciones / transcurrido:10,.0f} ops/s  {transcurrido / operaciones * 1e6:9.1f} µs/op")
+    return transcurrido
+
+
+def flujo_refresh(serializer_class, token_inicial):
+    """Cada llamada rota el token: verifica, revoca el anterior y emite uno nuevo"""
+    estado = {'refresh': token_inicial}
+
+    def refresh():
+        serializer = serializer_class(data={'refresh': estado['refresh']})
+        serializer.is_valid(raise_exception=True)
+        estado['refresh'] = serializer.validated_data['refresh']
+    return refresh
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--revocados', type=int, default=100000, help='Tokens revocados vigentes')
+    parser.add_argument('--operaciones', type=int, default=2000)
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        usuario = Usuario.objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex[:8]}@metro.gob.mx', password='benchmark',
+            nombre='Benchmark', apellidos='Revocación', rol='superadmin',
+        )
+        expira = timezone.now() + timedelta(days=7)
+        TokenRevocado.objects.bulk_create(
+            [TokenRevocado(jti=uuid.uuid4().hex, expira=expira) for _ in range(args.revocados)],
+            batch_size=5000,
+        )
+        almacen.purgar()
+        print(f"Tokens revocados vigentes: {args.revocados:,}\n")
+
+        jtis = [uuid.uuid4().hex for _ in range(args.operaciones)]
+        iterador = iter(jtis * 2)
+        medir('Verificación (consulta BD)', lambda: TokenRevocado.objects.filter(jti=next(iterador)).exists(), args.operaciones)
+        consultas = almacen.consultas_bd
+        medir('Verificación (Bloom)', lambda: almacen.esta_revocado(next(iterador)), args.operaciones)
+        print(f"  falsos positivos consultados en BD: {almacen.consultas_bd - consultas}\n")
+
+        medir('Refresh con rotación (consulta BD)',
+              flujo_refresh(RefreshConsultaBDSerializer, str(RefreshTokenRevocable.for_user(usuario))),
+              args.operaciones)
+        medir('Refresh con rotación (Bloom)',
+              flujo_refresh(TokenRefreshRevocableSerializer, str(RefreshTokenRevocable.for_user(usuario))),
+              args.operaciones)
+
+        tokens = iter([RefreshTokenRevocable.for_user(usuario) for _ in range(args.operaciones)])
+        medir('Logout', lambda: next(tokens).blacklist(), args.operaciones)
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
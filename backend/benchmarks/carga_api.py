@@ -0,0 +1,308 @@
+"""
+Prueba de carga de la API: escenarios de uso con reporte de latencias
+Ejecutar: python benchmarks/carga_api.py [--escenarios login,admin,envios,descargas]
+          [--rondas 3] [--empleados 2000] [--solicitudes 20000] [--bd /tmp/carga.sqlite3]
+          [--salida resultados.json]
+
+Las peticiones pasan por la pila completa de Django (middleware, JWT,
+DRF, serializers) con el cliente de pruebas, sin red, contra una base de
+datos SQLite local que sustituye a MySQL. Los datos se generan con
+generar_datos_sinteticos; con --bd el archivo se conserva y se reutiliza
+en corridas posteriores.
+
+Escenarios (rutas de config/urls.py):
+- login: cada admin de área inicia sesión
+- admin: un admin lista solicitudes de su área, abre el detalle de las
+  pendientes y las aprueba
+- envios: ráfaga de solicitudes de días económicos (simulación + alta)
+- descargas: exportaciones CSV/XLSX de solicitudes y saldos. Aún no hay
+  una ruta de descarga de PDF; cuando exista se agrega aquí
+
+Por cada ruta reporta p50/p95/p99, errores (5xx), rechazos (4xx) y
+consultas SQL por petición. El rendimiento reportado es el de un solo
+proceso (sin concurrencia).
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import django
+
+# Configurar Django
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+PREFIJO = 'CARGA'
+PASSWORD = 'carga-api'
+
+
+def configurar(ruta_bd):
+    """Sustituye la base de datos configurada por SQLite antes de django.setup()"""
+    from django.conf import settings
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ruta_bd,
+        'ATOMIC_REQUESTS': False,
+    }
+    django.setup()
+
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    # Los 4xx esperados (rechazos de validación) se cuentan en el reporte
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano sobre una lista ordenada"""
+    if not valores:
+        return 0.0
+    indice = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[indice]
+
+
+class Estadisticas:
+    """Latencias, estados y consultas por ruta"""
+
+    def __init__(self):
+        self.rutas = {}
+
+    def registrar(self, etiqueta, segundos, estado, consultas):
+        ruta = self.rutas.setdefault(etiqueta, {'latencias': [], 'errores': 0, 'rechazos': 0, 'consultas': 0})
+        ruta['latencias'].append(segundos * 1000)
+        ruta['consultas'] += consultas
+        if estado is None or estado >= 500:
+            ruta['errores'] += 1
+        elif estado >= 400:
+            ruta['rechazos'] += 1
+
+    def resumen(self):
+        resumen = {}
+        for etiqueta, ruta in self.rutas.items():
+            latencias = sorted(ruta['latencias'])
+            total = len(latencias)
+            resumen[etiqueta] = {
+                'peticiones': total,
+                'p50_ms': round(percentil(latencias, 50), 2),
+                'p95_ms': round(percentil(latencias, 95), 2),
+                'p99_ms': round(percentil(latencias, 99), 2),
+                'max_ms': round(latencias[-1], 2),
+                'errores': ruta['errores'],
+                'rechazos': ruta['rechazos'],
+                'consultas_por_peticion': round(ruta['consultas'] / total, 1),
+            }
+        return resumen
+
+
+class ClienteCarga:
+    """Cliente de pruebas que mide cada petición"""
+
+    def __init__(self, estadisticas):
+        from django.test import Client
+        self.cliente = Client(raise_request_exception=False)
+        self.estadisticas = estadisticas
+        self.token = None
+
+    def peticion(self, etiqueta, metodo, ruta, datos=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'} if self.token else {}
+        if datos is not None and metodo != 'get':
+            extra['content_type'] = 'application/json'
+
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            respuesta = getattr(self.cliente, metodo)(ruta, datos, **extra)
+            if respuesta.streaming:
+                # Las descargas se miden hasta el último byte
+                for _ in respuesta.streaming_content:
+                    pass
+            segundos = time.perf_counter() - inicio
+
+        self.estadisticas.registrar(f'{metodo.upper()} {etiqueta}', segundos, respuesta.status_code, len(consultas))
+        return respuesta
+
+    def iniciar_sesion(self, email):
+        respuesta = self.peticion('/api/auth/login/', 'post', '/api/auth/login/',
+                                  {'email': email, 'password': PASSWORD})
+        if respuesta.status_code == 200:
+            self.token = respuesta.json()['tokens']['access']
+        return respuesta
+
+
+# ============================================================================
+# DATOS
+# ============================================================================
+
+def preparar_datos(args):
+    """Genera los datos la primera vez y regresa los admins de área"""
+    from django.core.management import call_command
+    from apps.authentication.models import Usuario
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    admins = Usuario.objects.filter(rol='admin_area', area__codigo__startswith=f'{PREFIJO}_')
+    if not admins.exists():
+        print('Generando datos sintéticos...')
+        call_command(
+            'generar_datos_sinteticos', areas=args.areas, empleados=args.empleados,
+            solicitudes=args.solicitudes, auditoria=0, prefijo=PREFIJO, semilla=args.semilla,
+            stdout=open(os.devnull, 'w'),
+        )
+        for usuario in admins:
+            usuario.set_password(PASSWORD)
+            usuario.save(update_fields=['password'])
+    return list(admins.order_by('email').select_related('area'))
+
+
+# ============================================================================
+# ESCENARIOS
+# ============================================================================
+
+def escenario_login(admins, estadisticas, args):
+    for admin in admins:
+        ClienteCarga(estadisticas).iniciar_sesion(admin.email)
+
+
+def escenario_admin(admins, estadisticas, args):
+    """Listar, revisar y aprobar pendientes del área"""
+    for admin in admins:
+        cliente = ClienteCarga(estadisticas)
+        cliente.iniciar_sesion(admin.email)
+        pendientes = []
+        for pagina in range(1, args.paginas + 1):
+            respuesta = cliente.peticion('/api/solicitudes/', 'get', '/api/solicitudes/', {'page': pagina})
+            if respuesta.status_code != 200:
+                break
+            pendientes += [s['id'] for s in respuesta.json()['results'] if s['estado'] == 'pendiente']
+
+        for solicitud_id in pendientes[:args.aprobaciones]:
+            cliente.peticion('/api/solicitudes/{id}/', 'get', f'/api/solicitudes/{solicitud_id}/')
+            cliente.peticion('/api/solicitudes/{id}/aprobar/', 'post', f'/api/solicitudes/{solicitud_id}/aprobar/', {})
+
+
+def escenario_envios(admins, estadisticas, args):
+    """Ráfaga de días económicos: simulación y alta, como el formulario"""
+    from apps.catalogos.models import TipoDiaEconomico
+    from apps.empleados.models import Empleado
+
+    for admin in admins:
+        cliente = ClienteCarga(estadisticas)
+        cliente.iniciar_sesion(admin.email)
+        tipo_dia = TipoDiaEconomico.objects.filter(area_id=admin.area_id).values_list('id', flat=True).first()
+        empleados = list(
+            Empleado.objects.filter(area_id=admin.area_id, activo=True)
+            .order_by('?').values_list('id', flat=True)[:args.envios]
+        )
+        for i, empleado_id in enumerate(empleados):
+            fecha_inicio = date.today() + timedelta(days=60 + i % 200)
+            while fecha_inicio.weekday() >= 5:
+                fecha_inicio += timedelta(days=1)
+            datos = {
+                'empleado': empleado_id,
+                'tipo_solicitud': 'dia_economico',
+                'tipo_dia_economico': tipo_dia,
+                'fecha_inicio': fecha_inicio.isoformat(),
+                'dias_habiles': 1,
+            }
+            simulacion = cliente.peticion('/api/solicitudes/simular/', 'post', '/api/solicitudes/simular/', datos)
+            if simulacion.status_code != 200 or not simulacion.json()['valido']:
+                continue
+            cliente.peticion('/api/solicitudes/', 'post', '/api/solicitudes/', dict(
+                datos,
+                area=admin.area_id,
+                creado_por=admin.id,
+                folio=f'{PREFIJO}-{time.time_ns()}',
+                fecha_reanudar=simulacion.json()['fecha_reanudar'],
+            ))
+
+
+def escenario_descargas(admins, estadisticas, args):
+    """Exportaciones completas del área"""
+    año = date.today().year
+    for admin in admins[:args.descargas]:
+        cliente = ClienteCarga(estadisticas)
+        cliente.iniciar_sesion(admin.email)
+        cliente.peticion('/api/solicitudes/exportar/?formato=csv', 'get', '/api/solicitudes/exportar/',
+                         {'formato': 'csv', 'anio': año})
+        cliente.peticion('/api/solicitudes/exportar/?formato=xlsx', 'get', '/api/solicitudes/exportar/',
+                         {'formato': 'xlsx', 'anio': año})
+        cliente.peticion('/api/solicitudes/saldos/exportar/?gzip=1', 'get', '/api/solicitudes/saldos/exportar/',
+                         {'formato': 'csv', 'gzip': 1})
+
+
+ESCENARIOS = {
+    'login': escenario_login,
+    'admin': escenario_admin,
+    'envios': escenario_envios,
+    'descargas': escenario_descargas,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escenarios', default=','.join(ESCENARIOS))
+    parser.add_argument('--rondas', type=int, default=3, help='Repeticiones de cada escenario')
+    parser.add_argument('--bd', help='Archivo SQLite a conservar (default: temporal)')
+    parser.add_argument('--areas', type=int, default=5)
+    parser.add_argument('--empleados', type=int, default=2000)
+    parser.add_argument('--solicitudes', type=int, default=20000)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--paginas', type=int, default=3, help='Páginas que lista cada admin')
+    parser.add_argument('--aprobaciones', type=int, default=10, help='Pendientes que aprueba cada admin')
+    parser.add_argument('--envios', type=int, default=50, help='Solicitudes por admin en cada ráfaga')
+    parser.add_argument('--descargas', type=int, default=5, help='Admins que descargan exportaciones')
+    parser.add_argument('--salida', help='Archivo JSON donde escribir los resultados')
+    args = parser.parse_args()
+
+    escenarios = [nombre.strip() for nombre in args.escenarios.split(',') if nombre.strip()]
+    desconocidos = set(escenarios) - set(ESCENARIOS)
+    if desconocidos:
+        parser.error(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+
+    temporal = None
+    if args.bd is None:
+        temporal = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False)
+        args.bd = temporal.name
+    try:
+        configurar(args.bd)
+        admins = preparar_datos(args)
+
+        estadisticas = Estadisticas()
+        inicio = time.perf_counter()
+        for ronda in range(args.rondas):
+            for nombre in escenarios:
+                ESCENARIOS[nombre](admins, estadisticas, args)
+        duracion = time.perf_counter() - inicio
+    finally:
+        if temporal is not None:
+            os.unlink(temporal.name)
+
+    resumen = estadisticas.resumen()
+    total = sum(ruta['peticiones'] for ruta in resumen.values())
+    print(f"\nEscenarios: {', '.join(escenarios)}  Rondas: {args.rondas}  Admins: {len(admins)}")
+    print(f"Peticiones: {total:,} en {duracion:.1f} s ({total / duracion:,.1f} peticiones/s, un proceso)\n")
+    print(f"{'Ruta':<52} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>5} {'4xx':>5} {'SQL':>6}")
+    for etiqueta, ruta in sorted(resumen.items()):
+        print(f"{etiqueta:<52} {ruta['peticiones']:6d} {ruta['p50_ms']:8.1f} {ruta['p95_ms']:8.1f} "
+              f"{ruta['p99_ms']:8.1f} {ruta['errores']:5d} {ruta['rechazos']:5d} {ruta['consultas_por_peticion']:6.1f}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                'escenarios': escenarios,
+                'rondas': args.rondas,
+                'duracion_s': round(duracion, 2),
+                'peticiones_por_s': round(total / duracion, 1),
+                'rutas': resumen,
+            }, archivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
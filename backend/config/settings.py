@@ -2,6 +2,7 @@
 Django settings for Metro Vacaciones System
 """
 
+import sys
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
@@ -12,6 +13,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = config('SECRET_KEY', default='django-insecure-change-this-in-production')
 
+# Ejecución de `manage.py test`
+PRUEBAS = sys.argv[1:2] == ['test']
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config('DEBUG', default=True, cast=bool)
 
@@ -44,6 +48,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero, para medir el tiempo total de la petición
+    'utils.metricas.MetricasMiddleware',
+    'utils.perfiles.PerfilesMiddleware',
+    'utils.replicas.ReplicasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -76,9 +84,12 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
+# DB_ENGINE: django.db.backends.mysql o django.db.backends.postgresql
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.mysql')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': DB_ENGINE,
         'NAME': config('DB_NAME', default='metro_vacaciones'),
         'USER': config('DB_USER', default='metro_user'),
         'PASSWORD': config('DB_PASSWORD', default='tu_password_seguro'),
@@ -87,7 +98,40 @@ DATABASES = {
         'OPTIONS': {
             'charset': 'utf8mb4',
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-        },
+        } if DB_ENGINE.endswith('mysql') else {},
+        # Conexiones persistentes (segundos; 0 = una por petición) con
+        # verificación de salud antes de reutilizarlas. Ver utils/conexiones.py
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Máximo de conexiones persistentes por proceso y alias (workers con hilos)
+DB_MAX_CONEXIONES = config('DB_MAX_CONEXIONES', default=10, cast=int)
+
+# Réplica de lectura opcional para reportes y exportaciones (ver utils/replicas.py)
+if config('DB_REPLICA_HOST', default=''):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'HOST': config('DB_REPLICA_HOST'),
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif PRUEBAS:
+    # En pruebas la réplica es un espejo de la base de pruebas
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+DATABASE_ROUTERS = ['utils.replicas.ReplicaRouter']
+# Segundos que un usuario que escribió lee de la primaria
+REPLICA_VENTANA_SEGUNDOS = config('REPLICA_VENTANA_SEGUNDOS', default=10, cast=int)
+
+# Cache compartido entre procesos (versiones de reglas, catálogos, etc.)
+# Fuera de DEBUG se exige uno compartido (utils/checks.py), p. ej.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='metro-vacaciones'),
     }
 }
 
@@ -134,7 +178,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.PrincipalJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -156,7 +200,7 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    'UPDATE_LAST_LOGIN': False,  # last_login se registra en lote al iniciar sesión
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -164,8 +208,33 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Revocación propia en lugar de token_blacklist (ver apps.authentication.revocacion)
+    'TOKEN_REFRESH_SERIALIZER': 'apps.authentication.revocacion.TokenRefreshRevocableSerializer',
 }
 
+# Último acceso: segundos dentro de los que no se vuelve a registrar y cada
+# cuántos segundos se escriben los accesos acumulados
+ULTIMO_ACCESO_PRECISION = config('ULTIMO_ACCESO_PRECISION', default=300, cast=int)
+ULTIMO_ACCESO_INTERVALO = config('ULTIMO_ACCESO_INTERVALO', default=60, cast=int)
+
+# Métricas por petición (utils.metricas): umbral para registrar peticiones
+# lentas con sus consultas y token para /api/metricas/ (vacío: solo local)
+METRICAS_PETICION_LENTA_MS = config('METRICAS_PETICION_LENTA_MS', default=1000, cast=int)
+METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+
+# Perfilado bajo demanda (utils.perfiles): directorio, número máximo de
+# perfiles, horas que se conservan e intervalo de muestreo
+PERFILES_DIR = config('PERFILES_DIR', default=str(BASE_DIR / 'logs' / 'perfiles'))
+PERFILES_MAX = config('PERFILES_MAX', default=50, cast=int)
+PERFILES_RETENCION_HORAS = config('PERFILES_RETENCION_HORAS', default=72, cast=int)
+PERFILES_INTERVALO_MS = config('PERFILES_INTERVALO_MS', default=2, cast=int)
+
+# Tareas en segundo plano (utils.tareas): hilos por proceso y segundos que
+# se conserva el estado de una tarea; TAREAS_SINCRONAS las ejecuta en línea
+TAREAS_HILOS = config('TAREAS_HILOS', default=2, cast=int)
+TAREAS_VENCIMIENTO = config('TAREAS_VENCIMIENTO', default=900, cast=int)
+TAREAS_SINCRONAS = config('TAREAS_SINCRONAS', default=False, cast=bool)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -200,6 +269,8 @@ APP_SETTINGS = {
     'FOLIO_PREFIX': 'SOL',
     'FOLIO_LENGTH': 10,
     'MAX_DIAS_SOLICITUD': 90,
+    # Días naturales entre el inicio y el fin o la reanudación
+    'MAX_DIAS_RANGO_SOLICITUD': 366,
     'MIN_DIAS_ANTICIPACION': 30,
     'DIAS_HABILES_SEMANA': 5,
 }
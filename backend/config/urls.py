@@ -7,6 +7,9 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from utils.metricas import metricas_view
+from utils.perfiles import perfil_view, perfiles_view
+
 urlpatterns = [
     # Admin de Django
     path('admin/', admin.site.urls),
@@ -18,6 +21,13 @@ urlpatterns = [
     path('api/configuracion/', include('apps.configuracion.urls')),
     path('api/catalogos/', include('apps.catalogos.urls')),
     path('api/solicitudes/', include('apps.solicitudes.urls')),
+
+    # Métricas en formato Prometheus
+    path('api/metricas/', metricas_view, name='metricas'),
+
+    # Perfiles de peticiones (superadmin)
+    path('api/perfiles/', perfiles_view, name='perfiles'),
+    path('api/perfiles/<str:perfil_id>/', perfil_view, name='perfil'),
 ]
 
 # Servir archivos media en desarrollo
@@ -114,6 +114,11 @@ def crear_configuracion_global():
             'valor': {'dias': 24},
             'descripcion': 'Máximo de días acumulables de vacaciones'
         },
+        {
+            'clave': 'dias_festivos',
+            'valor': [],
+            'descripcion': 'Días festivos (AAAA-MM-DD) que no cuentan como días hábiles'
+        },
     ]
     
     for config_data in configs:
@@ -0,0 +1,111 @@
+"""
+Respuestas en caché con GET condicional para datos casi estáticos
+
+Cada grupo de datos (p. ej. los catálogos) tiene una versión en el caché de
+Django que cambia al escribir (invalidar_version). El ETag de una lectura
+se deriva de la versión, del ámbito de datos del usuario y del formato, de
+modo que un 'If-None-Match' vigente se responde con 304 sin consultar la
+base de datos ni serializar (en retrieve solo se confirma que el objeto
+exista). Las respuestas 200 se guardan en el caché bajo la versión actual;
+una versión nueva deja las anteriores sin uso hasta que expiran.
+
+La versión debe verse igual en todos los workers, por lo que depende de un
+caché compartido (ver utils/checks.py).
+"""
+
+import hashlib
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _clave_version(grupo: str) -> str:
+    return f'cache_condicional:{grupo}:version'
+
+
+def obtener_version(grupo: str):
+    """Regresa (versión, timestamp de la última modificación) del grupo"""
+    clave = _clave_version(grupo)
+    valor = cache.get(clave)
+    if valor is None:
+        cache.add(clave, (uuid.uuid4().hex, int(time.time())), None)
+        valor = cache.get(clave)
+    return valor
+
+
+def invalidar_version(grupo: str):
+    """Cambia la versión del grupo al confirmarse la transacción en curso"""
+    transaction.on_commit(
+        lambda: cache.set(_clave_version(grupo), (uuid.uuid4().hex, int(time.time())), None)
+    )
+
+
+def _no_modificado(request, etag: str, modificado: int) -> bool:
+    si_no_coincide = request.headers.get('If-None-Match')
+    if si_no_coincide:
+        # Comparación débil: un proxy que comprime puede marcar el ETag como W/
+        etags = [e[2:] if e.startswith('W/') else e for e in parse_etags(si_no_coincide)]
+        return '*' in etags or etag in etags
+    desde = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+    return desde is not None and modificado <= desde
+
+
+class CacheCondicionalMixin:
+    """
+    Sirve list y retrieve desde el caché versionado con ETag y Last-Modified
+
+    El ViewSet define:
+        grupo_cache: Nombre del grupo cuya versión invalida las respuestas
+        segundos_cache: Vida de cada respuesta guardada (default 1 hora)
+    """
+
+    grupo_cache = None
+    segundos_cache = 3600
+
+    def ambito_cache(self) -> str:
+        """Qué datos ve el usuario (coincide con filtrar_por_area)"""
+        usuario = self.request.user
+        if getattr(usuario, 'rol', None) == 'superadmin':
+            return 'todas'
+        return f"area:{getattr(usuario, 'area_id', None) or 0}"
+
+    def list(self, request, *args, **kwargs):
+        return self.respuesta_condicional(request, lambda: super(CacheCondicionalMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        # 404 (o 403) antes que 304: el objeto debe existir y ser visible
+        self.get_object()
+        return self.respuesta_condicional(request, lambda: super(CacheCondicionalMixin, self).retrieve(request, *args, **kwargs))
+
+    def respuesta_condicional(self, request, generar):
+        version, modificado = obtener_version(self.grupo_cache)
+        ambito = self.ambito_cache()
+        formato = getattr(request, 'accepted_renderer', None)
+        formato = formato.format if formato is not None else ''
+        etag = '"%s"' % hashlib.md5(f'{version}:{ambito}:{formato}'.encode()).hexdigest()
+
+        if _no_modificado(request, etag, modificado):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            clave = f'cache_condicional:{self.grupo_cache}:{version}:{ambito}:{formato}:{request.get_full_path()}'
+            datos = cache.get(clave)
+            if datos is None:
+                response = generar()
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(clave, response.data, self.segundos_cache)
+            else:
+                response = Response(datos)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(modificado)
+        # Cada cliente revalida; la respuesta depende del usuario
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,45 @@
+"""
+Revisiones del sistema (manage.py check, migrate, runserver)
+
+Las versiones de reglas, la configuración de cálculos, las tareas en
+segundo plano y otras marcas viven en el caché de Django y se comparten
+entre los workers de gunicorn. Con un caché por proceso (LocMemCache) una
+invalidación solo llega al worker que la hizo y los demás siguen con datos
+viejos, por lo que fuera de DEBUG se exige un caché compartido. Con la
+réplica configurada se exige siempre: la marca que fija a la primaria al
+usuario que escribió debe verse en el worker que atiende su siguiente
+petición (ver utils/replicas.py).
+
+Con `manage.py test` (PRUEBAS) no se revisa: el corredor fuerza DEBUG=False
+y declara la réplica como espejo, y las pruebas no necesitan Redis.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from utils.replicas import ALIAS as ALIAS_REPLICA
+
+# Cachés que no se comparten entre procesos
+CACHES_POR_PROCESO = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=False)
+def revisar_cache_compartido(app_configs, **kwargs):
+    if getattr(settings, 'PRUEBAS', False):
+        return []
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in CACHES_POR_PROCESO:
+        return []
+    if settings.DEBUG and ALIAS_REPLICA not in settings.DATABASES:
+        return []
+    return [
+        Error(
+            f'El caché {backend} no se comparte entre procesos.',
+            hint='Configure CACHE_BACKEND y CACHE_LOCATION con un caché compartido '
+                 '(p. ej. django.core.cache.backends.redis.RedisCache).',
+            id='metro.E001',
+        )
+    ]
@@ -0,0 +1,169 @@
+"""
+Conexiones persistentes a la base de datos
+
+Django mantiene una conexión por hilo y alias; con CONN_MAX_AGE > 0 la
+conserva entre peticiones (en workers sync hay un hilo por proceso, en
+gthread una por hilo). Este módulo sustituye el manejador
+close_old_connections de Django por uno equivalente que además:
+- cuenta conexiones abiertas, reutilizadas y cerradas (por edad, error,
+  verificación de salud fallida o límite)
+- limita a DB_MAX_CONEXIONES las conexiones persistentes por proceso y
+  alias: al terminar una petición, si hay más conexiones abiertas que el
+  límite, la del hilo se cierra en lugar de conservarse
+
+La verificación de salud es la de Django (CONN_HEALTH_CHECKS): una
+conexión reutilizada se prueba una sola vez, antes de su primera consulta
+en la petición. Se instala al arrancar (ConfiguracionConfig.ready), de
+modo que también cuenta las conexiones de los comandos; las estadísticas
+se exponen en /api/metricas/.
+"""
+
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core import signals
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+
+MOTIVOS_CIERRE = ('edad', 'error', 'salud', 'limite')
+
+_lock = threading.Lock()
+_instalado = False
+
+
+class EstadisticasConexiones:
+    """Contadores del proceso por alias"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.abiertas = {}
+        self.reutilizadas = {}
+        self.cerradas = {}
+        # Envoltorios (uno por hilo y alias) que han abierto una conexión
+        self.envoltorios = weakref.WeakSet()
+
+    def sumar(self, contador, clave):
+        with self._lock:
+            contador[clave] = contador.get(clave, 0) + 1
+
+    def registrar_envoltorio(self, envoltorio):
+        with self._lock:
+            self.envoltorios.add(envoltorio)
+
+    def persistentes(self, alias) -> int:
+        """Conexiones abiertas en este momento por hilos vivos"""
+        hilos = {hilo.ident for hilo in threading.enumerate()}
+        with self._lock:
+            return sum(
+                1 for envoltorio in self.envoltorios
+                if envoltorio.alias == alias and envoltorio.connection is not None
+                and envoltorio._thread_ident in hilos
+            )
+
+    def exponer(self) -> list:
+        """Líneas en formato Prometheus para el registro de métricas"""
+        alias_configurados = sorted(settings.DATABASES)
+        with self._lock:
+            abiertas = dict(self.abiertas)
+            reutilizadas = dict(self.reutilizadas)
+            cerradas = dict(self.cerradas)
+        maximo = _maximo()
+
+        lineas = [
+            '# HELP db_connections_opened_total Conexiones nuevas a la base de datos',
+            '# TYPE db_connections_opened_total counter',
+        ]
+        lineas += [f'db_connections_opened_total{{alias="{alias}"}} {abiertas.get(alias, 0)}' for alias in alias_configurados]
+        lineas += [
+            '# HELP db_connections_reused_total Peticiones que reutilizaron una conexión persistente',
+            '# TYPE db_connections_reused_total counter',
+        ]
+        lineas += [f'db_connections_reused_total{{alias="{alias}"}} {reutilizadas.get(alias, 0)}' for alias in alias_configurados]
+        lineas += [
+            '# HELP db_connections_closed_total Conexiones persistentes cerradas por motivo',
+            '# TYPE db_connections_closed_total counter',
+        ]
+        for alias in alias_configurados:
+            for motivo in MOTIVOS_CIERRE:
+                lineas.append(
+                    f'db_connections_closed_total{{alias="{alias}",motivo="{motivo}"}} {cerradas.get((alias, motivo), 0)}'
+                )
+        lineas += [
+            '# HELP db_connections_open Conexiones abiertas en el proceso',
+            '# TYPE db_connections_open gauge',
+        ]
+        lineas += [f'db_connections_open{{alias="{alias}"}} {self.persistentes(alias)}' for alias in alias_configurados]
+        lineas += [
+            '# HELP db_connections_max Límite de conexiones persistentes por proceso y alias',
+            '# TYPE db_connections_max gauge',
+            f'db_connections_max {maximo}',
+        ]
+        return lineas
+
+
+estadisticas = EstadisticasConexiones()
+
+
+def _maximo() -> int:
+    return getattr(settings, 'DB_MAX_CONEXIONES', 10)
+
+
+# ============================================================================
+# MANEJADORES DE SEÑALES
+# ============================================================================
+
+def _conexion_creada(sender, connection, **kwargs):
+    estadisticas.registrar_envoltorio(connection)
+    estadisticas.sumar(estadisticas.abiertas, connection.alias)
+    # Una conexión reutilizada que se reabre dentro de la petición es una
+    # verificación de salud fallida (close_if_health_check_failed)
+    if getattr(connection, '_reutilizada_en_peticion', False):
+        connection._reutilizada_en_peticion = False
+        estadisticas.sumar(estadisticas.cerradas, (connection.alias, 'salud'))
+
+
+def _revisar(conn):
+    """close_if_unusable_or_obsolete registrando el motivo del cierre"""
+    # Dentro de una transacción (solo ocurre en pruebas) no se toca la conexión
+    if conn.connection is None or conn.in_atomic_block:
+        return
+    vencida = conn.close_at is not None and time.monotonic() >= conn.close_at
+    conn.close_if_unusable_or_obsolete()
+    if conn.connection is None:
+        estadisticas.sumar(estadisticas.cerradas, (conn.alias, 'edad' if vencida else 'error'))
+
+
+def inicio_peticion(**kwargs):
+    for conn in connections.all(initialized_only=True):
+        _revisar(conn)
+        conn._reutilizada_en_peticion = conn.connection is not None
+        if conn._reutilizada_en_peticion:
+            estadisticas.sumar(estadisticas.reutilizadas, conn.alias)
+
+
+def fin_peticion(**kwargs):
+    maximo = _maximo()
+    for conn in connections.all(initialized_only=True):
+        conn._reutilizada_en_peticion = False
+        _revisar(conn)
+        if conn.connection is None or conn.in_atomic_block:
+            continue
+        if estadisticas.persistentes(conn.alias) > maximo:
+            conn.close()
+            estadisticas.sumar(estadisticas.cerradas, (conn.alias, 'limite'))
+
+
+def instalar():
+    """Sustituye close_old_connections de Django por los manejadores de este módulo"""
+    global _instalado
+    with _lock:
+        if _instalado:
+            return
+        signals.request_started.disconnect(close_old_connections)
+        signals.request_finished.disconnect(close_old_connections)
+        signals.request_started.connect(inicio_peticion, dispatch_uid='conexiones_inicio_peticion')
+        signals.request_finished.connect(fin_peticion, dispatch_uid='conexiones_fin_peticion')
+        connection_created.connect(_conexion_creada, dispatch_uid='conexiones_creada')
+        _instalado = True
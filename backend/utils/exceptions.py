@@ -1,9 +1,16 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import exception_handler
 
 def custom_exception_handler(exc, context):
+    # Las validaciones de modelos y servicios usan la excepción de Django
+    if isinstance(exc, DjangoValidationError):
+        detalle = exc.message_dict if hasattr(exc, 'error_dict') else {'non_field_errors': exc.messages}
+        exc = ValidationError(detalle)
+
     response = exception_handler(exc, context)
 
-    if response is not None:
+    if response is not None and isinstance(response.data, dict):
         response.data['status_code'] = response.status_code
 
-    return response
\ No newline at end of file
+    return response
@@ -0,0 +1,177 @@
+"""
+Exportación de consultas a CSV o XLSX en memoria constante
+
+Los renglones se leen con values_list() en lotes paginados por llave
+(orden, pk): cada lote es una consulta independiente, de modo que ni el
+driver ni Django retienen el resultado completo (MySQLdb guarda en el
+cliente todo el resultado de un cursor aunque se use iterator()).
+"""
+
+import csv
+import io
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from django.db.models import Q
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+TAMAÑO_LOTE = 2000
+# Bytes acumulados antes de enviar un bloque al cliente
+TAMAÑO_BLOQUE = 64 * 1024
+
+FORMATOS = ('csv', 'xlsx')
+
+
+def recorrer_valores(queryset, campos: Sequence[str], orden: str = 'pk',
+                     tamaño_lote: int = TAMAÑO_LOTE) -> Iterator[tuple]:
+    """
+    Recorre los valores de un queryset por lotes de tamaño fijo
+
+    Args:
+        queryset: Consulta ya filtrada
+        campos: Campos (o lookups) a proyectar con values_list
+        orden: Campo no nulo por el que se recorre; se desempata con pk
+        tamaño_lote: Renglones por consulta
+    """
+    queryset = queryset.order_by(orden, 'pk') if orden != 'pk' else queryset.order_by('pk')
+    ultimo = None
+    while True:
+        lote = queryset
+        if ultimo is not None:
+            valor, pk = ultimo
+            if orden == 'pk':
+                lote = lote.filter(pk__gt=pk)
+            else:
+                lote = lote.filter(Q(**{f'{orden}__gt': valor}) | Q(**{orden: valor, 'pk__gt': pk}))
+
+        filas = list(lote.values_list(orden, 'pk', *campos)[:tamaño_lote])
+        for fila in filas:
+            yield fila[2:]
+        if len(filas) < tamaño_lote:
+            return
+        ultimo = filas[-1][:2]
+
+
+def _formatear(valor):
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    return valor
+
+
+def generar_csv(encabezados: List[str], filas: Iterable[tuple]) -> Iterator[bytes]:
+    """Convierte renglones en bloques de bytes CSV (UTF-8 con BOM para Excel)"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(encabezados)
+    # El encabezado se envía de inmediato para que la descarga comience
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+
+    for fila in filas:
+        escritor.writerow([_formatear(v) for v in fila])
+        if buffer.tell() >= TAMAÑO_BLOQUE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def comprimir_gzip(bloques: Iterable[bytes]) -> Iterator[bytes]:
+    """Comprime un flujo de bytes en formato gzip sin acumularlo"""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for bloque in bloques:
+        comprimido = compresor.compress(bloque)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+def respuesta_csv(encabezados: List[str], filas: Iterable[tuple], nombre: str,
+                  comprimir: bool = False) -> StreamingHttpResponse:
+    """Respuesta CSV en streaming, opcionalmente como .csv.gz"""
+    bloques = generar_csv(encabezados, filas)
+    if comprimir:
+        respuesta = StreamingHttpResponse(comprimir_gzip(bloques), content_type='application/gzip')
+        nombre = f'{nombre}.csv.gz'
+    else:
+        respuesta = StreamingHttpResponse(bloques, content_type='text/csv; charset=utf-8')
+        nombre = f'{nombre}.csv'
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    return respuesta
+
+
+def respuesta_xlsx(encabezados: List[str], filas: Iterable[tuple], nombre: str) -> FileResponse:
+    """
+    Respuesta XLSX escrita en modo write_only sobre un archivo temporal
+
+    El formato XLSX es un ZIP y no puede enviarse antes de terminarlo; la
+    memoria se mantiene constante porque los renglones van directo a disco.
+    """
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(nombre[:31])
+    hoja.append(encabezados)
+    for fila in filas:
+        hoja.append([_formatear(v) for v in fila])
+
+    archivo = tempfile.TemporaryFile()
+    libro.save(archivo)
+    archivo.seek(0)
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=f'{nombre}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+class ExportacionMixin:
+    """
+    Agrega la acción GET exportar/?formato=csv|xlsx&gzip=1 a un ViewSet
+
+    El ViewSet define:
+        columnas_exportacion: Lista de (lookup, encabezado)
+        orden_exportacion: Campo no nulo por el que se recorre (default 'pk')
+        nombre_exportacion: Nombre base del archivo
+        filtrar_exportacion(queryset, params): Filtros de la exportación
+    """
+
+    columnas_exportacion: List[Tuple[str, str]] = []
+    orden_exportacion = 'pk'
+    nombre_exportacion = 'exportacion'
+
+    def filtrar_exportacion(self, queryset, params):
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """Descargar los registros filtrados como CSV (streaming) o XLSX"""
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in FORMATOS:
+            return Response({'detail': 'Formato no soportado, use csv o xlsx.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            queryset = self.filtrar_exportacion(self.get_queryset(), request.query_params)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        campos = [campo for campo, _ in self.columnas_exportacion]
+        encabezados = [encabezado for _, encabezado in self.columnas_exportacion]
+        filas = recorrer_valores(queryset, campos, self.orden_exportacion)
+
+        if formato == 'xlsx':
+            return respuesta_xlsx(encabezados, filas, self.nombre_exportacion)
+        comprimir = request.query_params.get('gzip') in ('1', 'true')
+        return respuesta_csv(encabezados, filas, self.nombre_exportacion, comprimir)
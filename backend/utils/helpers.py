@@ -0,0 +1,23 @@
+"""
+Funciones auxiliares compartidas
+"""
+
+# Años aceptados en filtros y reportes (?anio=)
+AÑO_MINIMO = 1900
+AÑO_MAXIMO = 2100
+
+
+def leer_año(valor) -> int:
+    """
+    Convierte el parámetro ?anio= a entero dentro de [AÑO_MINIMO, AÑO_MAXIMO]
+
+    Raises:
+        ValueError: Si no es un entero o está fuera del rango
+    """
+    try:
+        año = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError('Año inválido.')
+    if not AÑO_MINIMO <= año <= AÑO_MAXIMO:
+        raise ValueError(f'El año debe estar entre {AÑO_MINIMO} y {AÑO_MAXIMO}.')
+    return año
@@ -0,0 +1,286 @@
+"""
+Instrumentación por petición y endpoint de métricas en formato Prometheus
+
+MetricasMiddleware mide cada petición por vista y método:
+- tiempo total (hasta que la vista regresa la respuesta; en descargas en
+  streaming no incluye el envío del contenido)
+- número y tiempo de consultas SQL (connection.execute_wrapper)
+- tamaño de la respuesta
+- aciertos y fallos de caché (get / get_many del backend configurado)
+
+Además expone las estadísticas de conexiones persistentes de
+utils.conexiones (instaladas en ConfiguracionConfig.ready).
+
+Cada respuesta lleva el encabezado Server-Timing. Los agregados se
+exponen en /api/metricas/ como histogramas y contadores de Prometheus;
+cada proceso expone los suyos (Prometheus los distingue por instancia).
+Las peticiones que tardan más de METRICAS_PETICION_LENTA_MS se registran
+en el log con sus consultas más lentas.
+"""
+
+import bisect
+import contextvars
+import heapq
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from utils import conexiones
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de los histogramas (segundos)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONSULTAS_LENTAS_LOG = 5
+MAX_SQL_LOG = 500
+
+_medicion_actual = contextvars.ContextVar('medicion_actual', default=None)
+_FALTANTE = object()
+
+
+class Medicion:
+    """Contadores de una petición en curso"""
+
+    __slots__ = ('consultas', 'tiempo_bd', 'aciertos_cache', 'fallos_cache', 'mas_lentas')
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_bd = 0.0
+        self.aciertos_cache = 0
+        self.fallos_cache = 0
+        # Montículo con las consultas más lentas: (segundos, sql)
+        self.mas_lentas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.tiempo_bd += duracion
+            if len(self.mas_lentas) < CONSULTAS_LENTAS_LOG:
+                heapq.heappush(self.mas_lentas, (duracion, sql))
+            elif duracion > self.mas_lentas[0][0]:
+                heapq.heapreplace(self.mas_lentas, (duracion, sql))
+
+
+# ============================================================================
+# REGISTRO
+# ============================================================================
+
+class Histograma:
+
+    __slots__ = ('conteos', 'suma', 'total')
+
+    def __init__(self):
+        self.conteos = [0] * len(BUCKETS)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        indice = bisect.bisect_left(BUCKETS, valor)
+        if indice < len(BUCKETS):
+            self.conteos[indice] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class RegistroMetricas:
+    """Agregados del proceso por (vista, método)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duracion = {}
+        self.tiempo_bd = {}
+        self.peticiones = {}
+        self.contadores = {}
+        # Funciones que aportan líneas adicionales a la exposición
+        self.colectores = []
+
+    def registrar_colector(self, funcion):
+        if funcion not in self.colectores:
+            self.colectores.append(funcion)
+
+    def registrar(self, vista, metodo, estado, segundos, medicion, bytes_respuesta):
+        clave = (vista, metodo)
+        with self._lock:
+            self.duracion.setdefault(clave, Histograma()).observar(segundos)
+            self.tiempo_bd.setdefault(clave, Histograma()).observar(medicion.tiempo_bd)
+            clave_estado = clave + (f'{estado // 100}xx',)
+            self.peticiones[clave_estado] = self.peticiones.get(clave_estado, 0) + 1
+            contadores = self.contadores.setdefault(clave, [0, 0, 0, 0])
+            contadores[0] += medicion.consultas
+            contadores[1] += bytes_respuesta
+            contadores[2] += medicion.aciertos_cache
+            contadores[3] += medicion.fallos_cache
+
+    def exponer(self) -> str:
+        """Texto en el formato de exposición de Prometheus (0.0.4)"""
+        with self._lock:
+            duracion = {clave: (list(h.conteos), h.suma, h.total) for clave, h in self.duracion.items()}
+            tiempo_bd = {clave: (list(h.conteos), h.suma, h.total) for clave, h in self.tiempo_bd.items()}
+            peticiones = dict(self.peticiones)
+            contadores = {clave: list(valores) for clave, valores in self.contadores.items()}
+
+        lineas = []
+        for nombre, ayuda, datos in (
+            ('http_request_duration_seconds', 'Duración de las peticiones', duracion),
+            ('http_request_db_seconds', 'Tiempo en consultas SQL por petición', tiempo_bd),
+        ):
+            lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} histogram']
+            for (vista, metodo), (conteos, suma, total) in sorted(datos.items()):
+                etiquetas = f'vista="{_escapar(vista)}",metodo="{metodo}"'
+                acumulado = 0
+                for limite, conteo in zip(BUCKETS, conteos):
+                    acumulado += conteo
+                    lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+                lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {total}')
+                lineas.append(f'{nombre}_sum{{{etiquetas}}} {suma:.6f}')
+                lineas.append(f'{nombre}_count{{{etiquetas}}} {total}')
+
+        lineas += ['# HELP http_requests_total Peticiones por código de estado', '# TYPE http_requests_total counter']
+        for (vista, metodo, estado), total in sorted(peticiones.items()):
+            lineas.append(f'http_requests_total{{vista="{_escapar(vista)}",metodo="{metodo}",estado="{estado}"}} {total}')
+
+        for indice, nombre, ayuda in (
+            (0, 'http_request_db_queries_total', 'Consultas SQL ejecutadas'),
+            (1, 'http_response_bytes_total', 'Bytes de respuesta (sin contenido en streaming)'),
+        ):
+            lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} counter']
+            for (vista, metodo), valores in sorted(contadores.items()):
+                lineas.append(f'{nombre}{{vista="{_escapar(vista)}",metodo="{metodo}"}} {valores[indice]}')
+
+        lineas += ['# HELP http_cache_operations_total Lecturas de caché', '# TYPE http_cache_operations_total counter']
+        for (vista, metodo), valores in sorted(contadores.items()):
+            etiquetas = f'vista="{_escapar(vista)}",metodo="{metodo}"'
+            lineas.append(f'http_cache_operations_total{{{etiquetas},resultado="acierto"}} {valores[2]}')
+            lineas.append(f'http_cache_operations_total{{{etiquetas},resultado="fallo"}} {valores[3]}')
+
+        for colector in self.colectores:
+            lineas += colector()
+        return '\n'.join(lineas) + '\n'
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registro = RegistroMetricas()
+
+
+# ============================================================================
+# CACHÉ
+# ============================================================================
+
+def _instrumentar_backend(clase):
+    """Cuenta aciertos y fallos de get / get_many en la clase del backend"""
+    if getattr(clase, '_metricas_instrumentado', False):
+        return
+    get_original, get_many_original = clase.get, clase.get_many
+
+    def get(self, key, default=None, version=None):
+        valor = get_original(self, key, _FALTANTE, version=version)
+        medicion = _medicion_actual.get()
+        if medicion is not None:
+            if valor is _FALTANTE:
+                medicion.fallos_cache += 1
+            else:
+                medicion.aciertos_cache += 1
+        return default if valor is _FALTANTE else valor
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        # BaseCache.get_many llama a get por llave: no se cuentan dos veces
+        token = _medicion_actual.set(None)
+        try:
+            valores = get_many_original(self, keys, version=version)
+        finally:
+            _medicion_actual.reset(token)
+        medicion = _medicion_actual.get()
+        if medicion is not None:
+            medicion.aciertos_cache += len(valores)
+            medicion.fallos_cache += len(keys) - len(valores)
+        return valores
+
+    clase.get, clase.get_many = get, get_many
+    clase._metricas_instrumentado = True
+
+
+def instrumentar_caches():
+    for alias in settings.CACHES:
+        _instrumentar_backend(type(caches[alias]))
+
+
+# ============================================================================
+# MIDDLEWARE Y ENDPOINT
+# ============================================================================
+
+class MetricasMiddleware:
+    """Mide cada petición (ver docstring del módulo); va primero en MIDDLEWARE"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.umbral_lento = getattr(settings, 'METRICAS_PETICION_LENTA_MS', 1000) / 1000
+        instrumentar_caches()
+        registro.registrar_colector(conexiones.estadisticas.exponer)
+
+    def __call__(self, request):
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pila:
+                for alias in connections:
+                    pila.enter_context(connections[alias].execute_wrapper(medicion))
+                response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        segundos = time.perf_counter() - inicio
+
+        coincidencia = getattr(request, 'resolver_match', None)
+        vista = coincidencia.view_name if coincidencia else 'sin_ruta'
+        bytes_respuesta = 0 if response.streaming else len(response.content)
+        registro.registrar(vista, request.method, response.status_code, segundos, medicion, bytes_respuesta)
+
+        response['Server-Timing'] = ', '.join([
+            f'app;dur={(segundos - medicion.tiempo_bd) * 1000:.1f}',
+            f'db;dur={medicion.tiempo_bd * 1000:.1f};desc="{medicion.consultas} consultas"',
+            f'cache;desc="{medicion.aciertos_cache} aciertos, {medicion.fallos_cache} fallos"',
+            f'total;dur={segundos * 1000:.1f}',
+        ])
+
+        if segundos >= self.umbral_lento:
+            lentas = '\n'.join(
+                f'  {duracion * 1000:.1f} ms: {sql[:MAX_SQL_LOG]}'
+                for duracion, sql in sorted(medicion.mas_lentas, reverse=True)
+            )
+            logger.warning(
+                'Petición lenta %s %s (%s): %.0f ms, %d consultas en %.0f ms\n%s',
+                request.method, request.path, vista, segundos * 1000,
+                medicion.consultas, medicion.tiempo_bd * 1000, lentas,
+            )
+        return response
+
+
+def metricas_view(request):
+    """
+    Métricas del proceso en formato Prometheus
+
+    Con METRICAS_TOKEN configurado se exige 'Authorization: Bearer <token>';
+    sin él solo se responde a peticiones locales.
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    if token:
+        permitido = request.headers.get('Authorization') == f'Bearer {token}'
+    else:
+        permitido = request.META.get('REMOTE_ADDR') in ('127.0.0.1', '::1')
+    if not permitido:
+        return HttpResponseForbidden()
+    return HttpResponse(registro.exponer(), content_type='text/plain; version=0.0.4; charset=utf-8')
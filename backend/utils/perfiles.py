@@ -0,0 +1,257 @@
+"""
+Perfilado bajo demanda de peticiones (solo superadmin)
+
+Una petición con el encabezado 'X-Perfilar' de un superadmin autenticado
+con JWT se ejecuta bajo un perfilador:
+- 'muestreo' (o cualquier otro valor): un hilo toma la pila del hilo de la
+  petición cada PERFILES_INTERVALO_MS y guarda las pilas en formato
+  "folded" (una línea 'f1;f2;f3 conteo'), que leen directamente
+  flamegraph.pl, speedscope e inferno.
+- 'determinista': cProfile; guarda el .prof (snakeviz, flameprof) y un
+  resumen en texto ordenado por tiempo acumulado.
+
+Los perfiles se guardan en PERFILES_DIR con su metadata en JSON; se
+conservan como máximo PERFILES_MAX y por PERFILES_RETENCION_HORAS. Solo
+se perfila una petición a la vez por proceso. La respuesta perfilada
+lleva el encabezado X-Perfil-Id; los perfiles se consultan en
+/api/perfiles/.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.http import FileResponse, Http404
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from apps.authentication.permissions import IsSuperAdmin
+
+ENCABEZADO = 'X-Perfilar'
+PROFUNDIDAD_MAXIMA = 200
+EXTENSIONES = {'folded': 'text/plain', 'prof': 'application/octet-stream', 'txt': 'text/plain'}
+
+_en_curso = threading.Lock()
+
+
+def _directorio() -> str:
+    directorio = str(getattr(settings, 'PERFILES_DIR', os.path.join(settings.BASE_DIR, 'logs', 'perfiles')))
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def _es_superadmin(request) -> bool:
+    """Autentica el JWT de la petición (la autenticación de DRF ocurre dentro de la vista)"""
+    from apps.authentication.authentication import PrincipalJWTAuthentication
+
+    try:
+        resultado = PrincipalJWTAuthentication().authenticate(request)
+    except Exception:
+        return False
+    if resultado is None:
+        return False
+    return IsSuperAdmin().has_permission(SimpleNamespace(user=resultado[0]), None)
+
+
+# ============================================================================
+# PERFILADORES
+# ============================================================================
+
+class Muestreador(threading.Thread):
+    """Toma muestras de la pila de otro hilo a intervalos fijos"""
+
+    def __init__(self, hilo_id: int, intervalo: float):
+        super().__init__(daemon=True)
+        self.hilo_id = hilo_id
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.wait(self.intervalo):
+            frame = sys._current_frames().get(self.hilo_id)
+            pila = []
+            while frame is not None and len(pila) < PROFUNDIDAD_MAXIMA:
+                codigo = frame.f_code
+                pila.append(f'{codigo.co_name} ({_ruta_corta(codigo.co_filename)}:{codigo.co_firstlineno})')
+                frame = frame.f_back
+            if pila:
+                self.pilas[';'.join(reversed(pila))] += 1
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+
+
+def _ruta_corta(ruta: str) -> str:
+    base = str(settings.BASE_DIR)
+    if ruta.startswith(base):
+        return os.path.relpath(ruta, base)
+    partes = ruta.split(os.sep)
+    return os.sep.join(partes[-3:])
+
+
+def perfilar(get_response, request, modo: str):
+    """Ejecuta la petición bajo el perfilador; regresa (respuesta, archivos)"""
+    if modo == 'determinista':
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+        try:
+            respuesta = get_response(request)
+        finally:
+            perfilador.disable()
+        resumen = io.StringIO()
+        pstats.Stats(perfilador, stream=resumen).sort_stats('cumulative').print_stats(60)
+        return respuesta, {'prof': perfilador, 'txt': resumen.getvalue()}
+
+    intervalo = getattr(settings, 'PERFILES_INTERVALO_MS', 2) / 1000
+    muestreador = Muestreador(threading.get_ident(), intervalo)
+    muestreador.start()
+    try:
+        respuesta = get_response(request)
+    finally:
+        muestreador.detener()
+    folded = ''.join(f'{pila} {conteo}\n' for pila, conteo in muestreador.pilas.most_common())
+    return respuesta, {'folded': folded}
+
+
+# ============================================================================
+# ALMACENAMIENTO
+# ============================================================================
+
+def guardar_perfil(metadata: dict, archivos: dict) -> str:
+    directorio = _directorio()
+    perfil_id = f"{datetime.now():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+    for extension, contenido in archivos.items():
+        ruta = os.path.join(directorio, f'{perfil_id}.{extension}')
+        if extension == 'prof':
+            contenido.dump_stats(ruta)
+        else:
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write(contenido)
+    metadata = dict(metadata, id=perfil_id, archivos=sorted(archivos))
+    with open(os.path.join(directorio, f'{perfil_id}.json'), 'w', encoding='utf-8') as archivo:
+        json.dump(metadata, archivo, ensure_ascii=False)
+    purgar_perfiles()
+    return perfil_id
+
+
+def listar_perfiles() -> list:
+    """Metadata de los perfiles guardados, del más reciente al más antiguo"""
+    directorio = _directorio()
+    perfiles = []
+    for nombre in sorted(os.listdir(directorio), reverse=True):
+        if nombre.endswith('.json'):
+            try:
+                with open(os.path.join(directorio, nombre), encoding='utf-8') as archivo:
+                    perfiles.append(json.load(archivo))
+            except (OSError, ValueError):
+                continue
+    return perfiles
+
+
+def purgar_perfiles() -> int:
+    """Borra los perfiles vencidos y los que exceden PERFILES_MAX; regresa los borrados"""
+    directorio = _directorio()
+    maximo = getattr(settings, 'PERFILES_MAX', 50)
+    limite = time.time() - getattr(settings, 'PERFILES_RETENCION_HORAS', 72) * 3600
+
+    ids = sorted({nombre.split('.')[0] for nombre in os.listdir(directorio)}, reverse=True)
+    borrados = 0
+    for posicion, perfil_id in enumerate(ids):
+        rutas = [os.path.join(directorio, f'{perfil_id}.{extension}') for extension in list(EXTENSIONES) + ['json']]
+        try:
+            vencido = max(os.path.getmtime(ruta) for ruta in rutas if os.path.exists(ruta)) < limite
+        except ValueError:
+            continue
+        if posicion < maximo and not vencido:
+            continue
+        for ruta in rutas:
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+        borrados += 1
+    return borrados
+
+
+# ============================================================================
+# MIDDLEWARE Y VISTAS
+# ============================================================================
+
+class PerfilesMiddleware:
+    """Perfila las peticiones marcadas con X-Perfilar (ver docstring del módulo)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        modo = request.headers.get(ENCABEZADO)
+        if not modo or not _es_superadmin(request):
+            return self.get_response(request)
+        if not _en_curso.acquire(blocking=False):
+            respuesta = self.get_response(request)
+            respuesta['X-Perfil-Id'] = 'ocupado'
+            return respuesta
+
+        try:
+            modo = 'determinista' if modo.strip().lower() == 'determinista' else 'muestreo'
+            inicio = time.perf_counter()
+            respuesta, archivos = perfilar(self.get_response, request, modo)
+            perfil_id = guardar_perfil({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'metodo': request.method,
+                'ruta': request.get_full_path(),
+                'estado': respuesta.status_code,
+                'duracion_ms': round((time.perf_counter() - inicio) * 1000, 1),
+                'modo': modo,
+            }, archivos)
+        finally:
+            _en_curso.release()
+        respuesta['X-Perfil-Id'] = perfil_id
+        return respuesta
+
+
+def _id_valido(perfil_id: str) -> bool:
+    return all(c.isalnum() or c == '-' for c in perfil_id)
+
+
+@api_view(['GET'])
+@permission_classes([IsSuperAdmin])
+def perfiles_view(request):
+    """Lista los perfiles guardados"""
+    return Response(listar_perfiles())
+
+
+@api_view(['GET'])
+@permission_classes([IsSuperAdmin])
+def perfil_view(request, perfil_id):
+    """Metadata de un perfil o uno de sus archivos con ?archivo=folded|prof|txt"""
+    if not _id_valido(perfil_id):
+        raise Http404
+    directorio = _directorio()
+    extension = request.query_params.get('archivo')
+    if extension is None:
+        ruta = os.path.join(directorio, f'{perfil_id}.json')
+        if not os.path.exists(ruta):
+            raise Http404
+        with open(ruta, encoding='utf-8') as archivo:
+            return Response(json.load(archivo))
+
+    if extension not in EXTENSIONES:
+        return Response({'detail': 'Archivo inválido.'}, status=400)
+    ruta = os.path.join(directorio, f'{perfil_id}.{extension}')
+    if not os.path.exists(ruta):
+        raise Http404
+    return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=f'{perfil_id}.{extension}',
+                        content_type=EXTENSIONES[extension])
@@ -0,0 +1,150 @@
+"""
+Lecturas en réplica con lectura de lo propio escrito
+
+Con el alias 'replica' configurado (DB_REPLICA_HOST), ReplicaRouter envía
+a la réplica las lecturas marcadas:
+- peticiones GET/HEAD/OPTIONS a ViewSets con LecturaReplicaMixin
+  (reportes, exportaciones, calendarios, auditoría)
+- bloques de comandos envueltos en lecturas_en_replica()
+
+Todo lo demás, y cualquier lectura dentro de una transacción, va a la
+primaria. Una petición que escribe deja de leer de la réplica desde ese
+momento y su usuario queda fijo a la primaria durante
+REPLICA_VENTANA_SEGUNDOS, para que la siguiente carga del SPA vea lo que
+acaba de guardar aunque la réplica tenga retraso. La marca vive en la
+caché compartida, de modo que aplica en todos los procesos; con la réplica
+configurada un caché por proceso no pasa las revisiones del sistema (ver
+utils/checks.py).
+
+Sin el alias 'replica' el router no cambia nada.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import signals
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import permissions
+
+ALIAS = 'replica'
+
+_estado = contextvars.ContextVar('replicas_estado', default=None)
+
+
+class EstadoLecturas:
+    """Decisión de ruteo de la petición o bloque en curso"""
+
+    __slots__ = ('replica', 'escribio')
+
+    def __init__(self, replica: bool = False):
+        self.replica = replica
+        self.escribio = False
+
+
+def _clave_primaria(usuario_id) -> str:
+    return f'replicas:primaria:{usuario_id}'
+
+
+def fijar_a_primaria(usuario):
+    cache.set(_clave_primaria(usuario.pk), 1, getattr(settings, 'REPLICA_VENTANA_SEGUNDOS', 10))
+
+
+def fijado_a_primaria(usuario) -> bool:
+    if not getattr(usuario, 'is_authenticated', False):
+        return False
+    return cache.get(_clave_primaria(usuario.pk)) is not None
+
+
+def usar_replica():
+    """Marca la petición en curso para leer de la réplica"""
+    estado = _estado.get()
+    if estado is not None:
+        estado.replica = True
+
+
+@contextmanager
+def lecturas_en_replica():
+    """Envía a la réplica las lecturas del bloque (para comandos)"""
+    token = _estado.set(EstadoLecturas(replica=True))
+    try:
+        yield
+    finally:
+        _estado.reset(token)
+
+
+# ============================================================================
+# ROUTER
+# ============================================================================
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if estado is None or not estado.replica or estado.escribio:
+            return None
+        if ALIAS not in settings.DATABASES or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return ALIAS
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado.escribio = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica contiene los mismos datos que la primaria
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != ALIAS
+
+
+# ============================================================================
+# MIDDLEWARE Y MIXIN
+# ============================================================================
+
+def _fin_peticion(**kwargs):
+    # Las respuestas en streaming se leen después del middleware, por lo que
+    # el estado se conserva hasta que el servidor cierra la respuesta
+    _estado.set(None)
+
+
+class ReplicasMiddleware:
+    """Estado de ruteo por petición; fija a la primaria al usuario que escribió"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        signals.request_finished.connect(_fin_peticion, dispatch_uid='replicas_fin_peticion')
+
+    def __call__(self, request):
+        estado = EstadoLecturas()
+        _estado.set(estado)
+        response = self.get_response(request)
+        usuario = getattr(request, 'user', None)
+        if estado.escribio and getattr(usuario, 'is_authenticated', False):
+            fijar_a_primaria(usuario)
+        return response
+
+
+class LecturaReplicaMixin:
+    """
+    Lee de la réplica en las peticiones seguras del ViewSet
+
+    El ViewSet define:
+        acciones_replica: Acciones que leen de la réplica (None: todas)
+    """
+
+    acciones_replica = None
+
+    def initial(self, request, *args, **kwargs):
+        # Después de autenticar: el usuario se carga de la primaria
+        super().initial(request, *args, **kwargs)
+        if request.method not in permissions.SAFE_METHODS:
+            return
+        if self.acciones_replica is not None and self.action not in self.acciones_replica:
+            return
+        if not fijado_a_primaria(request.user):
+            usar_replica()
@@ -0,0 +1,111 @@
+"""
+Tareas en segundo plano dentro del proceso
+
+El proyecto no tiene una cola de tareas; los trabajos largos que se piden
+desde la API (p. ej. reportes) se ejecutan en un ThreadPoolExecutor del
+proceso con TAREAS_HILOS hilos. El estado de cada tarea se guarda en el
+caché compartido (obligatorio fuera de DEBUG, ver utils/checks.py) bajo
+una clave, de modo que:
+- una misma tarea no se encola dos veces aunque la pidan varios procesos
+- cualquier proceso puede consultar si está en curso o si falló
+
+El estado vence a los TAREAS_VENCIMIENTO segundos: si el proceso que la
+ejecutaba se reinicia, la tarea se puede volver a pedir. Con
+encolar_o_repetir, una tarea pedida mientras otra igual está en curso se
+marca para repetirse al terminar (p. ej. cuando lo que cambió fue la
+entrada de la tarea y la ejecución en curso ya la había leído). Con
+TAREAS_SINCRONAS (pruebas) la tarea se ejecuta en el mismo hilo.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+EN_PROCESO = 'en_proceso'
+ERROR = 'error'
+
+_lock = threading.Lock()
+_ejecutor = None
+
+
+def _clave(clave: str) -> str:
+    return f'tareas:{clave}'
+
+
+def _clave_repetir(clave: str) -> str:
+    return f'tareas:{clave}:repetir'
+
+
+def _obtener_ejecutor() -> ThreadPoolExecutor:
+    global _ejecutor
+    with _lock:
+        if _ejecutor is None:
+            _ejecutor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'TAREAS_HILOS', 2), thread_name_prefix='tarea'
+            )
+        return _ejecutor
+
+
+def estado(clave: str):
+    """Regresa {'estado': ..., 'detalle': ...} o None si la tarea no está registrada"""
+    return cache.get(_clave(clave))
+
+
+def _ejecutar(clave: str, funcion, args, kwargs):
+    try:
+        funcion(*args, **kwargs)
+    except Exception as error:
+        logger.exception('Falló la tarea %s', clave)
+        cache.set(_clave(clave), {'estado': ERROR, 'detalle': str(error)},
+                  getattr(settings, 'TAREAS_VENCIMIENTO', 900))
+    else:
+        cache.delete(_clave(clave))
+    finally:
+        # Se revisa después de liberar la clave: quien marcó la repetición vio la tarea en curso
+        if cache.delete(_clave_repetir(clave)):
+            encolar_o_repetir(clave, funcion, *args, **kwargs)
+        # Las conexiones de este hilo no pasan por request_finished
+        if not getattr(settings, 'TAREAS_SINCRONAS', False):
+            connections.close_all()
+
+
+def encolar(clave: str, funcion, *args, **kwargs) -> bool:
+    """
+    Encola funcion(*args, **kwargs) si no hay otra tarea con la misma clave
+
+    Returns:
+        True si se encoló; False si ya estaba en curso
+    """
+    vencimiento = getattr(settings, 'TAREAS_VENCIMIENTO', 900)
+    if not cache.add(_clave(clave), {'estado': EN_PROCESO, 'detalle': ''}, vencimiento):
+        actual = estado(clave)
+        if actual is None or actual['estado'] != ERROR:
+            return False
+        # Un error previo no impide volver a intentarlo
+        cache.set(_clave(clave), {'estado': EN_PROCESO, 'detalle': ''}, vencimiento)
+
+    if getattr(settings, 'TAREAS_SINCRONAS', False):
+        _ejecutar(clave, funcion, args, kwargs)
+    else:
+        _obtener_ejecutor().submit(_ejecutar, clave, funcion, args, kwargs)
+    return True
+
+
+def encolar_o_repetir(clave: str, funcion, *args, **kwargs) -> bool:
+    """
+    Como encolar, pero si la tarea está en curso la marca para repetirse al terminar
+
+    Returns:
+        True si se encoló; False si quedó marcada para repetirse
+    """
+    if encolar(clave, funcion, *args, **kwargs):
+        return True
+    cache.set(_clave_repetir(clave), True, getattr(settings, 'TAREAS_VENCIMIENTO', 900))
+    # La tarea pudo terminar entre encolar y la marca: intentar una vez más
+    return encolar(clave, funcion, *args, **kwargs)
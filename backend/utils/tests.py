@@ -0,0 +1,187 @@
+"""
+Pruebas de las conexiones persistentes, las métricas por petición y el
+perfilado bajo demanda
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core import signals
+from django.core.cache import cache, caches
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.authentication.models import Usuario
+from utils import conexiones, metricas, perfiles
+from utils.conexiones import estadisticas
+
+
+class ConexionesTestCase(TransactionTestCase):
+    """Límite de conexiones persistentes y estadísticas por alias"""
+
+    def cerradas_por_limite(self):
+        return estadisticas.cerradas.get(('default', 'limite'), 0)
+
+    def test_instalado_al_arrancar(self):
+        self.assertTrue(conexiones._instalado)
+        receptores = [receptor() for _, receptor in signals.request_finished.receivers]
+        self.assertIn(conexiones.fin_peticion, receptores)
+
+    def test_cuenta_conexiones_nuevas(self):
+        antes = estadisticas.abiertas.get('default', 0)
+
+        def consultar():
+            with connections['default'].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connections.close_all()
+
+        hilo = threading.Thread(target=consultar)
+        hilo.start()
+        hilo.join()
+        self.assertEqual(estadisticas.abiertas.get('default', 0), antes + 1)
+
+    def test_reutilizada_al_iniciar_peticion(self):
+        connection.ensure_connection()
+        antes = estadisticas.reutilizadas.get('default', 0)
+        conexiones.inicio_peticion()
+        self.assertEqual(estadisticas.reutilizadas.get('default', 0), antes + 1)
+
+    def test_limite_al_terminar_peticion(self):
+        connection.ensure_connection()
+        self.assertGreaterEqual(estadisticas.persistentes('default'), 1)
+        antes = self.cerradas_por_limite()
+        with override_settings(DB_MAX_CONEXIONES=10):
+            conexiones.fin_peticion()
+        self.assertEqual(self.cerradas_por_limite(), antes)
+        with override_settings(DB_MAX_CONEXIONES=0):
+            conexiones.fin_peticion()
+        self.assertEqual(self.cerradas_por_limite(), antes + 1)
+
+    def test_exposicion(self):
+        with override_settings(DB_MAX_CONEXIONES=7):
+            lineas = estadisticas.exponer()
+        self.assertIn('db_connections_max 7', lineas)
+        self.assertIn(f'db_connections_opened_total{{alias="default"}} {estadisticas.abiertas["default"]}', lineas)
+        self.assertTrue(any(linea.startswith('db_connections_open{alias="default"}') for linea in lineas))
+
+
+class MetricasTestCase(TestCase):
+    """Endpoint de métricas, Server-Timing y conteo de caché"""
+
+    url = '/api/metricas/'
+
+    def test_sin_token_solo_peticiones_locales(self):
+        with override_settings(METRICAS_TOKEN=''):
+            self.assertEqual(self.client.get(self.url, REMOTE_ADDR='10.0.0.5').status_code, 403)
+            respuesta = self.client.get(self.url, REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(b'# TYPE http_requests_total counter', respuesta.content)
+        self.assertIn(b'db_connections_max', respuesta.content)
+
+    def test_con_token(self):
+        with override_settings(METRICAS_TOKEN='secreto'):
+            self.assertEqual(self.client.get(self.url).status_code, 403)
+            self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+            respuesta = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secreto', REMOTE_ADDR='10.0.0.5')
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_server_timing_y_registro(self):
+        respuesta = self.client.get(self.url)
+        self.assertRegex(respuesta['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ consultas", cache;')
+        self.assertIn(
+            'http_requests_total{vista="metricas",metodo="GET",estado="2xx"}', metricas.registro.exponer()
+        )
+
+
+class CacheInstrumentadoTestCase(SimpleTestCase):
+    """get / get_many instrumentados conservan el comportamiento del backend"""
+
+    def setUp(self):
+        cache.clear()
+        metricas.instrumentar_caches()
+        self.medicion = metricas.Medicion()
+        token = metricas._medicion_actual.set(self.medicion)
+        self.addCleanup(metricas._medicion_actual.reset, token)
+
+    def test_get(self):
+        cache.set('presente', None)
+        self.assertIsNone(cache.get('presente', 'omision'))
+        self.assertEqual(cache.get('faltante', 'omision'), 'omision')
+        self.assertIsNone(cache.get('faltante'))
+        self.assertEqual((self.medicion.aciertos_cache, self.medicion.fallos_cache), (1, 2))
+
+    def test_get_many(self):
+        cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(cache.get_many(iter(['a', 'b', 'c'])), {'a': 1, 'b': 2})
+        self.assertEqual((self.medicion.aciertos_cache, self.medicion.fallos_cache), (2, 1))
+
+    def test_sin_peticion_en_curso(self):
+        metricas._medicion_actual.set(None)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(self.medicion.aciertos_cache, 0)
+
+    def test_instrumenta_una_sola_vez(self):
+        clase = type(caches['default'])
+        get = clase.get
+        metricas.instrumentar_caches()
+        self.assertIs(clase.get, get)
+
+
+class PerfilesTestCase(TestCase):
+    """X-Perfilar solo para superadmin; perfiles acotados en disco"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = Usuario.objects.create_superuser(
+            email='admin@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Sistema'
+        )
+        cls.admin_area = Usuario.objects.create_user(
+            email='area@metro.gob.mx', password='clave-prueba', nombre='Admin', apellidos='Área', rol='admin_area'
+        )
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        ajustes = override_settings(PERFILES_DIR=self.directorio, PERFILES_MAX=50, PERFILES_RETENCION_HORAS=72)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def pedir(self, usuario=None, modo='muestreo'):
+        encabezados = {'HTTP_X_PERFILAR': modo}
+        if usuario is not None:
+            encabezados['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(usuario)}'
+        return self.client.get('/api/perfiles/', **encabezados)
+
+    def test_superadmin_perfila(self):
+        respuesta = self.pedir(self.superadmin, 'determinista')
+        self.assertEqual(respuesta.status_code, 200)
+        perfil_id = respuesta['X-Perfil-Id']
+        self.assertEqual(
+            sorted(os.listdir(self.directorio)), [f'{perfil_id}.json', f'{perfil_id}.prof', f'{perfil_id}.txt']
+        )
+        self.assertEqual(perfiles.listar_perfiles()[0]['modo'], 'determinista')
+
+    def test_otros_usuarios_no_perfilan(self):
+        self.assertFalse(self.pedir(self.admin_area).has_header('X-Perfil-Id'))
+        self.assertFalse(self.pedir().has_header('X-Perfil-Id'))
+        self.assertEqual(os.listdir(self.directorio), [])
+
+    def test_conserva_los_mas_recientes(self):
+        with override_settings(PERFILES_MAX=2):
+            ids = [perfiles.guardar_perfil({'modo': 'muestreo'}, {'folded': 'f 1\n'}) for _ in range(4)]
+        self.assertEqual([perfil['id'] for perfil in perfiles.listar_perfiles()], ids[:1:-1])
+        self.assertEqual(len(os.listdir(self.directorio)), 4)
+
+    def test_borra_los_vencidos(self):
+        viejo = perfiles.guardar_perfil({'modo': 'muestreo'}, {'folded': 'f 1\n'})
+        hace_tres_dias = time.time() - 73 * 3600
+        for extension in ('folded', 'json'):
+            os.utime(os.path.join(self.directorio, f'{viejo}.{extension}'), (hace_tres_dias, hace_tres_dias))
+        nuevo = perfiles.guardar_perfil({'modo': 'muestreo'}, {'folded': 'f 1\n'})
+        self.assertEqual([perfil['id'] for perfil in perfiles.listar_perfiles()], [nuevo])